@@ -1,6 +1,71 @@
-from django.apps import AppConfig
+import os
+import sys
+import threading
+
+from django.apps import AppConfig, apps
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_WARM_UP_COMMANDS = [
+    "runserver",
+    "process_pending_deposits",
+    "bitgo_process_payouts",
+]
 
 
 class PolarisBitGoConfig(AppConfig):
     name = "polaris_bitgo"
     verbose_name = "Django Polaris BitGo"
+
+    def ready(self):
+        if getattr(settings, "BITGO_WARM_UP", False) and not skips_warm_up(sys.argv):
+            threading.Thread(
+                target=warm_up_registered_integration,
+                name="polaris-bitgo-warm-up",
+                daemon=True,
+            ).start()
+
+
+def skips_warm_up(argv) -> bool:
+    """
+    Checks if the process is a management command that doesn't send
+    payouts, like ``migrate`` or ``shell``, so it doesn't warm up the
+    integration. The web servers and the commands in
+    ``BITGO_WARM_UP_COMMANDS`` are warmed up.
+
+    :param argv: The process' arguments.
+    :return: Returns ``True`` if the warm-up is skipped.
+    """
+    if not argv or os.path.basename(argv[0]) not in ("manage.py", "django-admin"):
+        return False
+    commands = getattr(settings, "BITGO_WARM_UP_COMMANDS", DEFAULT_WARM_UP_COMMANDS)
+    return len(argv) < 2 or argv[1] not in commands
+
+
+def warm_up_registered_integration():
+    """
+    Warms up the registered custody integration once every app is ready,
+    since it is registered from another app's ``ready()``. The thread's
+    database connections are closed once it's done.
+    """
+    from polaris import integrations
+    from polaris.utils import get_logger
+
+    from polaris_bitgo.bitgo.integration import BitGoIntegration
+
+    logger = get_logger(__name__)
+
+    apps.ready_event.wait()
+    integration = integrations.registered_custody_integration
+    if not isinstance(integration, BitGoIntegration):
+        logger.warning(
+            "BITGO_WARM_UP is set but the registered custody integration isn't "
+            "a BitGoIntegration"
+        )
+        return
+    try:
+        integration.warm_up()
+    except Exception:
+        logger.exception("failed to warm up the BitGo integration")
+    finally:
+        connections.close_all()
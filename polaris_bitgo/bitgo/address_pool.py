@@ -0,0 +1,123 @@
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from polaris.models import Transaction
+
+from .api import BitGoAPI
+from polaris_bitgo.models import BitGoAddress
+
+
+class AddressPool:
+    """
+    A pool of addresses created ahead of time on the BitGo's wallet, so a
+    transaction's receiving account and memo are assigned from the database
+    without calling BitGo.
+
+    :param bitgo_api: The :class:`BitGoAPI` instance of the wallet.
+    """
+
+    def __init__(self, bitgo_api: BitGoAPI):
+        self.bitgo_api = bitgo_api
+        self.wallet_id = bitgo_api.WALLET_ID
+
+    def size(self) -> int:
+        """
+        Counts the addresses available in the pool.
+
+        :return: Returns the number of unclaimed addresses.
+        """
+        return self._unclaimed_addresses().count()
+
+    def fill(self, size: int) -> int:
+        """
+        Creates addresses on BitGo until the pool has the given size.
+
+        :param size: The number of unclaimed addresses the pool should have.
+        :return: Returns the number of created addresses.
+        """
+        missing = max(size - self.size(), 0)
+        for _ in range(missing):
+            response = self.bitgo_api.create_address()
+            BitGoAddress.objects.create(
+                wallet_id=self.wallet_id, address=response["address"]
+            )
+        return missing
+
+    def claim(self, transaction: Transaction) -> Optional[BitGoAddress]:
+        """
+        Claims an address from the pool and saves it as the transaction's
+        receiving account and memo.
+
+        :param transaction: The transaction that claims the address.
+        :return: Returns the claimed :class:`BitGoAddress`, or ``None`` if
+        the pool is empty. In that case the transaction is not saved.
+        """
+        with db_transaction.atomic():
+            address = self._lock_unclaimed_addresses().first()
+            if not address:
+                return None
+            self._assign(address, transaction)
+            transaction.save()
+            address.save()
+        return address
+
+    def claim_many(self, transactions: List[Transaction]) -> List[Transaction]:
+        """
+        Claims an address for each transaction and saves them with one
+        query for the transactions and one for the addresses.
+
+        :param transactions: The transactions that claim the addresses.
+        :return: Returns the transactions left without an address because
+        the pool is empty.
+        """
+        with db_transaction.atomic():
+            addresses = list(self._lock_unclaimed_addresses()[: len(transactions)])
+            claimed_transactions = transactions[: len(addresses)]
+            for address, transaction in zip(addresses, claimed_transactions):
+                self._assign(address, transaction)
+            Transaction.objects.bulk_update(
+                claimed_transactions, ["receiving_anchor_account", "memo", "memo_type"]
+            )
+            BitGoAddress.objects.bulk_update(addresses, ["transaction", "claimed_at"])
+        return transactions[len(addresses) :]
+
+    @staticmethod
+    def parse_address(address: str) -> Tuple[str, Optional[str]]:
+        """
+        Splits a BitGo's Stellar address into the account and memo id.
+
+        :param address: The address in the ``<account>?memoId=<id>`` format.
+        :return: Returns a tuple with the account and the memo id, if any.
+        """
+        parts = urlsplit(address)
+        memo_ids = parse_qs(parts.query).get("memoId")
+        return parts.path, memo_ids[0] if memo_ids else None
+
+    def _unclaimed_addresses(self):
+        return BitGoAddress.objects.filter(
+            wallet_id=self.wallet_id, claimed_at__isnull=True
+        )
+
+    def _lock_unclaimed_addresses(self):
+        """
+        Locks the unclaimed addresses, skipping the ones locked by other
+        workers, so concurrent claims never get the same address. It must
+        be called inside a database transaction.
+        """
+        return (
+            self._unclaimed_addresses()
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+        )
+
+    def _assign(self, address: BitGoAddress, transaction: Transaction):
+        account, memo_id = self.parse_address(address.address)
+
+        transaction.receiving_anchor_account = account
+        transaction.memo = memo_id
+        transaction.memo_type = Transaction.MEMO_TYPES.id
+
+        address.transaction = transaction
+        address.claimed_at = timezone.now()
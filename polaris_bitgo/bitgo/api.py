@@ -1,14 +1,71 @@
 import dataclasses
+import time
 from typing import Optional
 from urllib.parse import urljoin
 
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
+from polaris_bitgo.helpers.caching import RecordCache
 from polaris_bitgo.helpers.exceptions import BitGoAPIError, BitGoKeyInfoNotFound
+from polaris_bitgo.helpers.hedging import RequestHedger
+from polaris_bitgo.helpers.metrics import ERROR_STATUS, Metrics, get_metrics
+from polaris_bitgo.helpers.rate_limiting import RateLimiter
 from .dtos import Recipient, Wallet
 
+# The states of the transfers that don't change anymore.
+FINAL_TRANSFER_STATES = ("confirmed", "failed")
+
+
+def create_session(
+    api_key: str,
+    pool_maxsize: int = DEFAULT_POOLSIZE,
+    adapter: Optional[HTTPAdapter] = None,
+):
+    """
+    Creates the :class:`requests.Session` used to call BitGo's API, which
+    can be shared by the threads and the clients of the same API key.
+
+    :param api_key: The BitGo's API key sent in every request.
+    :param pool_maxsize: The number of connections kept open to BitGo.
+    Requests made by more threads than that at the same time open
+    connections that are discarded afterwards.
+    :param adapter: The :class:`HTTPAdapter` whose connection pools are
+    used, shared by the sessions of other API keys. The API key is a
+    header of the session, so it isn't shared. By default the session
+    has its own adapter of ``pool_maxsize`` connections.
+    :return: Returns the :class:`requests.Session`.
+    """
+    if pool_maxsize < 1:
+        raise ValueError("The pool size must be positive.")
+
+    session = requests.Session()
+    session.headers.update(
+        {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+    )
+    if adapter is None:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 class BitGoAPI:
+    """
+    Calls BitGo's API for a wallet and coin.
+
+    It's safe to share between threads: its attributes are only set when
+    it's created, and the requests are made from a :class:`requests.Session`
+    whose connection pool is thread-safe.
+
+    :param session: The :class:`requests.Session` used for the requests,
+    shared by the clients of the same wallet. A new one is created by
+    default.
+    :param record_cache: The :class:`RecordCache` of the transfers in a
+    final state, if any.
+    :param rate_limiter: The :class:`RateLimiter` of the requests, if any.
+    """
+
     def __init__(
         self,
         asset_code: str,
@@ -18,23 +75,26 @@ class BitGoAPI:
         wallet_id: str = "",
         api_url: str = "https://app.bitgo-test.com",
         stellar_coin_code: str = "txlm",
+        hedger: Optional[RequestHedger] = None,
+        metrics: Optional[Metrics] = None,
+        session: Optional[requests.Session] = None,
+        record_cache: Optional[RecordCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         self.API_URL = api_url
         self.API_KEY = api_key
         self.API_PASSPHRASE = api_passphrase
         self.WALLET_ID = wallet_id
-        self.COIN = self._get_coin(stellar_coin_code, asset_code, asset_issuer)
-
-        base_headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.API_KEY}",
-        }
+        self.COIN = self.get_coin(stellar_coin_code, asset_code, asset_issuer)
 
-        self.session = requests.Session()
-        self.session.headers.update(**base_headers)
+        self.session = session or create_session(self.API_KEY)
+        self.hedger = hedger
+        self.metrics = get_metrics(metrics)
+        self.record_cache = record_cache
+        self.rate_limiter = rate_limiter
 
     @staticmethod
-    def _get_coin(
+    def get_coin(
         stellar_coin_code: str, asset_code: str, asset_issuer: Optional[str] = None
     ) -> str:
         return (
@@ -57,6 +117,62 @@ class BitGoAPI:
         msg = f"{response.status_code} Error: {response.reason} for url {response.url}. Response Text: {response.text}"
         raise BitGoAPIError(msg, response=response)
 
+    def _request(
+        self, method: str, endpoint: str, url: str, **kwargs
+    ) -> requests.Response:
+        """
+        Makes a request, recording its latency, status and size. When
+        there is a :class:`RateLimiter`, it waits for its turn first.
+
+        :param method: The session's method, ``get`` or ``post``.
+        :param endpoint: The endpoint's name used in the metrics.
+        :param url: The request's URL.
+        :return: Returns the request's response.
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = getattr(self.session, method)(url, **kwargs)
+        except requests.RequestException:
+            self.metrics.observe_request(
+                endpoint, ERROR_STATUS, time.monotonic() - start
+            )
+            raise
+        self.metrics.observe_response(endpoint, response, time.monotonic() - start)
+        return response
+
+    def _get(self, endpoint: str, url: str, **kwargs) -> requests.Response:
+        """
+        Makes a GET request, hedging it when a :class:`RequestHedger`
+        is configured. A hedged response with an error status only wins
+        if the other request fails too.
+
+        :param endpoint: The endpoint's name used in the metrics.
+        :param url: The request's URL.
+        :return: Returns the request's response.
+        """
+        if self.hedger:
+            return self.hedger.call(
+                self._request,
+                "get",
+                endpoint,
+                url,
+                is_success=lambda response: response.ok,
+                **kwargs,
+            )
+        return self._request("get", endpoint, url, **kwargs)
+
+    def _post(self, endpoint: str, url: str, **kwargs) -> requests.Response:
+        """
+        Makes a POST request.
+
+        :param endpoint: The endpoint's name used in the metrics.
+        :param url: The request's URL.
+        :return: Returns the request's response.
+        """
+        return self._request("post", endpoint, url, **kwargs)
+
     def get_wallet(self) -> dict:
         """
         Gets the wallet's information.
@@ -64,7 +180,7 @@ class BitGoAPI:
         :return: Returns a dict with the wallet's information.
         """
         url = urljoin(self.API_URL, f"/api/v2/{self.COIN}/wallet/{self.WALLET_ID}")
-        response = self.session.get(url)
+        response = self._get("wallet", url)
         return self._handle_response(response)
 
     def get_wallet_key_info(self, wallet: Wallet) -> dict:
@@ -86,7 +202,7 @@ class BitGoAPI:
 
         url = urljoin(self.API_URL, f"/api/v2/{self.COIN}/key")
 
-        response = self.session.get(url)
+        response = self._get("key", url)
 
         wallet_keys_info = self._handle_response(response)
         for wallet_key_info in wallet_keys_info["keys"]:
@@ -98,13 +214,17 @@ class BitGoAPI:
 
         raise BitGoKeyInfoNotFound("Wallet Key info not found.")
 
-    def build_transaction(self, recipient: Recipient) -> dict:
+    def build_transaction(
+        self, recipient: Recipient, fee: Optional[int] = None
+    ) -> dict:
         """
         Builds a transaction on BitGo's API. It returns some information
         about the transaction, like the transaction's XDR.
 
         :param recipient: The :class:`Recipient` object with the amount
         (XDR Amount) and the destination address.
+        :param fee: The fee per operation, in stroops, requested as the
+        build's ``feeRate``. By default BitGo chooses it.
         :return: Returns the BitGo's API response.
         """
         url = urljoin(
@@ -115,12 +235,16 @@ class BitGoAPI:
                 dataclasses.asdict(recipient),
             ]
         }
+        if fee is not None:
+            data["feeRate"] = fee
 
-        response = self.session.post(url, json=data)
+        response = self._post("build", url, json=data)
 
         return self._handle_response(response)
 
-    def send_transaction(self, transaction_envelope_xdr: str) -> dict:
+    def send_transaction(
+        self, transaction_envelope_xdr: str, sequence_id: Optional[str] = None
+    ) -> dict:
         """
         Sends the transaction's XDR to BitGo, which does another
         signature to the transaction, then sends it to the Stellar
@@ -128,6 +252,9 @@ class BitGoAPI:
 
         :param transaction_envelope_xdr: The base64 string with the
         transaction's information.
+        :param sequence_id: A unique id for the transfer. BitGo rejects
+        a second transfer with the same sequence id, so it's safe to
+        retry the request.
         :return: Returns the BitGo's API response. It contains some
         information about the transaction, like the Stellar Network
         transaction id.
@@ -140,23 +267,93 @@ class BitGoAPI:
                 "txBase64": transaction_envelope_xdr,
             }
         }
+        if sequence_id:
+            data["sequenceId"] = sequence_id
 
-        response = self.session.post(url, json=data)
+        response = self._post("send", url, json=data)
 
         return self._handle_response(response)
 
     def get_transfer_by_id(self, transaction_id: str) -> dict:
         """
-        Gets BitGo's transfer information by its id.
+        Gets BitGo's transfer information by its id. The transfers in a
+        final state are cached when there is a :class:`RecordCache`.
 
         :param: The transfer id.
         :return: Returns a dict containing the transfer data.
         """
+        cache_key = f"bitgo-transfer:{self.WALLET_ID}:{transaction_id}"
+        if self.record_cache:
+            transfer = self.record_cache.get(cache_key)
+            if transfer is not None:
+                return transfer
+
         url = urljoin(
             self.API_URL,
             f"/api/v2/{self.COIN}/wallet/{self.WALLET_ID}/transfer/{transaction_id}",
         )
 
-        response = self.session.get(url)
+        response = self._get("transfer", url)
+
+        transfer = self._handle_response(response)
+        if self.record_cache and transfer.get("state") in FINAL_TRANSFER_STATES:
+            self.record_cache.set(cache_key, transfer)
+        return transfer
+
+    def get_transfer_by_sequence_id(self, sequence_id: str) -> dict:
+        """
+        Gets BitGo's transfer information by the sequence id sent
+        with the transaction.
+
+        :param sequence_id: The transfer sequence id.
+        :return: Returns a dict containing the transfer data.
+        """
+        url = urljoin(
+            self.API_URL,
+            f"/api/v2/{self.COIN}/wallet/{self.WALLET_ID}/transfer/sequenceId/{sequence_id}",
+        )
+
+        response = self._get("transfer", url)
+
+        return self._handle_response(response)
+
+    def get_transfers(
+        self, transfer_type: Optional[str] = None, prev_id: Optional[str] = None
+    ) -> dict:
+        """
+        Gets a page of the wallet's transfers, newest first.
+
+        :param transfer_type: Filters the transfers by type, ``send`` or
+        ``receive``.
+        :param prev_id: The ``nextBatchPrevId`` of the previous page.
+        :return: Returns a dict containing the page's transfers and the
+        ``nextBatchPrevId`` when there are more pages.
+        """
+        url = urljoin(
+            self.API_URL, f"/api/v2/{self.COIN}/wallet/{self.WALLET_ID}/transfer"
+        )
+        params = {}
+        if transfer_type:
+            params["type"] = transfer_type
+        if prev_id:
+            params["prevId"] = prev_id
+
+        response = self._get("transfer", url, params=params)
+
+        return self._handle_response(response)
+
+    def create_address(self, label: str = "") -> dict:
+        """
+        Creates a new receive address on the wallet.
+
+        :param label: The address' label.
+        :return: Returns a dict containing the address data.
+        """
+        url = urljoin(
+            self.API_URL, f"/api/v2/{self.COIN}/wallet/{self.WALLET_ID}/address"
+        )
+        data = {"label": label} if label else {}
+
+        response = self._post("address", url, json=data)
 
         return self._handle_response(response)
@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .wallet_cache import WalletCache
+
+
+class BalanceLedger:
+    """
+    A local copy of the wallet's spendable balances per coin, in base
+    units (stroops).
+
+    The balances of every coin are refreshed from a single wallet request.
+    The amounts of the payouts in flight are reserved and the sent ones
+    debited locally, apart from the refreshed balances, so payouts that
+    can't be covered are detected without calling BitGo. A debit is kept
+    until a refresh started after it, whose balances account for it.
+
+    :param wallet_cache: The :class:`WalletCache` of the wallet.
+    :param max_age: The number of seconds before the balances are
+    refreshed from BitGo.
+    """
+
+    def __init__(self, wallet_cache: WalletCache, max_age: float = 60):
+        self.wallet_cache = wallet_cache
+        self.max_age = max_age
+
+        self._balances: Dict[str, int] = {}
+        self._reserved: Dict[str, int] = {}
+        self._debits: List[Tuple[float, str, int]] = []
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Refreshes the balances of every coin from the wallet's
+        ``spendableBalanceString`` values. The reservations are kept, and
+        the debits made before the refresh started are dropped.
+        """
+        started_at = time.monotonic()
+        self.wallet_cache.refresh()
+        balances = {
+            coin: asset_wallet.spendable_balance
+            for coin, asset_wallet in self.wallet_cache.get_asset_wallets().items()
+        }
+
+        with self._lock:
+            self._balances = balances
+            self._debits = [debit for debit in self._debits if debit[0] >= started_at]
+            self._refreshed_at = started_at
+
+    def get_balance(self, coin: str) -> int:
+        """
+        Gets the coin's spendable balance, refreshing the balances if
+        they are older than ``max_age``.
+
+        :param coin: The BitGo's coin, like ``txlm`` or ``txlm:CODE-ISSUER``.
+        :return: Returns the spendable balance in base units, less the
+        reserved and debited amounts. It's zero for the coins the wallet
+        doesn't hold.
+        """
+        if self._is_stale():
+            self.refresh()
+        with self._lock:
+            return self._get_available(coin)
+
+    def reserve(self, coin: str, amount: int) -> bool:
+        """
+        Reserves the amount if the coin's balance covers it, as a single
+        step, so concurrent payouts can't all be covered by the same
+        balance. The amount is released if the payout isn't sent, or
+        debited once it's sent.
+
+        :param coin: The BitGo's coin.
+        :param amount: The amount in base units.
+        :return: Returns ``True`` if the amount was reserved, ``False``
+        otherwise.
+        """
+        if self._is_stale():
+            self.refresh()
+        with self._lock:
+            if self._get_available(coin) < amount:
+                return False
+            self._reserved[coin] = self._reserved.get(coin, 0) + amount
+            return True
+
+    def release(self, coin: str, amount: int):
+        """
+        Releases a reserved amount that wasn't sent.
+
+        :param coin: The BitGo's coin.
+        :param amount: The amount in base units.
+        """
+        with self._lock:
+            self._reserved[coin] = self._reserved.get(coin, 0) - amount
+
+    def debit(self, coin: str, amount: int):
+        """
+        Releases a reserved amount that was sent, and debits it from the
+        coin's balance until the next refresh.
+
+        :param coin: The BitGo's coin.
+        :param amount: The amount in base units.
+        """
+        with self._lock:
+            self._reserved[coin] = self._reserved.get(coin, 0) - amount
+            self._debits.append((time.monotonic(), coin, amount))
+
+    def _get_available(self, coin: str) -> int:
+        debited = sum(
+            amount for _, debit_coin, amount in self._debits if debit_coin == coin
+        )
+        return self._balances.get(coin, 0) - self._reserved.get(coin, 0) - debited
+
+    def _is_stale(self) -> bool:
+        with self._lock:
+            return (
+                self._refreshed_at is None
+                or time.monotonic() - self._refreshed_at > self.max_age
+            )
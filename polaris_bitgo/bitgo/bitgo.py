@@ -1,21 +1,64 @@
 import json
-from typing import Optional
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
 
 from polaris import settings as polaris_settings
 from polaris.utils import get_account_obj
-from stellar_sdk import Keypair
+from requests import Session
+from requests.exceptions import RequestException
+from rest_framework import status
+from stellar_sdk import Asset, Claimant, Keypair, TransactionBuilder
 from stellar_sdk.account import Account
+from stellar_sdk.client.requests_client import RequestsClient
+from stellar_sdk.operation import Operation
+from stellar_sdk.server import Server
 from stellar_sdk.transaction_envelope import TransactionEnvelope
 
+from polaris_bitgo.helpers.caching import RecordCache
+from polaris_bitgo.helpers.exceptions import BitGoAPIError
+from polaris_bitgo.helpers.hedging import RequestHedger
+from polaris_bitgo.helpers.metrics import Metrics
+from polaris_bitgo.helpers.rate_limiting import RateLimiter
+from polaris_bitgo.helpers.tracing import Tracer, get_tracer, traced
 from .api import BitGoAPI
-from .dtos import Recipient, Wallet
+from .fees import FeePolicy
+from .dtos import (
+    BuildResponse,
+    Recipient,
+    SendResponse,
+    Transfer,
+    Wallet,
+    WalletKey,
+    WalletResponse,
+)
+from .signing import sign_envelope_xdr
 from .utils import SJCL
 
 CONFIRMED_STATUS = "confirmed"
 FAILED_STATUS = "failed"
+NOT_FOUND_STATUS = status.HTTP_404_NOT_FOUND
+# The seconds a locally built claimable balance transaction is valid for.
+CLAIMABLE_BALANCE_TIMEOUT = 300
 
 
 class BitGo:
+    """
+    Builds, signs and sends the transactions of a BitGo's wallet and asset.
+
+    It's safe to share between threads: the wallet is only set when it's
+    created, and the signer, the only state loaded lazily, is derived under
+    a lock.
+
+    :param session: The :class:`requests.Session` used for BitGo's API,
+    shared by the clients of the same wallet. A new one is created by
+    default.
+    :param record_cache: The :class:`RecordCache` of the transfers in a
+    final state, if any.
+    :param rate_limiter: The :class:`RateLimiter` of BitGo's API requests,
+    if any.
+    """
+
     def __init__(
         self,
         asset_code: str = "XLM",
@@ -25,7 +68,15 @@ class BitGo:
         wallet_id: str = "",
         api_url: str = "https://app.bitgo-test.com",
         stellar_coin_code: str = "txlm",
+        hedger: Optional[RequestHedger] = None,
+        wallet: Optional[Wallet] = None,
+        metrics: Optional[Metrics] = None,
+        tracer: Optional[Tracer] = None,
+        session: Optional[Session] = None,
+        record_cache: Optional[RecordCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
+        self.tracer = get_tracer(tracer)
         self.bitgo_api = BitGoAPI(
             asset_code=asset_code,
             asset_issuer=asset_issuer,
@@ -34,35 +85,118 @@ class BitGo:
             api_passphrase=api_passphrase,
             wallet_id=wallet_id,
             stellar_coin_code=stellar_coin_code,
+            hedger=hedger,
+            metrics=metrics,
+            session=session,
+            record_cache=record_cache,
+            rate_limiter=rate_limiter,
         )
         self.asset_code = asset_code
         self.asset_issuer = asset_issuer
 
-        wallet = self.bitgo_api.get_wallet()
-        self.wallet = Wallet(
-            public_key=wallet.get("coinSpecific", {}).get("rootAddress"),
-            keys=wallet.get("keys", []),
-        )
+        self._signer: Optional[Keypair] = None
+        self._signer_lock = threading.Lock()
 
-        self.wallet.encrypted_private_key = self.bitgo_api.get_wallet_key_info(
-            self.wallet
-        ).get("encryptedPrv")
+        if wallet:
+            self.wallet = wallet
+            return
 
-    def build_transaction(self, recipient: Recipient) -> TransactionEnvelope:
+        wallet = WalletResponse.from_json(self.bitgo_api.get_wallet())
+        self.wallet = Wallet(public_key=wallet.public_key, keys=wallet.keys)
+
+        self.wallet.encrypted_private_key = WalletKey.from_json(
+            self.bitgo_api.get_wallet_key_info(self.wallet)
+        ).encrypted_private_key
+
+    def build_transaction(
+        self, recipient: Recipient, fee_policy: Optional[FeePolicy] = None
+    ) -> TransactionEnvelope:
         """
         Create a :class:`TransactionEnvelope` based on the "txBase64"
         field returned by BitGo's API build transaction.
 
         :param recipient: The :class:`Recipient` object with the
         amount (XDR Amount) and the destination address.
+        :param fee_policy: The :class:`FeePolicy` of the fee requested
+        from BitGo. By default BitGo chooses it.
         :return: A new :class:`TransactionEnvelope` object.
         """
-        response_data = self.bitgo_api.build_transaction(recipient)
         return TransactionEnvelope.from_xdr(
-            response_data["txBase64"],
+            self.build_transaction_xdr(recipient, fee_policy),
             polaris_settings.STELLAR_NETWORK_PASSPHRASE,
         )
 
+    @traced("bitgo.build_transaction")
+    def build_transaction_xdr(
+        self, recipient: Recipient, fee_policy: Optional[FeePolicy] = None
+    ) -> str:
+        """
+        Builds the transaction with BitGo's API, without decoding it.
+
+        :param recipient: The :class:`Recipient` object with the
+        amount (XDR Amount) and the destination address.
+        :param fee_policy: The :class:`FeePolicy` of the fee requested
+        from BitGo. By default BitGo chooses it.
+        :return: Returns the base64 XDR of the transaction envelope.
+        """
+        fee = fee_policy.get_fee() if fee_policy else None
+        if fee is not None:
+            self.tracer.set_attribute("stellar.base_fee", fee)
+        return BuildResponse.from_json(
+            self.bitgo_api.build_transaction(recipient, fee=fee)
+        ).tx_base64
+
+    @traced("bitgo.build_claimable_balance_transaction")
+    def build_claimable_balance_transaction(
+        self,
+        recipient: Recipient,
+        fee_policy: Optional[FeePolicy] = None,
+        horizon_client: Optional[RequestsClient] = None,
+        timeout: int = CLAIMABLE_BALANCE_TIMEOUT,
+    ) -> TransactionEnvelope:
+        """
+        Create a :class:`TransactionEnvelope` that sends the amount to
+        the recipient as a claimable balance.
+
+        BitGo's API build transaction only supports payment operations,
+        so the transaction is built locally, using the wallet's account
+        as the source account. It still must be signed and sent to
+        BitGo, which adds its signature and submits it.
+
+        The transaction uses the account's next sequence number, so the
+        caller must not build another transaction from the wallet's account
+        until it's confirmed. It's only valid for ``timeout`` seconds, so a
+        transaction that isn't submitted doesn't hold the sequence number.
+
+        :param recipient: The :class:`Recipient` object with the
+        amount (XDR Amount) and the destination address.
+        :param fee_policy: The :class:`FeePolicy` of the transaction's
+        fee. By default the Horizon's base fee is used.
+        :param horizon_client: The Horizon :class:`RequestsClient` the
+        account and the base fee are fetched with. By default Polaris'
+        Horizon server is used.
+        :param timeout: The seconds the transaction is valid for.
+        :return: A new :class:`TransactionEnvelope` object.
+        """
+        server = (
+            Server(horizon_url=polaris_settings.HORIZON_URI, client=horizon_client)
+            if horizon_client
+            else polaris_settings.HORIZON_SERVER
+        )
+        builder = TransactionBuilder(
+            source_account=self.get_source_account(server),
+            network_passphrase=polaris_settings.STELLAR_NETWORK_PASSPHRASE,
+            base_fee=fee_policy.get_fee() if fee_policy else server.fetch_base_fee(),
+        )
+        builder.append_create_claimable_balance_op(
+            asset=Asset(code=self.asset_code, issuer=self.asset_issuer),
+            amount=Operation.from_xdr_amount(int(recipient.amount)),
+            claimants=[Claimant(destination=recipient.address)],
+        )
+        builder.set_timeout(timeout)
+        return builder.build()
+
+    @traced("bitgo.sign_transaction")
     def sign_transaction(
         self, transaction_envelope: TransactionEnvelope
     ) -> TransactionEnvelope:
@@ -73,24 +207,176 @@ class BitGo:
         going to be signed by the Anchor's BitGo wallet.
         :return: Returns the received TransactionEnvelope signed.
         """
-        keypair = Keypair.from_secret(self._decrypt_private_key())
-        transaction_envelope.sign(keypair)
+        transaction_envelope.sign(self.get_signer())
 
         return transaction_envelope
 
-    def send_transaction(self, transaction_envelope_xdr: str) -> str:
+    @traced("bitgo.sign_transaction")
+    def sign_transaction_xdr(
+        self, transaction_envelope_xdr: str, validate: bool = False
+    ) -> str:
+        """
+        Adds the Anchor's BitGo wallet signature to the envelope's XDR,
+        appending it to the envelope's bytes instead of decoding and
+        encoding the whole envelope.
+
+        :param transaction_envelope_xdr: The base64 XDR of the envelope
+        that is going to be signed by the Anchor's BitGo wallet.
+        :param validate: Whether to decode the signed envelope and verify
+        the signature.
+        :return: Returns the base64 XDR of the signed envelope.
+        """
+        return sign_envelope_xdr(
+            transaction_envelope_xdr,
+            self.get_signer(),
+            polaris_settings.STELLAR_NETWORK_PASSPHRASE,
+            validate=validate,
+        )
+
+    def get_signer(self) -> Keypair:
+        """
+        Gets the wallet's signer, decrypting the private key the first
+        time only, since its key derivation is the slowest step of a
+        payout.
+
+        :return: Returns the :class:`Keypair` of the wallet's user key.
+        """
+        with self._signer_lock:
+            if self._signer is None:
+                self._signer = Keypair.from_secret(self._decrypt_private_key())
+            return self._signer
+
+    def warm_up(self):
+        """
+        Opens the session's connection to BitGo and derives the signer, so
+        the first payout doesn't pay for the TLS handshake and the key
+        derivation.
+        """
+        self.bitgo_api.get_wallet()
+        self.get_signer()
+
+    def send_transaction(
+        self, transaction_envelope_xdr: str, sequence_id: Optional[str] = None
+    ) -> str:
+        """
+        Sends the transaction's XDR to BitGo. See
+        :meth:`send_transaction_response`.
+
+        :param transaction_envelope_xdr: The base64 string with
+        the transaction's information.
+        :param sequence_id: A unique id for the transfer.
+        :return: Returns the BitGo transfer id.
+        """
+        return self.send_transaction_response(
+            transaction_envelope_xdr, sequence_id
+        ).transfer_id
+
+    @traced("bitgo.send_transaction")
+    def send_transaction_response(
+        self, transaction_envelope_xdr: str, sequence_id: Optional[str] = None
+    ) -> SendResponse:
         """
         Sends the transaction's XDR to BitGo, which adds another
         signature to the transaction, then sends it to the
         Stellar Network.
 
+        When a sequence id is given and the request fails, BitGo is
+        checked for a transfer with that sequence id before giving up,
+        since the transaction may have been sent anyway. If there is
+        none and the request failed without a response, the
+        transaction is sent once more, and BitGo is checked again if
+        that request fails too.
+
         :param transaction_envelope_xdr: The base64 string with
         the transaction's information.
-        :return: Returns the BitGo transfer id.
+        :param sequence_id: A unique id for the transfer.
+        :return: Returns the :class:`SendResponse`, whose envelope signed
+        by BitGo is only set when the transfer was created by this call.
+        """
+        self.tracer.set_attribute("bitgo.sequence_id", sequence_id or "")
+        response = self._send_transaction(transaction_envelope_xdr, sequence_id)
+        self.tracer.set_attribute("bitgo.transfer_id", response.transfer_id)
+        return response
+
+    def _send_transaction(
+        self, transaction_envelope_xdr: str, sequence_id: Optional[str] = None
+    ) -> SendResponse:
+        try:
+            response = self.bitgo_api.send_transaction(
+                transaction_envelope_xdr, sequence_id
+            )
+        except BitGoAPIError:
+            transfer = self.get_transfer_by_sequence_id(sequence_id)
+            if not transfer:
+                raise
+            return SendResponse(transfer_id=transfer.id, txid=transfer.txid)
+        except RequestException:
+            if not sequence_id:
+                raise
+            transfer = self.get_transfer_by_sequence_id(sequence_id)
+            if transfer:
+                return SendResponse(transfer_id=transfer.id, txid=transfer.txid)
+            self.bitgo_api.metrics.increment_retries("send")
+            try:
+                response = self.bitgo_api.send_transaction(
+                    transaction_envelope_xdr, sequence_id
+                )
+            except (BitGoAPIError, RequestException):
+                # The first request may have created the transfer after
+                # it was looked up, so BitGo refuses its sequence id.
+                transfer = self.get_transfer_by_sequence_id(sequence_id)
+                if not transfer:
+                    raise
+                return SendResponse(transfer_id=transfer.id, txid=transfer.txid)
+        return SendResponse.from_json(response)
+
+    def get_transfer_by_sequence_id(
+        self, sequence_id: Optional[str]
+    ) -> Optional[Transfer]:
+        """
+        Gets the BitGo's transfer sent with the given sequence id.
+
+        :param sequence_id: The transfer sequence id.
+        :return: Returns the :class:`Transfer`, or ``None`` if there is no
+        transfer with the given sequence id.
+        """
+        if not sequence_id:
+            return None
+        try:
+            transfer = self.bitgo_api.get_transfer_by_sequence_id(sequence_id)
+        except BitGoAPIError as e:
+            if e.response is not None and e.response.status_code == NOT_FOUND_STATUS:
+                return None
+            raise
+        return Transfer.from_json(transfer) if transfer else None
+
+    def iter_transfer_pages(
+        self, transfer_type: Optional[str] = None, prev_id: Optional[str] = None
+    ) -> Iterator[List[Transfer]]:
         """
-        response = self.bitgo_api.send_transaction(transaction_envelope_xdr)
-        return response["transfer"]["id"]
+        Pages through the wallet's transfers, newest first. Only one page is
+        kept in memory at a time.
 
+        :param transfer_type: Filters the transfers by type, ``send`` or
+        ``receive``.
+        :param prev_id: The ``nextBatchPrevId`` of the page where the
+        iteration should start.
+        :return: Yields the transfers of each page.
+        """
+        while True:
+            response = self.bitgo_api.get_transfers(
+                transfer_type=transfer_type, prev_id=prev_id
+            )
+            yield [
+                Transfer.from_json(transfer)
+                for transfer in response.get("transfers", [])
+            ]
+
+            prev_id = response.get("nextBatchPrevId")
+            if not prev_id:
+                break
+
+    @traced("bitgo.decrypt_private_key")
     def _decrypt_private_key(self) -> str:
         """
         Decrypt the signer encrypted private key.
@@ -102,18 +388,26 @@ class BitGo:
 
         :return: Returns the wallet's private key.
         """
-        return SJCL().decrypt(
-            json.loads(self.wallet.encrypted_private_key),
-            self.bitgo_api.API_PASSPHRASE,
+        return (
+            SJCL()
+            .decrypt(
+                json.loads(self.wallet.encrypted_private_key),
+                self.bitgo_api.API_PASSPHRASE,
+            )
+            .decode()
         )
 
-    def get_source_account(self) -> Account:
+    def get_source_account(self, server: Optional[Server] = None) -> Account:
         """
         Retrieves an :class:`Account` object with the "source account"
         for the given Anchor's BitGo wallet public key.
 
+        :param server: The Horizon :class:`Server` the account is fetched
+        from. By default Polaris' Horizon server is used.
         :return: Returns a :class:`Account` object.
         """
+        if server:
+            return server.load_account(self.get_public_key())
         source_account, _ = get_account_obj(
             Keypair.from_public_key(self.get_public_key())
         )
@@ -128,17 +422,32 @@ class BitGo:
         """
         return self.wallet.public_key
 
-    def get_stellar_transaction_id(self, transaction_id: str) -> str:
+    @traced("bitgo.get_stellar_transaction_id")
+    def get_stellar_transaction_id(
+        self,
+        transaction_id: str,
+        on_unconfirmed: Optional[Callable[[float], None]] = None,
+    ) -> str:
         """
         Gets the Stellar Network's transaction id.
 
         :param: The BitGo's transfer id.
+        :param on_unconfirmed: Called with the seconds since the polling
+        started each time the transfer isn't confirmed yet, like the
+        :meth:`FeeBumper.watch` callback.
         :return: Returns a string containing the Stellar Network transaction id.
         """
-        while True:
-            response_data = self.bitgo_api.get_transfer_by_id(transaction_id)
-            if response_data.get("state") == FAILED_STATUS:
+        self.tracer.set_attribute("bitgo.transfer_id", transaction_id)
+        start = time.monotonic()
+        transfer = Transfer.from_json(self.bitgo_api.get_transfer_by_id(transaction_id))
+        while transfer.state != CONFIRMED_STATUS:
+            if transfer.state == FAILED_STATUS:
                 raise RuntimeError("BitGo failed to complete the transfer.")
-            if response_data.get("state") == CONFIRMED_STATUS:
-                break
-        return response_data.get("txid")
+            if on_unconfirmed:
+                on_unconfirmed(time.monotonic() - start)
+            self.bitgo_api.metrics.increment_retries("transfer")
+            transfer = Transfer.from_json(
+                self.bitgo_api.get_transfer_by_id(transaction_id)
+            )
+        self.tracer.set_attribute("stellar.transaction_id", transfer.txid)
+        return transfer.txid
@@ -1,15 +1,178 @@
+import dataclasses
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 
+def slotted(cls):
+    """
+    Recreates the dataclass with a ``__slots__`` of its fields, as
+    ``dataclass(slots=True)`` does since Python 3.10, so its instances
+    don't have a ``__dict__``.
+    """
+    field_names = tuple(f.name for f in dataclasses.fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names
+    for name in field_names + ("__dict__", "__weakref__"):
+        cls_dict.pop(name, None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+@slotted
 @dataclass
 class Recipient:
     amount: str
     address: str
 
 
+@slotted
 @dataclass
 class Wallet:
     public_key: str
     keys: List[str]
     encrypted_private_key: str = ""
+
+
+@slotted
+@dataclass
+class AssetWallet:
+    coin: str
+    public_key: str
+    keys: List[str]
+    spendable_balance: int
+    has_trustline: bool
+
+
+@slotted
+@dataclass
+class WalletResponse:
+    """
+    The fields used from the BitGo's wallet.
+    """
+
+    public_key: str
+    keys: List[str]
+    spendable_balance: int
+    token_balances: Dict[str, int]
+    trusted_tokens: Tuple[str, ...]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "WalletResponse":
+        coin_specific = data.get("coinSpecific", {})
+        return cls(
+            public_key=coin_specific.get("rootAddress"),
+            keys=data.get("keys", []),
+            spendable_balance=int(data.get("spendableBalanceString", 0)),
+            token_balances={
+                coin: int(token.get("spendableBalanceString", 0))
+                for coin, token in data.get("tokens", {}).items()
+            },
+            trusted_tokens=tuple(
+                trusted_token.get("token")
+                for trusted_token in coin_specific.get("trustedTokens", [])
+            ),
+        )
+
+
+@slotted
+@dataclass
+class WalletKey:
+    """
+    The fields used from a BitGo's wallet key.
+    """
+
+    id: str
+    source: str
+    encrypted_private_key: Optional[str]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "WalletKey":
+        return cls(
+            id=data.get("id"),
+            source=data.get("source"),
+            encrypted_private_key=data.get("encryptedPrv"),
+        )
+
+
+@slotted
+@dataclass
+class BuildResponse:
+    """
+    The transaction built by BitGo.
+    """
+
+    tx_base64: str
+
+    @classmethod
+    def from_json(cls, data: dict) -> "BuildResponse":
+        return cls(tx_base64=data["txBase64"])
+
+
+@slotted
+@dataclass
+class SendResponse:
+    """
+    The transfer created by sending a transaction to BitGo, and the
+    envelope signed by BitGo too, when it's returned.
+    """
+
+    transfer_id: str
+    txid: Optional[str]
+    tx: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, data: dict) -> "SendResponse":
+        return cls(
+            transfer_id=data["transfer"]["id"],
+            txid=data.get("txid"),
+            tx=data.get("tx"),
+        )
+
+
+@slotted
+@dataclass
+class TransferEntry:
+    address: str
+    value: int
+
+
+@slotted
+@dataclass
+class Transfer:
+    """
+    The fields used from a BitGo's transfer. The rest of the transfer
+    isn't kept, so large pages of transfers can be held in memory.
+    """
+
+    id: str
+    state: Optional[str]
+    type: Optional[str]
+    txid: Optional[str]
+    sequence_id: Optional[str]
+    date: Optional[str]
+    value: int
+    """The transfer's value in base units, negative for sent transfers"""
+    entries: Tuple[TransferEntry, ...]
+    memo_type: Optional[str]
+    memo_value: Optional[str]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Transfer":
+        memo = data.get("coinSpecific", {}).get("memo") or {}
+        return cls(
+            id=data.get("id"),
+            state=data.get("state"),
+            type=data.get("type"),
+            txid=data.get("txid"),
+            sequence_id=data.get("sequenceId"),
+            date=data.get("date"),
+            value=int(data.get("baseValueString", data.get("valueString", 0))),
+            entries=tuple(
+                TransferEntry(
+                    address=entry.get("address", ""),
+                    value=int(entry.get("valueString", entry.get("value", 0))),
+                )
+                for entry in data.get("entries", [])
+            ),
+            memo_type=memo.get("type"),
+            memo_value=memo.get("value"),
+        )
@@ -0,0 +1,248 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from polaris import settings as polaris_settings
+from polaris.utils import get_logger
+from stellar_sdk import Keypair, TransactionBuilder
+from stellar_sdk.client.requests_client import RequestsClient
+from stellar_sdk.exceptions import BaseRequestError
+from stellar_sdk.server import Server
+from stellar_sdk.transaction_envelope import TransactionEnvelope
+
+from polaris_bitgo.utils import create_stellar_sdk_request_client
+
+logger = get_logger(__name__)
+
+# The Stellar Network's minimum fee per operation, in stroops.
+MIN_BASE_FEE = 100
+# A fee-bump replaces a transaction waiting in a validator's queue only when
+# its fee per operation is at least ten times the one it replaces.
+FEE_BUMP_REPLACEMENT_MULTIPLIER = 10
+
+
+class FeePolicy:
+    """
+    Chooses the fee per operation of the payouts from Horizon's
+    ``fee_stats``: a percentile of the fees charged in the last ledgers,
+    a higher one when the ledgers are close to full.
+
+    The stats are cached for about a ledger's close time, so the payouts
+    built in the same ledger make one request. It's safe to share between
+    threads.
+
+    :param percentile: The percentile of the fees charged used normally,
+    one of Horizon's ``p10`` to ``p99``.
+    :param congested_percentile: The percentile used when the ledgers are
+    congested.
+    :param congestion_threshold: The ``ledger_capacity_usage``, from 0 to
+    1, above which the ledgers are congested.
+    :param max_fee: The highest fee per operation, in stroops, the policy
+    chooses.
+    :param max_age: The seconds the stats are cached.
+    :param horizon_client: The Horizon :class:`RequestsClient`. The
+    integration's one is used by default.
+    """
+
+    def __init__(
+        self,
+        percentile: int = 50,
+        congested_percentile: int = 95,
+        congestion_threshold: float = 0.9,
+        max_fee: int = 10_000,
+        max_age: float = 5,
+        horizon_client: Optional[RequestsClient] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_fee < MIN_BASE_FEE:
+            raise ValueError(f"The max fee must be at least {MIN_BASE_FEE} stroops.")
+
+        self.percentile = percentile
+        self.congested_percentile = congested_percentile
+        self.congestion_threshold = congestion_threshold
+        self.max_fee = max_fee
+        self.max_age = max_age
+        self.horizon_client = horizon_client
+        self._clock = clock
+
+        self._fee_stats: Optional[dict] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_fee(self) -> int:
+        """
+        Gets the fee per operation for a transaction sent now.
+
+        :return: Returns the fee per operation, in stroops.
+        """
+        fee_stats = self.get_fee_stats()
+        percentile = (
+            self.congested_percentile
+            if self.is_congested(fee_stats)
+            else self.percentile
+        )
+        fee = max(
+            int(fee_stats["fee_charged"][f"p{percentile}"]),
+            int(fee_stats.get("last_ledger_base_fee", MIN_BASE_FEE)),
+        )
+        return min(fee, self.max_fee)
+
+    def is_congested(self, fee_stats: Optional[dict] = None) -> bool:
+        """
+        Checks if the last ledgers were close to full.
+
+        :param fee_stats: The Horizon's ``fee_stats``. Fetched by default.
+        :return: Returns ``True`` if the ledgers are congested.
+        """
+        fee_stats = fee_stats or self.get_fee_stats()
+        return float(fee_stats["ledger_capacity_usage"]) >= self.congestion_threshold
+
+    def get_fee_stats(self) -> dict:
+        """
+        Gets the Horizon's ``fee_stats``, fetching them once per ledger.
+
+        :return: Returns the ``fee_stats`` response.
+        """
+        with self._lock:
+            if (
+                self._fee_stats is None
+                or self._clock() - self._fetched_at >= self.max_age
+            ):
+                self._fee_stats = self._fetch_fee_stats()
+                self._fetched_at = self._clock()
+            return self._fee_stats
+
+    def _fetch_fee_stats(self) -> dict:
+        if self.horizon_client is None:
+            self.horizon_client = create_stellar_sdk_request_client()
+        server = Server(
+            horizon_url=polaris_settings.HORIZON_URI, client=self.horizon_client
+        )
+        return server.fee_stats().call()
+
+
+class FeeBumper:
+    """
+    Resubmits the payouts that stay unconfirmed wrapped in a fee-bump
+    transaction, paid by a fee account, so they are included in a ledger
+    when the fee BitGo built them with was outbid.
+
+    The fee-bump wraps the envelope signed by the wallet and BitGo, so the
+    inner transaction and its hash, the one BitGo's transfer tracks, don't
+    change. Each bump pays at least ten times the previous fee, the least
+    a validator accepts to replace a queued transaction, up to the policy's
+    max fee.
+
+    :param fee_account_secret: The secret seed of the account paying the
+    fee-bumps. It needs an XLM balance, but no sequence number is used.
+    :param fee_policy: The :class:`FeePolicy` of the fee-bumps.
+    :param stuck_after: The seconds a payout stays unconfirmed before each
+    bump.
+    :param max_bumps: The fee-bumps sent for a payout.
+    :param horizon_client: The Horizon :class:`RequestsClient` the
+    fee-bumps are submitted with. The integration's one is used by default.
+    """
+
+    def __init__(
+        self,
+        fee_account_secret: str,
+        fee_policy: Optional[FeePolicy] = None,
+        stuck_after: float = 30,
+        max_bumps: int = 2,
+        horizon_client: Optional[RequestsClient] = None,
+    ):
+        if stuck_after <= 0:
+            raise ValueError("The stuck timeout must be positive.")
+
+        self.fee_account = Keypair.from_secret(fee_account_secret)
+        self.fee_policy = fee_policy or FeePolicy(horizon_client=horizon_client)
+        self.stuck_after = stuck_after
+        self.max_bumps = max_bumps
+        self.horizon_client = horizon_client
+
+    def watch(self, envelope_xdr: str) -> Callable[[float], None]:
+        """
+        Creates the callback of a payout's confirmation polling that bumps
+        its fee each time it stays unconfirmed for ``stuck_after`` seconds.
+
+        :param envelope_xdr: The base64 XDR of the envelope signed by the
+        wallet and BitGo.
+        :return: Returns a callback of the seconds since the payout was sent.
+        """
+        bumps = 0
+        base_fee = 0
+
+        def on_unconfirmed(elapsed: float):
+            nonlocal bumps, base_fee
+            if bumps >= self.max_bumps or elapsed < self.stuck_after * (bumps + 1):
+                return
+            if base_fee >= self.fee_policy.max_fee:
+                return
+            bumps += 1
+            base_fee = self.bump(envelope_xdr, base_fee) or base_fee
+
+        return on_unconfirmed
+
+    def bump(self, envelope_xdr: str, previous_base_fee: int = 0) -> Optional[int]:
+        """
+        Submits the envelope wrapped in a fee-bump transaction. A failed
+        submission is logged, since the inner transaction may be confirmed
+        anyway.
+
+        :param envelope_xdr: The base64 XDR of the envelope signed by the
+        wallet and BitGo.
+        :param previous_base_fee: The fee per operation of the previous
+        fee-bump of the envelope, if any.
+        :return: Returns the fee-bump's fee per operation, or ``None`` if
+        it wasn't accepted.
+        """
+        network_passphrase = polaris_settings.STELLAR_NETWORK_PASSPHRASE
+        inner_envelope = TransactionEnvelope.from_xdr(envelope_xdr, network_passphrase)
+        base_fee = self.get_base_fee(inner_envelope, previous_base_fee)
+        fee_bump_envelope = TransactionBuilder.build_fee_bump_transaction(
+            fee_source=self.fee_account,
+            base_fee=base_fee,
+            inner_transaction_envelope=inner_envelope,
+            network_passphrase=network_passphrase,
+        )
+        fee_bump_envelope.sign(self.fee_account)
+
+        server = Server(
+            horizon_url=polaris_settings.HORIZON_URI,
+            client=self.horizon_client or self.fee_policy.horizon_client,
+        )
+        try:
+            server.submit_transaction(fee_bump_envelope)
+        except BaseRequestError as e:
+            logger.warning(
+                f"failed to fee-bump the transaction {inner_envelope.hash_hex()} "
+                f"with a fee of {base_fee}: {e}"
+            )
+            return None
+        logger.info(
+            f"fee-bumped the transaction {inner_envelope.hash_hex()} "
+            f"with a fee of {base_fee}"
+        )
+        return base_fee
+
+    def get_base_fee(
+        self, inner_envelope: TransactionEnvelope, previous_base_fee: int = 0
+    ) -> int:
+        """
+        Gets the fee per operation of the envelope's fee-bump: the policy's
+        fee, raised to the least that replaces the queued transaction, and
+        capped to the policy's max fee.
+
+        :param inner_envelope: The envelope signed by the wallet and BitGo.
+        :param previous_base_fee: The fee per operation of the previous
+        fee-bump of the envelope, if any.
+        :return: Returns the fee per operation, in stroops.
+        """
+        transaction = inner_envelope.transaction
+        inner_base_fee = transaction.fee // len(transaction.operations)
+        replaced_base_fee = max(inner_base_fee, previous_base_fee)
+        base_fee = max(
+            self.fee_policy.get_fee(),
+            replaced_base_fee * FEE_BUMP_REPLACEMENT_MULTIPLIER,
+        )
+        return max(min(base_fee, self.fee_policy.max_fee), inner_base_fee)
@@ -1,20 +1,57 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from decimal import Decimal
-from typing import Union
+from typing import Callable, Dict, List, Optional, Union
 
+from django.db import transaction as db_transaction
 from polaris import settings as polaris_settings
 from polaris.integrations import CustodyIntegration
 from polaris.models import Asset, Transaction
 from polaris.utils import get_logger, memo_hex_to_base64
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from rest_framework.request import Request
+from stellar_sdk.client.requests_client import RequestsClient
 from stellar_sdk.exceptions import NotFoundError
-from stellar_sdk.operation import Operation
+from stellar_sdk.operation import CreateAccount, Operation
+from stellar_sdk.server import Server
 
 from . import BitGo
-from .bitgo import Recipient
-from polaris_bitgo.utils import get_stellar_network_transaction_info
+from .address_pool import AddressPool
+from .api import BitGoAPI
+from .bitgo import FAILED_STATUS, Recipient
+from .dtos import SendResponse
+from .fees import FeeBumper, FeePolicy
+from .sharding import (
+    ROUND_ROBIN,
+    WalletConfig,
+    WalletLock,
+    WalletRouter,
+    WalletShard,
+)
+from polaris_bitgo.helpers.caching import RecordCache
+from polaris_bitgo.helpers.exceptions import (
+    BitGoInsufficientBalance,
+    BitGoMissingTrustline,
+)
+from polaris_bitgo.helpers.hedging import RequestHedger
+from polaris_bitgo.helpers.metrics import Metrics, get_metrics
+from polaris_bitgo.helpers.profiling import SlowCallDetector, monitored
+from polaris_bitgo.helpers.rate_limiting import RateLimiter
+from polaris_bitgo.helpers.tracing import Tracer, get_tracer, traced
+from polaris_bitgo.models import BitGoTransfer
+from polaris_bitgo.utils import (
+    create_stellar_sdk_request_client,
+    get_padded_hex_memo,
+    get_stellar_network_transaction_info,
+    get_transaction_envelope,
+    unwrap_fee_bump_transaction,
+)
 
 logger = get_logger(__name__)
 
+CREATE_ACCOUNT_SEQUENCE_ID_SUFFIX = "create-account"
+
 
 class BitGoIntegration(CustodyIntegration):
     def __init__(
@@ -25,6 +62,24 @@ class BitGoIntegration(CustodyIntegration):
         api_url: str = "https://app.bitgo-test.com",
         stellar_coin_code: str = "txlm",
         num_retries: int = 5,
+        hedger: Optional[RequestHedger] = None,
+        use_address_pool: bool = False,
+        check_balance: bool = False,
+        balance_max_age: float = 60,
+        wallets: Optional[List[WalletConfig]] = None,
+        routing_policy: str = ROUND_ROBIN,
+        metrics: Optional[Metrics] = None,
+        tracer: Optional[Tracer] = None,
+        slow_call_detector: Optional[SlowCallDetector] = None,
+        max_concurrent_payouts_per_wallet: Optional[int] = 1,
+        validate_signed_envelopes: bool = False,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        record_cache: Optional[RecordCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        http_adapter: Optional[HTTPAdapter] = None,
+        horizon_client: Optional[RequestsClient] = None,
+        fee_policy: Optional[FeePolicy] = None,
+        fee_bumper: Optional[FeeBumper] = None,
     ):
 
         if not api_key:
@@ -42,19 +97,80 @@ class BitGoIntegration(CustodyIntegration):
         self.api_url = api_url
         self.stellar_coin_code = stellar_coin_code
         self.num_retries = num_retries
+        self.hedger = hedger
+        self.metrics = get_metrics(metrics)
+        self.tracer = get_tracer(tracer)
+        self.slow_call_detector = slow_call_detector
+        self.validate_signed_envelopes = validate_signed_envelopes
+        self.record_cache = record_cache
+        self.rate_limiter = rate_limiter
+        self.pool_maxsize = pool_maxsize
+        self.horizon_client = horizon_client or create_stellar_sdk_request_client(
+            num_retries, self.metrics, pool_maxsize
+        )
+        self.fee_policy = fee_policy
+        self.fee_bumper = fee_bumper
+        # The fee stats and the fee-bumps are requested from the integration's
+        # Horizon client, unless they have their own.
+        fee_clients = [fee_policy]
+        if fee_bumper:
+            fee_clients += [fee_bumper, fee_bumper.fee_policy]
+        for fee_client in fee_clients:
+            if fee_client and fee_client.horizon_client is None:
+                fee_client.horizon_client = self.horizon_client
+
+        wallet_configs = [WalletConfig(wallet_id, api_passphrase, api_key)]
+        wallet_configs += wallets or []
+        self.shards = [
+            WalletShard(
+                api_key=config.api_key or api_key,
+                api_passphrase=config.api_passphrase,
+                wallet_id=config.wallet_id,
+                api_url=api_url,
+                stellar_coin_code=stellar_coin_code,
+                hedger=hedger,
+                check_balance=check_balance,
+                balance_max_age=balance_max_age,
+                metrics=self.metrics,
+                tracer=self.tracer,
+                max_concurrent_payouts=max_concurrent_payouts_per_wallet,
+                pool_maxsize=pool_maxsize,
+                record_cache=record_cache,
+                rate_limiter=rate_limiter,
+                http_adapter=http_adapter,
+            )
+            for config in wallet_configs
+        ]
+        self.shards_by_wallet_id = {shard.wallet_id: shard for shard in self.shards}
+        self.router = WalletRouter(self.shards, routing_policy)
+
+        self.wallet_cache = self.shards[0].wallet_cache
+        self.address_pool = (
+            AddressPool(self._create_bitgo_api()) if use_address_pool else None
+        )
 
+    @monitored
     def get_distribution_account(self, asset: Asset) -> str:
         """
         Return the Stellar account used to receive payments of `asset`. This
         method is a replacement for the ``Asset.distribution_account`` property
         which is derived from the ``Asset.distribution_seed`` database column.
 
+        The wallet's information is cached for every asset, so it is fetched
+        from BitGo only once.
+
+        It's always the main wallet's account, even when payouts are sent
+        from other wallets, since Polaris also lists it in the SEP-1 TOML
+        and watches it for payments. Polaris' ``process_pending_deposits``
+        locks the deposits by this account, so it sends them one at a time
+        whatever wallet they are routed to; use the payout queue to send
+        them from the wallets concurrently.
+
         :param asset: the asset sent in payments to the returned Stellar account
         """
-        bitgo = self._create_integration_from_asset(asset)
-
-        return bitgo.get_public_key()
+        return self.wallet_cache.get_asset_wallet(self._get_coin(asset)).public_key
 
+    @monitored
     def save_receiving_account_and_memo(
         self, request: Request, transaction: Transaction
     ):
@@ -81,19 +197,140 @@ class BitGoIntegration(CustodyIntegration):
         provider that does not guarantee that the account provided will be the
         account provided for future transactions.
 
+        When the address pool is used, an address created ahead of time on
+        BitGo is claimed from the database instead.
+
         :param request: the request that initiated the call to this function
         :param transaction: the transaction a Stellar account and memo must be
             saved to
         """
-        padded_hex_memo = "0" * (64 - len(transaction.id.hex)) + transaction.id.hex
+        if self.address_pool and self.address_pool.claim(transaction):
+            return
+
+        self._set_receiving_account_and_memo(transaction)
+        transaction.save()
+
+    @monitored
+    def save_receiving_accounts_and_memos(self, transactions: List[Transaction]):
+        """
+        Bulk version of ``save_receiving_account_and_memo``. Saves the
+        receiving account and memo of all the given transactions with a
+        single query.
+
+        :param transactions: the transactions a Stellar account and memo must
+            be saved to
+        """
+        if self.address_pool:
+            transactions = self.address_pool.claim_many(transactions)
+            if not transactions:
+                return
+
+        for transaction in transactions:
+            self._set_receiving_account_and_memo(transaction)
+        Transaction.objects.bulk_update(
+            transactions, ["receiving_anchor_account", "memo", "memo_type"]
+        )
+
+    def _set_receiving_account_and_memo(self, transaction: Transaction):
+        """
+        Sets the wallet's root address as the transaction's receiving account
+        and a hash memo based on the transaction's id.
 
-        bitgo = self._create_integration_from_asset(transaction.asset)
+        :param transaction: the transaction a Stellar account and memo must be
+            set to
+        """
+        padded_hex_memo = get_padded_hex_memo(transaction.id)
 
-        transaction.receiving_anchor_account = bitgo.get_public_key()
+        transaction.receiving_anchor_account = self.wallet_cache.get_public_key()
         transaction.memo = memo_hex_to_base64(padded_hex_memo)
         transaction.memo_type = Transaction.MEMO_TYPES.hash
-        transaction.save()
 
+    def _create_bitgo_api(self) -> BitGoAPI:
+        """
+        Creates :class:`BitGoAPI` instance for the main wallet's native asset.
+
+        :returns: Returns a :class:`BitGoAPI` instance.
+        """
+        return self.shards[0].create_bitgo_api()
+
+    def get_wallet_metrics(self) -> Dict[str, dict]:
+        """
+        Gets the payout metrics of each wallet.
+
+        :returns: Returns a dict of the wallet id to its metrics.
+        """
+        return {shard.wallet_id: shard.get_metrics() for shard in self.shards}
+
+    def lock_wallets(self, owner: str, lease_duration: float = 60):
+        """
+        Holds each wallet across processes while a payout is sent from it,
+        so the workers sending payouts from other hosts don't build
+        transactions from the same account at the same time.
+
+        :param owner: Identifies the worker in the wallets' leases.
+        :param lease_duration: The seconds a wallet is held without
+        renewing its lease with :meth:`renew_wallet_locks`.
+        """
+        for shard in self.shards:
+            shard.wallet_lock = WalletLock(shard.wallet_id, owner, lease_duration)
+
+    def renew_wallet_locks(self) -> int:
+        """
+        Extends the leases of the wallets held by the payouts in flight.
+
+        :returns: Returns the number of leases renewed.
+        """
+        return sum(
+            shard.wallet_lock.renew() for shard in self.shards if shard.wallet_lock
+        )
+
+    def warm_up(
+        self, assets: Optional[List[Asset]] = None, max_workers: int = 8
+    ) -> Dict[str, Optional[Exception]]:
+        """
+        Creates and caches the :class:`BitGo` client of every wallet and
+        asset, opens their connections to BitGo and Horizon and derives
+        their signers in parallel, so the first payout after a deploy has
+        the steady-state latency.
+
+        :param assets: The assets warmed up. Defaults to every Polaris asset.
+        :param max_workers: The number of threads warming up the clients.
+        :returns: Returns a dict of each warmed up client, as
+        ``<wallet id>/<coin>``, and of ``horizon`` to the exception it
+        raised, or ``None`` if it succeeded.
+        """
+        if assets is None:
+            assets = list(Asset.objects.all())
+
+        def warm_up_client(shard: WalletShard, asset: Asset):
+            shard.get_client(asset).warm_up()
+
+        def warm_up_horizon():
+            Server(
+                horizon_url=polaris_settings.HORIZON_URI, client=self.horizon_client
+            ).root().call()
+
+        tasks = {"horizon": (warm_up_horizon,)}
+        for shard in self.shards:
+            for asset in assets:
+                tasks[f"{shard.wallet_id}/{shard.get_coin(asset)}"] = (
+                    warm_up_client,
+                    shard,
+                    asset,
+                )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {name: executor.submit(*task) for name, task in tasks.items()}
+
+        results = {}
+        for name, future in futures.items():
+            results[name] = future.exception()
+            if results[name]:
+                logger.warning(f"failed to warm up {name}: {results[name]}")
+        return results
+
+    @monitored
+    @traced("polaris_bitgo.create_destination_account")
     def create_destination_account(self, transaction: Transaction) -> dict:
         """
         Creates the destination account of the transaction.
@@ -101,74 +338,398 @@ class BitGoIntegration(CustodyIntegration):
         amount of XLM on its balance.
         Read more at: https://developers.stellar.org/docs/glossary/accounts/#account-creation
 
+        When the deposit is of the native asset, the account is funded with the
+        starting balance plus the deposit amount, settling the deposit in the
+        same transaction. The Stellar transaction id is saved to
+        ``Transaction.stellar_transaction_id`` so ``submit_deposit_transaction``
+        does not send the payment again.
+
         :param transaction: A :class:`Transaction` instance containing all the transaction information.
-        :returns: Returns a tuple with the :class:`Account` object based on
-        the destination account's public key and a `True` value.
+        :returns: Returns the transaction's information at Stellar Network.
         """
+        self.tracer.set_attribute("polaris.transaction_id", str(transaction.id))
+        amount = Decimal(polaris_settings.ACCOUNT_STARTING_BALANCE)
+        is_native_deposit = self._is_native_asset(transaction.asset)
+        if is_native_deposit:
+            amount += self._get_deposit_amount(transaction)
+
         recipient = self._create_recipient(
             address=transaction.to_address,
-            amount=polaris_settings.ACCOUNT_STARTING_BALANCE,
+            amount=amount,
         )
+        native_asset = Asset(code="XLM", issuer=None)
+        sequence_id = self._get_sequence_id(
+            transaction, CREATE_ACCOUNT_SEQUENCE_ID_SUFFIX
+        )
+        with self._time_stage("route"):
+            shard = self._get_shard(transaction, native_asset, recipient, sequence_id)
+
+        with shard.track_payout(shard.get_coin(native_asset), int(recipient.amount)):
+            with self._reserve_balance(shard, native_asset, recipient):
+                with self._time_stage("build"):
+                    bitgo = self._create_integration_from_asset(native_asset, shard)
+                    envelope_xdr = bitgo.build_transaction_xdr(
+                        recipient, self.fee_policy
+                    )
+                with self._time_stage("sign"):
+                    signed_envelope_xdr = bitgo.sign_transaction_xdr(
+                        envelope_xdr, validate=self.validate_signed_envelopes
+                    )
+                with self._time_stage("send"):
+                    send_response = bitgo.send_transaction_response(
+                        signed_envelope_xdr, sequence_id
+                    )
+            transfer_id = send_response.transfer_id
+            self._save_transfer_id(sequence_id, transfer_id)
+            with self._time_stage("confirm"):
+                stellar_transaction_id = bitgo.get_stellar_transaction_id(
+                    transfer_id, self._watch_fee(send_response)
+                )
+        with self._time_stage("horizon"):
+            transaction_info = self._poll_stellar_transaction_information(
+                stellar_transaction_id
+            )
 
-        bitgo = self._create_integration_from_asset(Asset(code="XLM", issuer=None))
-
-        envelope = bitgo.build_transaction(recipient)
-        signed_envelope = bitgo.sign_transaction(envelope)
+        if is_native_deposit:
+            transaction.stellar_transaction_id = stellar_transaction_id
+            transaction.save()
 
-        transfer_id = bitgo.send_transaction(signed_envelope.to_xdr())
-        stellar_transaction_id = bitgo.get_stellar_transaction_id(transfer_id)
-        return self._poll_stellar_transaction_information(stellar_transaction_id)
+        return transaction_info
 
+    @monitored
+    @traced("polaris_bitgo.submit_deposit_transaction")
     def submit_deposit_transaction(
         self, transaction: Transaction, has_trustline: bool = True
     ) -> dict:
         """
         Sends the transaction to BitGo.
 
+        Native asset deposits already settled by ``create_destination_account``
+        are not sent again; the account creation transaction's information is
+        returned instead.
+
         :param transaction: The transaction model instance
         :param has_trustline: whether or not the destination
-        account has a trustline for the requested asset
+        account has a trustline for the requested asset. If it doesn't,
+        the amount is sent as a claimable balance.
         :returns: Returns the transaction's information at Stellar
         Network.
         """
-        bitgo = self._create_integration_from_asset(transaction.asset)
-
-        amount = round(
-            Decimal(transaction.amount_in) - Decimal(transaction.amount_fee),
-            transaction.asset.significant_decimals,
-        )
+        self.tracer.set_attribute("polaris.transaction_id", str(transaction.id))
+        if (
+            self._is_native_asset(transaction.asset)
+            and transaction.stellar_transaction_id
+        ):
+            transaction_info = self._poll_stellar_transaction_information(
+                transaction.stellar_transaction_id
+            )
+            if self._is_destination_account_funding(
+                transaction_info, transaction.to_address
+            ):
+                return transaction_info
 
         recipient = self._create_recipient(
             address=transaction.to_address,
-            amount=amount,
+            amount=self._get_deposit_amount(transaction),
         )
+        sequence_id = self._get_sequence_id(transaction)
+        with self._time_stage("route"):
+            shard = self._get_shard(
+                transaction, transaction.asset, recipient, sequence_id
+            )
+            self._check_trustline(shard, transaction.asset)
+
+        coin = shard.get_coin(transaction.asset)
+        # A claimable balance is built from the account's sequence number,
+        # so the other claimable balances of the wallet wait until it's
+        # confirmed.
+        with shard.track_payout(
+            coin, int(recipient.amount), holds_sequence=not has_trustline
+        ):
+            with self._reserve_balance(shard, transaction.asset, recipient):
+                with self._time_stage("build"):
+                    bitgo = self._create_integration_from_asset(
+                        transaction.asset, shard
+                    )
+                    if has_trustline:
+                        envelope_xdr = bitgo.build_transaction_xdr(
+                            recipient, self.fee_policy
+                        )
+                    else:
+                        envelope_xdr = bitgo.build_claimable_balance_transaction(
+                            recipient, self.fee_policy, self.horizon_client
+                        ).to_xdr()
+                with self._time_stage("sign"):
+                    signed_envelope_xdr = bitgo.sign_transaction_xdr(
+                        envelope_xdr, validate=self.validate_signed_envelopes
+                    )
+                with self._time_stage("send"):
+                    send_response = bitgo.send_transaction_response(
+                        signed_envelope_xdr, sequence_id
+                    )
+            transfer_id = send_response.transfer_id
+            self._save_transfer_id(sequence_id, transfer_id)
+            with self._time_stage("confirm"):
+                stellar_transaction_id = bitgo.get_stellar_transaction_id(
+                    transfer_id, self._watch_fee(send_response)
+                )
+        with self._time_stage("horizon"):
+            return self._poll_stellar_transaction_information(stellar_transaction_id)
+
+    def get_sent_deposit_transaction(self, transaction: Transaction) -> Optional[dict]:
+        """
+        Gets the deposit's payment if BitGo already sent it, like when the
+        worker sending it stopped before saving the result, so it isn't
+        built and sent again.
 
-        envelope = bitgo.build_transaction(recipient)
-        signed_envelope = bitgo.sign_transaction(envelope)
-
-        transfer_id = bitgo.send_transaction(signed_envelope.to_xdr())
-        stellar_transaction_id = bitgo.get_stellar_transaction_id(transfer_id)
+        :param transaction: The transaction model instance.
+        :returns: Returns the transaction's information at Stellar Network,
+        or ``None`` if BitGo has no transfer for the deposit or it failed.
+        """
+        sequence_id = self._get_sequence_id(transaction)
+        if len(self.shards) == 1:
+            shard = self.shards[0]
+        else:
+            routed_transfer = BitGoTransfer.objects.filter(
+                sequence_id=sequence_id
+            ).first()
+            if not routed_transfer:
+                return None
+            shard = self.shards_by_wallet_id[routed_transfer.wallet_id]
+
+        bitgo = self._create_integration_from_asset(transaction.asset, shard)
+        transfer = bitgo.get_transfer_by_sequence_id(sequence_id)
+        if not transfer or transfer.state == FAILED_STATUS:
+            return None
+        stellar_transaction_id = bitgo.get_stellar_transaction_id(transfer.id)
         return self._poll_stellar_transaction_information(stellar_transaction_id)
 
+    def _watch_fee(
+        self, send_response: SendResponse
+    ) -> Optional[Callable[[float], None]]:
+        """
+        Gets the callback of the transfer's confirmation polling that
+        fee-bumps it while it's stuck, when there is a :class:`FeeBumper`.
+
+        :param send_response: The :class:`SendResponse` of the transfer.
+        :returns: Returns the callback, or ``None`` if the transfer can't
+        be fee-bumped, since there is no envelope signed by BitGo.
+        """
+        if not self.fee_bumper or not send_response.tx:
+            return None
+        return self.fee_bumper.watch(send_response.tx)
+
+    @contextmanager
+    def _time_stage(self, stage: str):
+        """
+        Records the duration of a payout's stage in the metrics and in the
+        slow call detector.
+
+        :param stage: The stage's name.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            latency = time.monotonic() - start
+            self.metrics.observe_stage(stage, latency)
+            if self.slow_call_detector:
+                self.slow_call_detector.observe_stage(stage, latency)
+
+    @traced("polaris_bitgo.poll_stellar_transaction_information")
     def _poll_stellar_transaction_information(
         self, stellar_transaction_id: str
     ) -> dict:
         """
         Pooling the stellar network to get the transaction information.
         This method is used to retrieve the "envelope_xdr" and "paging_token"
-        since BitGo doesn't return these values
+        since BitGo doesn't return these values. The envelope of a
+        fee-bumped transaction is replaced with its inner envelope.
 
         :param stellar_transaction_id: The Stellar Network's transaction id.
         :returns: Returns the transaction's information.
         """
+        self.tracer.set_attribute("stellar.transaction_id", stellar_transaction_id)
         try:
-            return get_stellar_network_transaction_info(
-                stellar_transaction_id, num_retries=self.num_retries
+            transaction_info = get_stellar_network_transaction_info(
+                stellar_transaction_id,
+                num_retries=self.num_retries,
+                hedger=self.hedger,
+                metrics=self.metrics,
+                client=self.horizon_client,
+                record_cache=self.record_cache,
             )
         except NotFoundError:
             raise RuntimeError(
                 f"Error trying to retrieve transaction information. Transaction id: {stellar_transaction_id}"
             )
+        return unwrap_fee_bump_transaction(transaction_info)
+
+    def _get_shard(
+        self,
+        transaction: Transaction,
+        asset: Asset,
+        recipient: Recipient,
+        sequence_id: str,
+    ) -> WalletShard:
+        """
+        Gets the wallet that sends the transfer. With a single wallet it's
+        always the main one. Otherwise the wallet is selected by the routing
+        policy and saved with the transfer's sequence id, so a retry is sent
+        from the same wallet and BitGo still deduplicates it.
+
+        :param transaction: The transaction model instance.
+        :param asset: the asset sent in payments.
+        :param recipient: The :class:`Recipient` of the payment.
+        :param sequence_id: The BitGo's transfer sequence id.
+        :returns: Returns the :class:`WalletShard` that sends the transfer.
+        """
+        if len(self.shards) == 1:
+            return self.shards[0]
+
+        transfer = BitGoTransfer.objects.filter(sequence_id=sequence_id).first()
+        if not transfer:
+            shard = self.router.select(self._get_coin(asset), int(recipient.amount))
+            with db_transaction.atomic():
+                transfer, _ = BitGoTransfer.objects.get_or_create(
+                    sequence_id=sequence_id,
+                    defaults={"wallet_id": shard.wallet_id, "transaction": transaction},
+                )
+        return self.shards_by_wallet_id[transfer.wallet_id]
+
+    def _save_transfer_id(self, sequence_id: str, transfer_id: str):
+        """
+        Saves the BitGo's transfer id of a routed transfer.
+
+        :param sequence_id: The BitGo's transfer sequence id.
+        :param transfer_id: The BitGo's transfer id.
+        """
+        if len(self.shards) > 1:
+            BitGoTransfer.objects.filter(sequence_id=sequence_id).update(
+                transfer_id=transfer_id
+            )
+
+    @staticmethod
+    def _check_trustline(shard: WalletShard, asset: Asset):
+        """
+        Checks that the wallet trusts the asset before the payout is built,
+        since BitGo can't send an asset the wallet has no trustline for.
+        The wallet is fetched again when it has no trustline, in case it
+        was added since the wallet was cached.
+
+        :param shard: The :class:`WalletShard` that sends the payment.
+        :param asset: the asset sent in payments.
+        :raises BitGoMissingTrustline: If the wallet has no trustline for
+        the asset.
+        """
+        coin = shard.get_coin(asset)
+        if shard.wallet_cache.get_asset_wallet(coin).has_trustline:
+            return
+        shard.wallet_cache.refresh()
+        if not shard.wallet_cache.get_asset_wallet(coin).has_trustline:
+            raise BitGoMissingTrustline(
+                f"The BitGo's wallet {shard.wallet_id} has no trustline for {coin}."
+            )
+
+    @staticmethod
+    @contextmanager
+    def _reserve_balance(shard: WalletShard, asset: Asset, recipient: Recipient):
+        """
+        Reserves the recipient's amount from the wallet's cached spendable
+        balance, without calling BitGo, while the payout is built, signed
+        and sent. The amount is released if the payout isn't sent, and
+        debited otherwise. It's skipped when the integration doesn't check
+        balances.
+
+        :param shard: The :class:`WalletShard` that sends the payment.
+        :param asset: the asset sent in payments.
+        :param recipient: The :class:`Recipient` of the payment.
+        :raises BitGoInsufficientBalance: If the balance doesn't cover
+        the amount.
+        """
+        if not shard.balance_ledger:
+            yield
+            return
+        coin = shard.get_coin(asset)
+        amount = int(recipient.amount)
+        if not shard.balance_ledger.reserve(coin, amount):
+            raise BitGoInsufficientBalance(
+                f"The BitGo's wallet {shard.wallet_id} spendable balance of "
+                f"{coin} doesn't cover the amount {recipient.amount}."
+            )
+        try:
+            yield
+        except BaseException:
+            shard.balance_ledger.release(coin, amount)
+            raise
+        shard.balance_ledger.debit(coin, amount)
+
+    def _get_coin(self, asset: Asset) -> str:
+        """
+        Gets the BitGo's coin of the asset.
+
+        :param asset: the asset sent in payments.
+        :returns: Returns the coin, like ``txlm`` or ``txlm:CODE-ISSUER``.
+        """
+        return BitGoAPI.get_coin(self.stellar_coin_code, asset.code, asset.issuer)
+
+    @staticmethod
+    def _is_destination_account_funding(
+        transaction_info: dict, destination_address: str
+    ) -> bool:
+        """
+        Checks if the given Stellar Network transaction creates the
+        destination account.
+
+        :param transaction_info: The transaction's information at Stellar Network.
+        :param destination_address: The destination account public key.
+        :returns: Returns ``True`` if the transaction has a create account
+        operation for the destination account, ``False`` otherwise.
+        """
+        envelope = get_transaction_envelope(transaction_info["envelope_xdr"])
+        return any(
+            isinstance(operation, CreateAccount)
+            and operation.destination == destination_address
+            for operation in envelope.transaction.operations
+        )
+
+    @staticmethod
+    def _is_native_asset(asset: Asset) -> bool:
+        """
+        Checks if the asset is the Stellar Network native asset (XLM).
+
+        :param asset: the asset sent in payments.
+        :returns: Returns ``True`` for the native asset, ``False`` otherwise.
+        """
+        return not asset.issuer
+
+    @staticmethod
+    def _get_deposit_amount(transaction: Transaction) -> Decimal:
+        """
+        Calculates the amount that should be sent to the destination account.
+
+        :param transaction: The transaction model instance.
+        :returns: Returns the transaction's amount without the fee.
+        """
+        return round(
+            Decimal(transaction.amount_in) - Decimal(transaction.amount_fee),
+            transaction.asset.significant_decimals,
+        )
+
+    @staticmethod
+    def _get_sequence_id(transaction: Transaction, suffix: str = "") -> str:
+        """
+        Creates the BitGo's transfer sequence id for the transaction. The
+        same id is returned for every call with the same transaction, so
+        BitGo refuses to send a payment for the transaction twice.
+
+        :param transaction: The transaction model instance.
+        :param suffix: Distinguishes other transfers made for the same
+        transaction, like the destination account creation.
+        :returns: Returns the sequence id.
+        """
+        sequence_id = f"polaris-{transaction.id}"
+        return f"{sequence_id}-{suffix}" if suffix else sequence_id
 
     @staticmethod
     def _create_recipient(address: str, amount: Union[Decimal, str]) -> Recipient:
@@ -184,25 +745,20 @@ class BitGoIntegration(CustodyIntegration):
             address=address,
         )
 
+    @traced("polaris_bitgo.create_integration_from_asset")
     def _create_integration_from_asset(
-        self,
-        asset: Asset,
+        self, asset: Asset, shard: Optional[WalletShard] = None
     ) -> BitGo:
         """
-        Creates :class:`BitGo` instance.
+        Gets the :class:`BitGo` instance of the wallet, which is cached for
+        each asset.
 
         :param asset: the asset sent in payments.
+        :param shard: The :class:`WalletShard` of the wallet, the main
+        wallet by default.
         :returns: Returns a :class:`BitGo` instance.
         """
-        return BitGo(
-            asset_code=asset.code,
-            asset_issuer=asset.issuer,
-            api_key=self.api_key,
-            api_passphrase=self.api_passphrase,
-            wallet_id=self.wallet_id,
-            api_url=self.api_url,
-            stellar_coin_code=self.stellar_coin_code,
-        )
+        return (shard or self.shards[0]).get_client(asset)
 
     def requires_third_party_signatures(self, transaction: Transaction) -> bool:
         """
@@ -231,7 +787,7 @@ class BitGoIntegration(CustodyIntegration):
         Return ``True`` if the custody service provider supports sending deposit
         payments in the form of claimable balances, ``False`` otherwise.
         """
-        return False
+        return True
 
     @property
     def account_creation_supported(self) -> bool:
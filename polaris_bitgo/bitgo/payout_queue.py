@@ -0,0 +1,395 @@
+import os
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List, Optional, Set
+from uuid import uuid4
+
+from django.db import connections, transaction as db_transaction
+from django.db.models import F, Q
+from polaris.integrations import registered_deposit_integration as rdi
+from polaris.models import Transaction
+from polaris.utils import get_logger, maybe_make_callback
+
+from .integration import BitGoIntegration
+from polaris_bitgo.models import BitGoPayout
+from polaris_bitgo.utils import get_claimable_balance_id
+
+logger = get_logger(__name__)
+
+PAYOUT_QUEUE = "bitgo_payout_queue"
+VALID_DEPOSIT_STATUSES = [
+    Transaction.STATUS.pending_user_transfer_start,
+    Transaction.STATUS.pending_external,
+    Transaction.STATUS.pending_anchor,
+    Transaction.STATUS.pending_trust,
+]
+
+
+class PayoutQueue:
+    """
+    Sends the queued deposits from a thread pool, so the payouts wait on
+    their BitGo and Stellar confirmations at the same time instead of one
+    after the other.
+
+    Workers on any number of hosts share the queue: payouts are locked
+    with ``SELECT ... FOR UPDATE SKIP LOCKED``, so concurrent claims skip
+    each other's rows instead of waiting, and leased to the worker. The
+    leases of the payouts in flight are renewed by a heartbeat thread, so
+    the payouts of a worker that stopped are claimed again once their
+    lease expires. A payout claimed again is first looked up on BitGo by
+    its sequence id, and only sent if BitGo doesn't have it.
+
+    A wallet sends one payout at a time across all the workers: it's held
+    with a leased :class:`BitGoWalletLock` row from building the payout's
+    transaction until BitGo confirms it, so two workers don't build
+    transactions with the same account sequence number. The workers scale
+    with the number of wallets, and the integration's
+    ``max_concurrent_payouts_per_wallet`` limits each worker's threads.
+
+    :param integration: The :class:`BitGoIntegration` that sends the payouts.
+    :param max_workers: The number of payouts in flight. It can't be more
+    than the integration's ``pool_maxsize``, so the payouts don't wait for
+    a connection to BitGo or Horizon.
+    :param lease_duration: The seconds a worker holds a payout without
+    renewing its lease.
+    :param worker_id: Identifies the worker in the leases. Defaults to the
+    host name and process id.
+    """
+
+    def __init__(
+        self,
+        integration: BitGoIntegration,
+        max_workers: int = 8,
+        lease_duration: float = 60,
+        worker_id: Optional[str] = None,
+    ):
+        if max_workers < 1:
+            raise ValueError("The number of workers must be positive.")
+        if lease_duration <= 0:
+            raise ValueError("The lease duration must be positive.")
+        if max_workers > integration.pool_maxsize:
+            raise ValueError(
+                f"The number of workers ({max_workers}) is higher than the "
+                f"integration's pool_maxsize ({integration.pool_maxsize})."
+            )
+
+        self.integration = integration
+        self.max_workers = max_workers
+        self.lease_duration = timedelta(seconds=lease_duration)
+        self.worker_id = (
+            worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        )
+
+        self._in_flight: Set[int] = set()
+        self._in_flight_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        integration.lock_wallets(self.worker_id, lease_duration)
+
+    @staticmethod
+    def enqueue(transaction: Transaction, has_trustline: bool = True) -> BitGoPayout:
+        """
+        Queues the deposit to be sent. A failed payout is queued again.
+
+        The deposit is saved as ``pending_anchor`` in the payout queue, so
+        Polaris' ``process_pending_deposits`` no longer polls it as a
+        pending deposit nor submits it.
+
+        :param transaction: The deposit, whose destination account exists.
+        :param has_trustline: Whether the destination account trusts the
+        asset, otherwise the amount is sent as a claimable balance.
+        :return: Returns the deposit's :class:`BitGoPayout`.
+        """
+        with db_transaction.atomic():
+            payout, created = BitGoPayout.objects.get_or_create(
+                transaction=transaction, defaults={"has_trustline": has_trustline}
+            )
+            if not created and payout.status != BitGoPayout.Status.FAILED:
+                return payout
+            if not created:
+                payout.status = BitGoPayout.Status.PENDING
+                payout.has_trustline = has_trustline
+                payout.save(update_fields=["status", "has_trustline"])
+
+            transaction.status = Transaction.STATUS.pending_anchor
+            transaction.submission_status = Transaction.SUBMISSION_STATUS.ready
+            transaction.queue = PAYOUT_QUEUE
+            transaction.queued_at = datetime.now(timezone.utc)
+            transaction.save()
+        return payout
+
+    def claim(self, limit: int) -> List[BitGoPayout]:
+        """
+        Claims the oldest pending payouts and the payouts whose lease
+        expired, leasing them to the worker.
+
+        :param limit: The maximum number of payouts claimed.
+        :return: Returns the claimed payouts, with their transactions.
+        """
+        if limit < 1:
+            return []
+
+        now = datetime.now(timezone.utc)
+        lease_expires_at = now + self.lease_duration
+        claimable = Q(status=BitGoPayout.Status.PENDING) | Q(
+            status=BitGoPayout.Status.PROCESSING, lease_expires_at__lt=now
+        )
+        with db_transaction.atomic():
+            payout_ids = list(
+                BitGoPayout.objects.select_for_update(skip_locked=True)
+                .filter(claimable)
+                .order_by("created_at")
+                .values_list("id", flat=True)[:limit]
+            )
+            # The condition is checked again for the databases without
+            # row locks, where another worker may have claimed the rows.
+            BitGoPayout.objects.filter(claimable, id__in=payout_ids).update(
+                status=BitGoPayout.Status.PROCESSING,
+                started_at=now,
+                attempts=F("attempts") + 1,
+                lease_owner=self.worker_id,
+                lease_expires_at=lease_expires_at,
+            )
+
+        return list(
+            BitGoPayout.objects.filter(
+                id__in=payout_ids,
+                lease_owner=self.worker_id,
+                lease_expires_at=lease_expires_at,
+            )
+            .select_related("transaction", "transaction__asset")
+            .order_by("created_at")
+        )
+
+    def renew_leases(self) -> int:
+        """
+        Extends the leases of the payouts in flight.
+
+        :return: Returns the number of leases renewed.
+        """
+        with self._in_flight_lock:
+            payout_ids = list(self._in_flight)
+        if not payout_ids:
+            return 0
+        return BitGoPayout.objects.filter(
+            id__in=payout_ids,
+            status=BitGoPayout.Status.PROCESSING,
+            lease_owner=self.worker_id,
+        ).update(lease_expires_at=datetime.now(timezone.utc) + self.lease_duration)
+
+    def process(self, payout: BitGoPayout):
+        """
+        Sends the payout's deposit and saves its result on the Polaris
+        transaction, as Polaris' ``process_pending_deposits`` does. The
+        payout fails without changing the transaction if the deposit isn't
+        pending anymore, like when it was completed by Polaris.
+
+        :param payout: A claimed payout.
+        """
+        transaction = payout.transaction
+        if transaction.status not in VALID_DEPOSIT_STATUSES:
+            self._handle_invalid_status(payout)
+            return
+
+        transaction.status = Transaction.STATUS.pending_anchor
+        transaction.submission_status = Transaction.SUBMISSION_STATUS.processing
+        transaction.save()
+
+        try:
+            transaction_json = None
+            if payout.attempts > 1:
+                transaction_json = self.integration.get_sent_deposit_transaction(
+                    transaction
+                )
+            if transaction_json:
+                logger.info(f"transaction {transaction.id} was already sent")
+            else:
+                transaction_json = self.integration.submit_deposit_transaction(
+                    transaction, has_trustline=payout.has_trustline
+                )
+        except Exception as e:
+            logger.exception(f"payout of transaction {transaction.id} failed")
+            self._handle_error(payout, f"{e.__class__.__name__}: {e}")
+            return
+
+        if not transaction_json.get("successful", True):
+            self._handle_error(
+                payout,
+                "transaction submission failed unexpectedly: "
+                f"{transaction_json.get('result_xdr')}",
+            )
+            return
+        self._handle_success(payout, transaction_json)
+
+    def run(self, loop: bool = False, interval: float = 1):
+        """
+        Claims and sends the payouts, keeping up to ``max_workers`` of them
+        in flight.
+
+        :param loop: Whether to keep waiting for new payouts. Otherwise it
+        returns once the queue is empty.
+        :param interval: The seconds between claims while the queue is empty.
+        """
+        self._stopped.clear()
+        heartbeat_stopped = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(heartbeat_stopped,),
+            name="polaris-bitgo-payout-heartbeat",
+            daemon=True,
+        )
+        heartbeat.start()
+        try:
+            self._run(loop, interval)
+        finally:
+            heartbeat_stopped.set()
+            heartbeat.join()
+
+    def _run(self, loop: bool, interval: float):
+        futures: Set[Future] = set()
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="polaris-bitgo-payout"
+        ) as executor:
+            while not self._stopped.is_set():
+                futures = {future for future in futures if not future.done()}
+                payouts = self.claim(self.max_workers - len(futures))
+                for payout in payouts:
+                    with self._in_flight_lock:
+                        self._in_flight.add(payout.id)
+                    futures.add(executor.submit(self._process_in_thread, payout))
+
+                if payouts:
+                    continue
+                if not futures and not loop:
+                    break
+                if futures:
+                    wait(futures, timeout=interval, return_when=FIRST_COMPLETED)
+                else:
+                    self._stopped.wait(interval)
+
+    def stop(self):
+        """
+        Stops claiming payouts. The payouts in flight are completed, and
+        their leases renewed until then.
+        """
+        self._stopped.set()
+
+    def _process_in_thread(self, payout: BitGoPayout):
+        try:
+            self.process(payout)
+        except Exception:
+            logger.exception(f"failed to process the payout {payout.id}")
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(payout.id)
+            connections.close_all()
+
+    def _heartbeat(self, stopped: threading.Event):
+        interval = self.lease_duration.total_seconds() / 3
+        try:
+            while not stopped.wait(interval):
+                try:
+                    self.renew_leases()
+                    self.integration.renew_wallet_locks()
+                except Exception:
+                    logger.exception("failed to renew the payouts' leases")
+        finally:
+            connections.close_all()
+
+    def _handle_success(self, payout: BitGoPayout, transaction_json: dict):
+        transaction = payout.transaction
+        if not payout.has_trustline and transaction.claimable_balance_supported:
+            transaction.claimable_balance_id = get_claimable_balance_id(
+                transaction_json
+            )
+        transaction.paging_token = transaction_json.get("paging_token")
+        transaction.stellar_transaction_id = transaction_json.get("id")
+        transaction.status = Transaction.STATUS.completed
+        transaction.submission_status = Transaction.SUBMISSION_STATUS.completed
+        transaction.queue = None
+        transaction.completed_at = datetime.now(timezone.utc)
+        transaction.status_message = None
+        if not transaction.quote_id:
+            transaction.amount_out = round(
+                Decimal(transaction.amount_in) - Decimal(transaction.amount_fee),
+                transaction.asset.significant_decimals,
+            )
+        if not self._save_result(
+            payout,
+            transaction,
+            BitGoPayout.Status.COMPLETED,
+            completed_at=transaction.completed_at,
+        ):
+            return
+        logger.info(f"deposit transaction: {transaction.id} successful")
+
+        maybe_make_callback(transaction)
+        try:
+            rdi.after_deposit(transaction=transaction)
+        except NotImplementedError:
+            pass
+        except Exception:
+            logger.exception("after_deposit() threw an unexpected exception")
+
+    def _handle_error(self, payout: BitGoPayout, message: str):
+        transaction = payout.transaction
+        transaction.status = Transaction.STATUS.error
+        transaction.submission_status = Transaction.SUBMISSION_STATUS.failed
+        transaction.status_message = message
+        transaction.queue = None
+        if self._save_result(
+            payout, transaction, BitGoPayout.Status.FAILED, error=message
+        ):
+            maybe_make_callback(transaction)
+
+    def _handle_invalid_status(self, payout: BitGoPayout):
+        transaction = payout.transaction
+        message = (
+            f"Unexpected transaction status: {transaction.status}, expecting "
+            f"{' or '.join(VALID_DEPOSIT_STATUSES)}."
+        )
+        logger.warning(f"payout of transaction {transaction.id} skipped: {message}")
+        self._save_result(payout, None, BitGoPayout.Status.FAILED, error=message)
+
+    def _save_result(
+        self,
+        payout: BitGoPayout,
+        transaction: Optional[Transaction],
+        status: str,
+        error: Optional[str] = None,
+        completed_at: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Saves the payout's result, and its transaction if any, only while
+        the worker still holds the payout's lease. A worker whose lease
+        expired and was claimed by another one must not overwrite the new
+        owner's result.
+
+        :return: Returns ``True`` if the result was saved.
+        """
+        fields = {
+            "status": status,
+            "error": error,
+            "lease_owner": None,
+            "lease_expires_at": None,
+        }
+        if completed_at:
+            fields["completed_at"] = completed_at
+        with db_transaction.atomic():
+            updated = BitGoPayout.objects.filter(
+                id=payout.id, lease_owner=self.worker_id
+            ).update(**fields)
+            if not updated:
+                logger.warning(
+                    f"the lease of the payout {payout.id} was lost, "
+                    "its result isn't saved"
+                )
+                return False
+            if transaction:
+                transaction.save()
+        for name, value in fields.items():
+            setattr(payout, name, value)
+        return True
@@ -0,0 +1,319 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from uuid import UUID
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from polaris.models import Transaction
+from stellar_sdk.operation import Operation
+
+from .bitgo import BitGo, CONFIRMED_STATUS, FAILED_STATUS
+from .dtos import Transfer
+from .watcher import IncomingTransferWatcher, MEMO_ID_SEPARATOR
+from polaris_bitgo.models import BitGoAddress, BitGoTransfer
+from polaris_bitgo.utils import get_transaction_id_from_hex_memo
+
+SEQUENCE_ID_PREFIX = "polaris-"
+CREATE_ACCOUNT_SEQUENCE_ID_SUFFIX = "-create-account"
+REJECTED_STATUS = "rejected"
+
+TRANSFER_WITHOUT_TRANSACTION = "transfer_without_transaction"
+TRANSACTION_WITHOUT_TRANSFER = "transaction_without_transfer"
+AMOUNT_MISMATCH = "amount_mismatch"
+STATUS_MISMATCH = "status_mismatch"
+
+DEPOSIT_KINDS = [Transaction.KIND.deposit]
+WITHDRAWAL_KINDS = [Transaction.KIND.withdrawal, Transaction.KIND.send]
+UNPAID_WITHDRAWAL_STATUSES = [
+    Transaction.STATUS.incomplete,
+    Transaction.STATUS.pending_user_transfer_start,
+    Transaction.STATUS.error,
+]
+TRANSACTION_FIELDS = [
+    "id",
+    "kind",
+    "status",
+    "stellar_transaction_id",
+    "amount_in",
+    "amount_out",
+    "amount_fee",
+]
+
+
+class Reconciler:
+    """
+    Reconciles the Polaris transactions against the BitGo's transfers.
+
+    The transfers are streamed page by page and each page is joined to
+    the transactions with a bounded number of queries, by the Stellar
+    transaction id, the sequence id sent by the integration and the memo.
+    The ids of the seen transfers are kept as 64 bits prefixes in an
+    array, 8 bytes each, so the completed transactions are then streamed
+    in chunks and checked for a missing transfer. Only the transactions
+    of the clients' assets are checked, and the deposits routed to a
+    wallet without a client are skipped, since their transfers aren't
+    reconciled.
+
+    :param clients: The :class:`BitGo` instances of each wallet and asset.
+    :param chunk_size: The number of transactions fetched at a time.
+    :param since: Only the transfers and transactions created or
+    completed after it are reconciled. A naive datetime is taken as UTC.
+    """
+
+    def __init__(
+        self,
+        clients: List[BitGo],
+        chunk_size: int = 2000,
+        since: Optional[datetime] = None,
+    ):
+        self.clients = clients
+        self.chunk_size = chunk_size
+        if since and timezone.is_naive(since):
+            since = timezone.make_aware(since, timezone.utc)
+        self.since = since
+
+        self._txid_prefixes = array("Q")
+        self._transaction_id_prefixes = array("Q")
+
+    def reconcile(self) -> Iterator[dict]:
+        """
+        Reconciles the transfers of every client, then the transactions.
+
+        :return: Yields a dict for each mismatch.
+        """
+        for client in self.clients:
+            yield from self.reconcile_transfers(client)
+        yield from self.reconcile_transactions()
+
+    def reconcile_transfers(self, client: BitGo) -> Iterator[dict]:
+        """
+        Joins the client's transfers to the Polaris transactions.
+
+        :param client: The :class:`BitGo` instance of a wallet and asset.
+        :return: Yields a dict for each mismatch.
+        """
+        watcher = IncomingTransferWatcher(client)
+        for page in client.iter_transfer_pages():
+            transfers = [
+                transfer for transfer in page if not self._is_before_since(transfer)
+            ]
+            yield from self._reconcile_page(watcher, transfers)
+            if len(transfers) < len(page):
+                break
+
+    def reconcile_transactions(self) -> Iterator[dict]:
+        """
+        Streams the completed transactions and reports the ones that none
+        of the reconciled transfers paid.
+
+        :return: Yields a dict for each mismatch.
+        """
+        txid_prefixes = array("Q", sorted(self._txid_prefixes))
+        transaction_id_prefixes = array("Q", sorted(self._transaction_id_prefixes))
+
+        wallet_ids = {client.bitgo_api.WALLET_ID for client in self.clients}
+        transactions = (
+            Transaction.objects.filter(
+                self._get_assets_filter(),
+                kind__in=DEPOSIT_KINDS + WITHDRAWAL_KINDS,
+                status=Transaction.STATUS.completed,
+            )
+            .exclude(stellar_transaction_id__isnull=True)
+            .exclude(
+                id__in=BitGoTransfer.objects.exclude(wallet_id__in=wallet_ids).values(
+                    "transaction_id"
+                )
+            )
+        )
+        if self.since:
+            transactions = transactions.filter(completed_at__gte=self.since)
+
+        for transaction in transactions.only(*TRANSACTION_FIELDS).iterator(
+            chunk_size=self.chunk_size
+        ):
+            if self._contains(
+                txid_prefixes, self._get_txid_prefix(transaction.stellar_transaction_id)
+            ) or self._contains(transaction_id_prefixes, transaction.id.int >> 64):
+                continue
+            yield self._mismatch(TRANSACTION_WITHOUT_TRANSFER, transaction=transaction)
+
+    def _get_assets_filter(self) -> Q:
+        """
+        Gets the filter of the transactions of the clients' assets.
+        """
+        assets = {(client.asset_code, client.asset_issuer) for client in self.clients}
+        assets_filter = Q(pk__in=[])
+        for code, issuer in assets:
+            assets_filter |= Q(asset__code=code, asset__issuer=issuer)
+        return assets_filter
+
+    def _reconcile_page(
+        self, watcher: IncomingTransferWatcher, transfers: List[Transfer]
+    ) -> Iterator[dict]:
+        client = watcher.bitgo
+        transaction_ids = {
+            transfer.id: self._get_transaction_id(transfer) for transfer in transfers
+        }
+        addresses = {
+            transfer.id: self._get_pool_address(watcher, transfer)
+            for transfer in transfers
+        }
+        transaction_ids_by_address = dict(
+            BitGoAddress.objects.filter(
+                address__in=[a for a in addresses.values() if a],
+                transaction__isnull=False,
+            ).values_list("address", "transaction_id")
+        )
+        txids = [transfer.txid for transfer in transfers if transfer.txid]
+        ids = [i for i in transaction_ids.values() if i]
+        ids += transaction_ids_by_address.values()
+
+        transactions = list(
+            Transaction.objects.filter(
+                Q(stellar_transaction_id__in=txids) | Q(id__in=ids)
+            ).only(*TRANSACTION_FIELDS)
+        )
+        by_txid = {
+            t.stellar_transaction_id: t
+            for t in transactions
+            if t.stellar_transaction_id
+        }
+        by_id = {t.id: t for t in transactions}
+
+        for transfer in transfers:
+            if transfer.txid:
+                self._txid_prefixes.append(self._get_txid_prefix(transfer.txid))
+
+            transaction = (
+                by_txid.get(transfer.txid)
+                or by_id.get(transaction_ids[transfer.id])
+                or by_id.get(transaction_ids_by_address.get(addresses[transfer.id]))
+            )
+            if transaction:
+                if transfer.state == CONFIRMED_STATUS:
+                    self._transaction_id_prefixes.append(transaction.id.int >> 64)
+                yield from self._compare(client, transfer, transaction)
+            elif transfer.state == CONFIRMED_STATUS:
+                yield self._mismatch(
+                    TRANSFER_WITHOUT_TRANSACTION, client=client, transfer=transfer
+                )
+
+    def _compare(
+        self, client: BitGo, transfer: Transfer, transaction: Transaction
+    ) -> Iterator[dict]:
+        state = transfer.state
+        is_deposit = transaction.kind in DEPOSIT_KINDS
+        if state == CONFIRMED_STATUS and (
+            transaction.status != Transaction.STATUS.completed
+            if is_deposit
+            else transaction.status in UNPAID_WITHDRAWAL_STATUSES
+        ):
+            yield self._mismatch(STATUS_MISMATCH, client, transfer, transaction)
+        elif (
+            state in (FAILED_STATUS, REJECTED_STATUS)
+            and transaction.status == Transaction.STATUS.completed
+        ):
+            yield self._mismatch(STATUS_MISMATCH, client, transfer, transaction)
+
+        if state != CONFIRMED_STATUS or (transfer.sequence_id or "").endswith(
+            CREATE_ACCOUNT_SEQUENCE_ID_SUFFIX
+        ):
+            return
+        expected_amount = self._get_expected_amount(transaction)
+        if expected_amount is not None and expected_amount != self._get_amount(
+            transfer
+        ):
+            yield self._mismatch(
+                AMOUNT_MISMATCH,
+                client,
+                transfer,
+                transaction,
+                expected_amount=expected_amount,
+            )
+
+    def _is_before_since(self, transfer: Transfer) -> bool:
+        if not self.since or not transfer.date:
+            return False
+        date = parse_datetime(transfer.date)
+        return bool(date) and date < self.since
+
+    @staticmethod
+    def _get_transaction_id(transfer: Transfer) -> Optional[UUID]:
+        """
+        Gets the transaction id from the transfer's sequence id, sent by
+        the integration, or from its hash memo.
+        """
+        sequence_id = transfer.sequence_id or ""
+        if sequence_id.startswith(SEQUENCE_ID_PREFIX):
+            try:
+                return UUID(
+                    sequence_id[len(SEQUENCE_ID_PREFIX) :].replace(
+                        CREATE_ACCOUNT_SEQUENCE_ID_SUFFIX, ""
+                    )
+                )
+            except ValueError:
+                return None
+        hex_memo = IncomingTransferWatcher._get_hex_memo(transfer)
+        return hex_memo and get_transaction_id_from_hex_memo(hex_memo)
+
+    @staticmethod
+    def _get_pool_address(
+        watcher: IncomingTransferWatcher, transfer: Transfer
+    ) -> Optional[str]:
+        address = watcher._get_wallet_address(transfer)
+        return address if address and MEMO_ID_SEPARATOR in address else None
+
+    @staticmethod
+    def _get_expected_amount(transaction: Transaction) -> Optional[int]:
+        if transaction.kind in DEPOSIT_KINDS:
+            amount = transaction.amount_out
+            if amount is None and transaction.amount_in is not None:
+                amount = transaction.amount_in - (transaction.amount_fee or 0)
+        else:
+            amount = transaction.amount_in
+        return None if amount is None else Operation.to_xdr_amount(amount)
+
+    @staticmethod
+    def _get_amount(transfer: Transfer) -> int:
+        return abs(transfer.value)
+
+    @staticmethod
+    def _get_txid_prefix(txid: str) -> int:
+        return int(txid[:16], 16)
+
+    @staticmethod
+    def _contains(prefixes: List[int], prefix: int) -> bool:
+        index = bisect_left(prefixes, prefix)
+        return index < len(prefixes) and prefixes[index] == prefix
+
+    @staticmethod
+    def _mismatch(
+        mismatch_type: str,
+        client: Optional[BitGo] = None,
+        transfer: Optional[Transfer] = None,
+        transaction: Optional[Transaction] = None,
+        **details,
+    ) -> Dict:
+        mismatch = {"type": mismatch_type}
+        if client:
+            mismatch["wallet_id"] = client.bitgo_api.WALLET_ID
+            mismatch["coin"] = client.bitgo_api.COIN
+        if transfer:
+            mismatch.update(
+                transfer_id=transfer.id,
+                transfer_state=transfer.state,
+                txid=transfer.txid,
+                amount=Reconciler._get_amount(transfer),
+            )
+        if transaction:
+            mismatch.update(
+                transaction_id=str(transaction.id),
+                transaction_kind=transaction.kind,
+                transaction_status=transaction.status,
+                stellar_transaction_id=transaction.stellar_transaction_id,
+            )
+        mismatch.update(details)
+        return mismatch
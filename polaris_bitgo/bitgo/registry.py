@@ -0,0 +1,138 @@
+import threading
+from typing import Dict, List, Optional
+
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
+from .integration import BitGoIntegration
+from polaris_bitgo.helpers.exceptions import BitGoTenantNotFound
+from polaris_bitgo.helpers.metrics import Metrics
+from polaris_bitgo.helpers.rate_limiting import RateLimiter
+from polaris_bitgo.utils import create_stellar_sdk_request_client
+
+
+class IntegrationRegistry:
+    """
+    Hosts the :class:`BitGoIntegration` of several tenants, each with its
+    own BitGo's credentials and wallets, in one process.
+
+    The tenants share the connection pools, one per host, to BitGo and
+    Horizon, so the connections kept open don't grow with the number of
+    tenants. Everything else is the tenant's own: the API key is a header
+    of the tenant's sessions, and each tenant's clients derive and keep
+    their own signers. The requests of each tenant to BitGo can be limited
+    to a rate, so a busy tenant doesn't exhaust the shared pools or the
+    BitGo's API limits of the others.
+
+    :param pool_maxsize: The number of connections kept open to each host.
+    :param num_retries: The number of retries of the Horizon requests.
+    :param metrics: The :class:`Metrics` of the tenants that don't have
+    their own.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        num_retries: int = 5,
+        metrics: Optional[Metrics] = None,
+    ):
+        if pool_maxsize < 1:
+            raise ValueError("The pool size must be positive.")
+
+        self.pool_maxsize = pool_maxsize
+        self.num_retries = num_retries
+        self.metrics = metrics
+        self.http_adapter = HTTPAdapter(
+            pool_connections=DEFAULT_POOLSIZE, pool_maxsize=pool_maxsize
+        )
+        self.horizon_client = create_stellar_sdk_request_client(
+            num_retries, metrics, pool_maxsize
+        )
+
+        self._integrations: Dict[str, BitGoIntegration] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        tenant: str,
+        rate_limit: Optional[float] = None,
+        rate_limit_burst: Optional[int] = None,
+        **kwargs,
+    ) -> BitGoIntegration:
+        """
+        Creates the tenant's integration, sharing the registry's connection
+        pools.
+
+        :param tenant: The tenant's unique name.
+        :param rate_limit: The requests per second the tenant can make to
+        BitGo's API. By default they aren't limited.
+        :param rate_limit_burst: The requests the tenant can make at once
+        after an idle period. Defaults to one second of requests.
+        :param kwargs: The :class:`BitGoIntegration` arguments, like the
+        ``api_key``, ``api_passphrase`` and ``wallet_id``.
+        :return: Returns the tenant's :class:`BitGoIntegration`.
+        """
+        with self._lock:
+            if tenant in self._integrations:
+                raise ValueError(f"The tenant {tenant} is already registered.")
+
+        kwargs.setdefault("metrics", self.metrics)
+        kwargs.setdefault("num_retries", self.num_retries)
+        integration = BitGoIntegration(
+            pool_maxsize=self.pool_maxsize,
+            rate_limiter=(
+                RateLimiter(rate_limit, rate_limit_burst) if rate_limit else None
+            ),
+            http_adapter=self.http_adapter,
+            horizon_client=self.horizon_client,
+            **kwargs,
+        )
+        with self._lock:
+            if tenant in self._integrations:
+                raise ValueError(f"The tenant {tenant} is already registered.")
+            self._integrations[tenant] = integration
+        return integration
+
+    def unregister(self, tenant: str):
+        """
+        Removes the tenant's integration. The shared connections stay open.
+
+        :param tenant: The tenant's name.
+        """
+        with self._lock:
+            if self._integrations.pop(tenant, None) is None:
+                raise BitGoTenantNotFound(f"The tenant {tenant} isn't registered.")
+
+    def get(self, tenant: str) -> BitGoIntegration:
+        """
+        Gets the tenant's integration.
+
+        :param tenant: The tenant's name.
+        :return: Returns the tenant's :class:`BitGoIntegration`.
+        """
+        with self._lock:
+            integration = self._integrations.get(tenant)
+        if integration is None:
+            raise BitGoTenantNotFound(f"The tenant {tenant} isn't registered.")
+        return integration
+
+    def get_tenants(self) -> List[str]:
+        """
+        Gets the registered tenants.
+
+        :return: Returns the tenants' names.
+        """
+        with self._lock:
+            return list(self._integrations)
+
+    def get_wallet_metrics(self) -> Dict[str, Dict[str, dict]]:
+        """
+        Gets the payout metrics of each tenant's wallets.
+
+        :return: Returns a dict of the tenant's name to its wallet metrics.
+        """
+        with self._lock:
+            integrations = dict(self._integrations)
+        return {
+            tenant: integration.get_wallet_metrics()
+            for tenant, integration in integrations.items()
+        }
@@ -0,0 +1,397 @@
+import itertools
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from django.db.models import Q
+from polaris.models import Asset
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
+from .api import BitGoAPI, create_session
+from .balances import BalanceLedger
+from .bitgo import BitGo
+from .wallet_cache import WalletCache
+from polaris_bitgo.helpers.caching import RecordCache
+from polaris_bitgo.helpers.hedging import RequestHedger
+from polaris_bitgo.helpers.metrics import Metrics
+from polaris_bitgo.helpers.rate_limiting import RateLimiter
+from polaris_bitgo.helpers.tracing import Tracer
+from polaris_bitgo.models import BitGoWalletLock
+
+ROUND_ROBIN = "round_robin"
+LEAST_PENDING = "least_pending"
+BALANCE_AWARE = "balance_aware"
+ROUTING_POLICIES = (ROUND_ROBIN, LEAST_PENDING, BALANCE_AWARE)
+
+
+class WalletLock:
+    """
+    Holds a wallet across processes while a payout is sent from it, with a
+    leased :class:`BitGoWalletLock` row, so the payout queue's workers on
+    different hosts don't build transactions from the same account with
+    the same sequence number.
+
+    The lease is held from building the transaction until BitGo confirms
+    it, and renewed by the owner's heartbeat with :meth:`renew`. The
+    wallet of a worker that stopped is taken by another one once its lease
+    expires.
+
+    :param wallet_id: The BitGo's wallet id.
+    :param owner: Identifies the worker in the leases.
+    :param lease_duration: The seconds the wallet is held without renewing
+    the lease.
+    :param poll_interval: The seconds between attempts while the wallet is
+    held by another payout.
+    """
+
+    def __init__(
+        self,
+        wallet_id: str,
+        owner: str,
+        lease_duration: float = 60,
+        poll_interval: float = 0.1,
+    ):
+        self.wallet_id = wallet_id
+        self.owner = owner
+        self.lease_duration = timedelta(seconds=lease_duration)
+        self.poll_interval = poll_interval
+
+    @contextmanager
+    def hold(self):
+        """
+        Waits until the wallet is free and holds it.
+        """
+        token = f"{self.owner}:{uuid4().hex[:8]}"
+        BitGoWalletLock.objects.get_or_create(wallet_id=self.wallet_id)
+        while not self._acquire(token):
+            time.sleep(self.poll_interval)
+        try:
+            yield
+        finally:
+            BitGoWalletLock.objects.filter(
+                wallet_id=self.wallet_id, lock_owner=token
+            ).update(lock_owner=None, lock_expires_at=None)
+
+    def renew(self) -> int:
+        """
+        Extends the lease of the wallet while the owner holds it.
+
+        :returns: Returns the number of leases renewed.
+        """
+        return BitGoWalletLock.objects.filter(
+            wallet_id=self.wallet_id, lock_owner__startswith=f"{self.owner}:"
+        ).update(lock_expires_at=datetime.now(timezone.utc) + self.lease_duration)
+
+    def _acquire(self, token: str) -> bool:
+        now = datetime.now(timezone.utc)
+        free = Q(lock_owner__isnull=True) | Q(lock_expires_at__lt=now)
+        return bool(
+            BitGoWalletLock.objects.filter(free, wallet_id=self.wallet_id).update(
+                lock_owner=token, lock_expires_at=now + self.lease_duration
+            )
+        )
+
+
+@dataclass
+class WalletConfig:
+    wallet_id: str
+    api_passphrase: str
+    api_key: str = ""
+
+
+class WalletShard:
+    """
+    The state of one of the BitGo's wallets used to send payouts: its
+    cached clients, wallet information, balances and metrics.
+
+    The wallet's clients share a single :class:`requests.Session`, so the
+    connections to BitGo are pooled across assets and threads.
+
+    :param pool_maxsize: The number of connections to BitGo kept open.
+    :param record_cache: The :class:`RecordCache` of the transfers in a
+    final state, if any.
+    :param rate_limiter: The :class:`RateLimiter` of BitGo's API requests,
+    if any.
+    :param http_adapter: The :class:`HTTPAdapter` whose connection pools
+    are shared with other wallets. By default the wallet has its own.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_passphrase: str,
+        wallet_id: str,
+        api_url: str,
+        stellar_coin_code: str,
+        hedger: Optional[RequestHedger] = None,
+        check_balance: bool = False,
+        balance_max_age: float = 60,
+        metrics: Optional[Metrics] = None,
+        tracer: Optional[Tracer] = None,
+        max_concurrent_payouts: Optional[int] = None,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        record_cache: Optional[RecordCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        http_adapter: Optional[HTTPAdapter] = None,
+    ):
+        self.api_key = api_key
+        self.api_passphrase = api_passphrase
+        self.wallet_id = wallet_id
+        self.api_url = api_url
+        self.stellar_coin_code = stellar_coin_code
+        self.hedger = hedger
+        self.metrics = metrics
+        self.tracer = tracer
+        self.record_cache = record_cache
+        self.rate_limiter = rate_limiter
+        self.session = create_session(api_key, pool_maxsize, http_adapter)
+
+        self.wallet_cache = WalletCache(self.create_bitgo_api())
+        self.balance_ledger = (
+            BalanceLedger(self.wallet_cache, max_age=balance_max_age)
+            if check_balance
+            else None
+        )
+
+        self.pending = 0
+        self.sent = 0
+        self.failed = 0
+        self.amount_sent: Dict[str, int] = defaultdict(int)
+
+        self._clients: Dict[str, BitGo] = {}
+        # Set by the payout queue, whose workers may run on other hosts.
+        self.wallet_lock: Optional[WalletLock] = None
+
+        self._lock = threading.Lock()
+        self._max_concurrent_payouts = max_concurrent_payouts
+        # The payouts holding the wallet, shared by the payouts built by
+        # BitGo and exclusive for the ones built from the account's sequence.
+        self._payouts_condition = threading.Condition()
+        self._payouts_in_flight = 0
+        self._exclusive_payout = False
+        self._exclusive_payouts_waiting = 0
+
+    def create_bitgo_api(
+        self, asset_code: str = "XLM", asset_issuer: Optional[str] = None
+    ) -> BitGoAPI:
+        """
+        Creates :class:`BitGoAPI` instance for the wallet.
+
+        :param asset_code: The asset's code, the native asset by default.
+        :param asset_issuer: The asset's issuer.
+        :returns: Returns a :class:`BitGoAPI` instance.
+        """
+        return BitGoAPI(
+            asset_code=asset_code,
+            asset_issuer=asset_issuer,
+            api_key=self.api_key,
+            api_passphrase=self.api_passphrase,
+            wallet_id=self.wallet_id,
+            api_url=self.api_url,
+            stellar_coin_code=self.stellar_coin_code,
+            hedger=self.hedger,
+            metrics=self.metrics,
+            session=self.session,
+            record_cache=self.record_cache,
+            rate_limiter=self.rate_limiter,
+        )
+
+    def get_client(self, asset: Asset) -> BitGo:
+        """
+        Gets the :class:`BitGo` instance of the asset, creating it from
+        the cached wallet information the first time.
+
+        :param asset: the asset sent in payments.
+        :returns: Returns a :class:`BitGo` instance.
+        """
+        coin = self.get_coin(asset)
+        with self._lock:
+            client = self._clients.get(coin)
+        if client:
+            return client
+
+        client = BitGo(
+            asset_code=asset.code,
+            asset_issuer=asset.issuer,
+            api_key=self.api_key,
+            api_passphrase=self.api_passphrase,
+            wallet_id=self.wallet_id,
+            api_url=self.api_url,
+            stellar_coin_code=self.stellar_coin_code,
+            hedger=self.hedger,
+            wallet=self.wallet_cache.get_wallet(),
+            metrics=self.metrics,
+            tracer=self.tracer,
+            session=self.session,
+            record_cache=self.record_cache,
+            rate_limiter=self.rate_limiter,
+        )
+        with self._lock:
+            return self._clients.setdefault(coin, client)
+
+    def get_coin(self, asset: Asset) -> str:
+        """
+        Gets the BitGo's coin of the asset.
+
+        :param asset: the asset sent in payments.
+        :returns: Returns the coin, like ``txlm`` or ``txlm:CODE-ISSUER``.
+        """
+        return BitGoAPI.get_coin(self.stellar_coin_code, asset.code, asset.issuer)
+
+    def get_balance(self, coin: str) -> int:
+        """
+        Gets the wallet's spendable balance of the coin from the balance
+        ledger, which is refreshed from BitGo every ``balance_max_age``
+        seconds and reduced by the payouts in flight. The balances must be
+        checked.
+
+        :param coin: The BitGo's coin.
+        :returns: Returns the spendable balance in base units.
+        """
+        if not self.balance_ledger:
+            raise ValueError(
+                f"The balances of the wallet {self.wallet_id} aren't checked."
+            )
+        return self.balance_ledger.get_balance(coin)
+
+    @contextmanager
+    def track_payout(self, coin: str, amount: int, holds_sequence: bool = False):
+        """
+        Counts the payouts in flight, sent and failed, and the amount sent.
+        When the wallet's concurrent payouts are limited, it waits for a
+        free slot, held until the payout is confirmed, so the transactions
+        built from the wallet's account don't get the same sequence number.
+
+        A payout that holds the sequence waits until no other payout of the
+        wallet is in flight, and holds the wallet alone until it's
+        confirmed, whatever the limit. The payouts that don't hold the
+        sequence wait for it too.
+
+        When the wallet has a :attr:`wallet_lock`, the wallet is also held
+        across processes until the payout is confirmed.
+
+        :param coin: The BitGo's coin.
+        :param amount: The amount in base units.
+        :param holds_sequence: Whether the payout's transaction is built
+        locally from the account's sequence number, like the claimable
+        balances.
+        """
+        with self._lock:
+            self.pending += 1
+        with ExitStack() as stack:
+            stack.callback(self._untrack_payout)
+            self._acquire_wallet(holds_sequence)
+            stack.callback(self._release_wallet, holds_sequence)
+            if self.wallet_lock:
+                stack.enter_context(self.wallet_lock.hold())
+            try:
+                yield
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                raise
+            else:
+                with self._lock:
+                    self.sent += 1
+                    self.amount_sent[coin] += amount
+
+    def _untrack_payout(self):
+        with self._lock:
+            self.pending -= 1
+
+    def _acquire_wallet(self, exclusive: bool):
+        with self._payouts_condition:
+            if exclusive:
+                self._exclusive_payouts_waiting += 1
+                self._payouts_condition.wait_for(
+                    lambda: not self._exclusive_payout and not self._payouts_in_flight
+                )
+                self._exclusive_payouts_waiting -= 1
+                self._exclusive_payout = True
+            else:
+                self._payouts_condition.wait_for(
+                    lambda: not self._exclusive_payout
+                    and not self._exclusive_payouts_waiting
+                    and (
+                        not self._max_concurrent_payouts
+                        or self._payouts_in_flight < self._max_concurrent_payouts
+                    )
+                )
+            self._payouts_in_flight += 1
+
+    def _release_wallet(self, exclusive: bool):
+        with self._payouts_condition:
+            self._payouts_in_flight -= 1
+            if exclusive:
+                self._exclusive_payout = False
+            self._payouts_condition.notify_all()
+
+    def get_metrics(self) -> dict:
+        """
+        Gets the wallet's payout metrics.
+
+        :returns: Returns a dict with the number of pending, sent and
+        failed payouts and the amount sent by coin.
+        """
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "sent": self.sent,
+                "failed": self.failed,
+                "amount_sent": dict(self.amount_sent),
+            }
+
+
+class WalletRouter:
+    """
+    Selects the wallet that sends a payout.
+
+    :param shards: The wallets payouts are routed to.
+    :param policy: ``round_robin`` cycles through the wallets,
+    ``least_pending`` selects the wallet with fewer payouts in flight and
+    ``balance_aware`` selects the wallet with the highest spendable
+    balance of the coin. ``balance_aware`` requires the wallets' balances
+    to be checked, so the balances are refreshed and reduced by the
+    payouts in flight.
+    """
+
+    def __init__(self, shards: List[WalletShard], policy: str = ROUND_ROBIN):
+        if not shards:
+            raise ValueError("At least one wallet is required.")
+        if policy not in ROUTING_POLICIES:
+            raise ValueError(
+                f"Invalid routing policy: {policy}. "
+                f"Use one of {', '.join(ROUTING_POLICIES)}."
+            )
+        if policy == BALANCE_AWARE and not all(
+            shard.balance_ledger for shard in shards
+        ):
+            raise ValueError(
+                f"The {BALANCE_AWARE} routing policy requires check_balance."
+            )
+
+        self.shards = shards
+        self.policy = policy
+
+        self._cycle = itertools.cycle(shards)
+        self._lock = threading.Lock()
+
+    def select(self, coin: str, amount: int) -> WalletShard:
+        """
+        Selects the wallet that sends the payout.
+
+        :param coin: The BitGo's coin of the payout.
+        :param amount: The payout's amount in base units.
+        :returns: Returns the selected :class:`WalletShard`.
+        """
+        if self.policy == LEAST_PENDING:
+            return min(self.shards, key=lambda shard: shard.pending)
+        if self.policy == BALANCE_AWARE:
+            return max(self.shards, key=lambda shard: shard.get_balance(coin))
+        with self._lock:
+            return next(self._cycle)
@@ -0,0 +1,149 @@
+import base64
+import hashlib
+import struct
+from functools import lru_cache
+from typing import Optional
+
+from stellar_sdk import Keypair
+from stellar_sdk.exceptions import BadSignatureError
+from stellar_sdk.transaction_envelope import TransactionEnvelope
+from stellar_sdk.xdr import CryptoKeyType, EnvelopeType
+
+ENVELOPE_TYPE_TX = struct.pack(">i", EnvelopeType.ENVELOPE_TYPE_TX.value)
+ENVELOPE_TYPE_TX_V0 = struct.pack(">i", EnvelopeType.ENVELOPE_TYPE_TX_V0.value)
+# A v0 transaction is signed as a v1 transaction, whose source account is the
+# v0 transaction's ed25519 public key.
+SIGNATURE_PAYLOAD_PREFIXES = {
+    ENVELOPE_TYPE_TX: ENVELOPE_TYPE_TX,
+    ENVELOPE_TYPE_TX_V0: ENVELOPE_TYPE_TX
+    + struct.pack(">i", CryptoKeyType.KEY_TYPE_ED25519.value),
+}
+ED25519_SIGNATURE_LENGTH = 64
+DECORATED_SIGNATURE_LENGTH = 4 + 4 + ED25519_SIGNATURE_LENGTH
+MAX_SIGNATURES = 20
+TRANSACTION_EXT_V0 = struct.pack(">i", 0)
+
+
+@lru_cache(maxsize=None)
+def get_network_id(network_passphrase: str) -> bytes:
+    """
+    Gets the network id, the hash of the network passphrase, which is part
+    of every signed payload.
+
+    :param network_passphrase: The Stellar Network passphrase.
+    :return: Returns the network id.
+    """
+    return hashlib.sha256(network_passphrase.encode()).digest()
+
+
+def sign_envelope_xdr(
+    envelope_xdr: str,
+    keypair: Keypair,
+    network_passphrase: str,
+    validate: bool = False,
+) -> str:
+    """
+    Adds the keypair's signature to the transaction envelope's XDR.
+
+    The transaction's bytes are hashed and the decorated signature is
+    appended to the envelope as they are, instead of decoding the whole
+    envelope into a :class:`TransactionEnvelope` and encoding it back.
+    Envelopes other than the v0 and v1 transaction envelopes whose
+    signatures are all ed25519 signatures, or that may already have the
+    keypair's signature, are signed through the :class:`TransactionEnvelope`.
+
+    :param envelope_xdr: The base64 XDR of the transaction envelope.
+    :param keypair: The :class:`Keypair` that signs the transaction.
+    :param network_passphrase: The Stellar Network passphrase.
+    :param validate: Whether to decode the signed envelope and verify the
+    new signature against the transaction's hash.
+    :return: Returns the base64 XDR of the signed transaction envelope.
+    """
+    envelope = base64.b64decode(envelope_xdr)
+    transaction_end = _find_transaction_end(envelope)
+    if transaction_end is None:
+        return _sign_envelope(envelope_xdr, keypair, network_passphrase)
+
+    (signatures_count,) = struct.unpack_from(">I", envelope, transaction_end)
+    hints = {
+        envelope[offset : offset + 4]
+        for offset in range(
+            transaction_end + 4, len(envelope), DECORATED_SIGNATURE_LENGTH
+        )
+    }
+    if signatures_count >= MAX_SIGNATURES or keypair.signature_hint() in hints:
+        return _sign_envelope(envelope_xdr, keypair, network_passphrase)
+
+    transaction_hash = hashlib.sha256(
+        get_network_id(network_passphrase)
+        + SIGNATURE_PAYLOAD_PREFIXES[envelope[:4]]
+        + envelope[4:transaction_end]
+    ).digest()
+    signature = keypair.sign(transaction_hash)
+    signed_envelope = b"".join(
+        (
+            envelope[:transaction_end],
+            struct.pack(">I", signatures_count + 1),
+            envelope[transaction_end + 4 :],
+            keypair.signature_hint(),
+            struct.pack(">I", len(signature)),
+            signature,
+        )
+    )
+    signed_envelope_xdr = base64.b64encode(signed_envelope).decode()
+    if validate:
+        _validate_signature(signed_envelope_xdr, keypair, network_passphrase)
+    return signed_envelope_xdr
+
+
+def _find_transaction_end(envelope: bytes) -> Optional[int]:
+    """
+    Finds where the transaction ends and its signatures start.
+
+    The signatures are the envelope's last field, so for each possible
+    count of ed25519 signatures the count and the signatures' lengths are
+    checked, along with the transaction's empty extension before them.
+
+    :param envelope: The transaction envelope's XDR bytes.
+    :return: Returns the offset of the signatures' count, or ``None`` if it
+    isn't a transaction envelope or the signatures can't be told apart.
+    """
+    if envelope[:4] not in SIGNATURE_PAYLOAD_PREFIXES:
+        return None
+
+    transaction_end = None
+    for count in range(MAX_SIGNATURES + 1):
+        offset = len(envelope) - 4 - count * DECORATED_SIGNATURE_LENGTH
+        if offset - len(TRANSACTION_EXT_V0) < 4:
+            break
+        if (
+            struct.unpack_from(">I", envelope, offset)[0] != count
+            or envelope[offset - len(TRANSACTION_EXT_V0) : offset] != TRANSACTION_EXT_V0
+        ):
+            continue
+        if any(
+            struct.unpack_from(
+                ">I", envelope, offset + 4 + i * DECORATED_SIGNATURE_LENGTH + 4
+            )[0]
+            != ED25519_SIGNATURE_LENGTH
+            for i in range(count)
+        ):
+            continue
+        if transaction_end is not None:
+            return None
+        transaction_end = offset
+    return transaction_end
+
+
+def _sign_envelope(envelope_xdr: str, keypair: Keypair, network_passphrase: str):
+    envelope = TransactionEnvelope.from_xdr(envelope_xdr, network_passphrase)
+    envelope.sign(keypair)
+    return envelope.to_xdr()
+
+
+def _validate_signature(envelope_xdr: str, keypair: Keypair, network_passphrase: str):
+    envelope = TransactionEnvelope.from_xdr(envelope_xdr, network_passphrase)
+    try:
+        keypair.verify(envelope.hash(), envelope.signatures[-1].signature)
+    except BadSignatureError:
+        raise ValueError("The envelope's signature doesn't match its transaction.")
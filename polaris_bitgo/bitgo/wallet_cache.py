@@ -0,0 +1,130 @@
+import threading
+from typing import Dict, Optional
+
+from .api import BitGoAPI
+from .dtos import AssetWallet, Wallet, WalletKey, WalletResponse
+
+
+class WalletCache:
+    """
+    Caches the BitGo's wallet information for every asset.
+
+    A Stellar wallet has the same root address and keys for every coin,
+    and the wallet document of the native coin has the balances of every
+    token, so a single wallet request is indexed by coin into an
+    :class:`AssetWallet` view per asset. The user key is fetched once too.
+
+    :param bitgo_api: The :class:`BitGoAPI` instance of the wallet's
+    native coin.
+
+    It's safe to share between threads. The wallet and the user key are
+    loaded under a lock the first time, so concurrent callers wait for a
+    single request instead of making one each.
+    """
+
+    def __init__(self, bitgo_api: BitGoAPI):
+        self.bitgo_api = bitgo_api
+
+        self._asset_wallets: Optional[Dict[str, AssetWallet]] = None
+        self._encrypted_private_key: Optional[str] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Fetches the wallet from BitGo and indexes it by coin.
+        """
+        wallet = WalletResponse.from_json(self.bitgo_api.get_wallet())
+
+        balances = {self.bitgo_api.COIN: wallet.spendable_balance}
+        balances.update(wallet.token_balances)
+        for coin in wallet.trusted_tokens:
+            balances.setdefault(coin, 0)
+
+        asset_wallets = {
+            coin: AssetWallet(
+                coin=coin,
+                public_key=wallet.public_key,
+                keys=wallet.keys,
+                spendable_balance=balance,
+                has_trustline=True,
+            )
+            for coin, balance in balances.items()
+        }
+
+        with self._lock:
+            self._asset_wallets = asset_wallets
+
+    def get_asset_wallets(self) -> Dict[str, AssetWallet]:
+        """
+        Gets the wallet's view of every coin it holds, fetching the
+        wallet if it isn't cached yet.
+
+        :return: Returns a dict of :class:`AssetWallet` by coin.
+        """
+        with self._lock:
+            asset_wallets = self._asset_wallets
+        if asset_wallets is None:
+            with self._load_lock:
+                with self._lock:
+                    asset_wallets = self._asset_wallets
+                if asset_wallets is None:
+                    self.refresh()
+                    with self._lock:
+                        asset_wallets = self._asset_wallets
+        return asset_wallets
+
+    def get_asset_wallet(self, coin: str) -> AssetWallet:
+        """
+        Gets the wallet's view of a coin.
+
+        :param coin: The BitGo's coin, like ``txlm`` or ``txlm:CODE-ISSUER``.
+        :return: Returns the :class:`AssetWallet` of the coin. For coins
+        the wallet doesn't hold, the balance is zero and it has no
+        trustline.
+        """
+        asset_wallets = self.get_asset_wallets()
+        if coin in asset_wallets:
+            return asset_wallets[coin]
+        native_wallet = asset_wallets[self.bitgo_api.COIN]
+        return AssetWallet(
+            coin=coin,
+            public_key=native_wallet.public_key,
+            keys=native_wallet.keys,
+            spendable_balance=0,
+            has_trustline=False,
+        )
+
+    def get_public_key(self) -> str:
+        """
+        Gets the wallet's root address, which is the same for every coin.
+
+        :return: Returns the wallet's public key.
+        """
+        return self.get_asset_wallet(self.bitgo_api.COIN).public_key
+
+    def get_wallet(self) -> Wallet:
+        """
+        Gets the :class:`Wallet` used by the :class:`BitGo` clients,
+        fetching the user key if it isn't cached yet.
+
+        :return: Returns the :class:`Wallet` with the encrypted private key.
+        """
+        native_wallet = self.get_asset_wallet(self.bitgo_api.COIN)
+        wallet = Wallet(public_key=native_wallet.public_key, keys=native_wallet.keys)
+
+        with self._lock:
+            encrypted_private_key = self._encrypted_private_key
+        if encrypted_private_key is None:
+            with self._load_lock:
+                with self._lock:
+                    encrypted_private_key = self._encrypted_private_key
+                if encrypted_private_key is None:
+                    encrypted_private_key = WalletKey.from_json(
+                        self.bitgo_api.get_wallet_key_info(wallet)
+                    ).encrypted_private_key
+                    with self._lock:
+                        self._encrypted_private_key = encrypted_private_key
+
+        wallet.encrypted_private_key = encrypted_private_key
+        return wallet
@@ -0,0 +1,164 @@
+from typing import Iterator, List, Optional, Tuple
+
+from django.db.models import Q
+from polaris.models import Transaction
+from polaris.utils import get_logger, memo_base64_to_hex
+from stellar_sdk.operation import Operation
+
+from .bitgo import BitGo, CONFIRMED_STATUS
+from .dtos import Transfer
+from polaris_bitgo.utils import get_transaction_id_from_hex_memo
+
+RECEIVE_TRANSFER_TYPE = "receive"
+HASH_MEMO_TYPE = "hash"
+MEMO_ID_SEPARATOR = "?"
+
+logger = get_logger(__name__)
+
+
+class IncomingTransferWatcher:
+    """
+    Matches the transfers received by the BitGo's wallet to the Polaris
+    withdrawal transactions waiting for the user's payment.
+
+    The hash memos created by ``save_receiving_account_and_memo`` are
+    decoded back to the transaction ids, and transfers to pool addresses
+    are matched by the claimed address, so a whole page of transfers is
+    matched with a single indexed query.
+
+    :param bitgo: The :class:`BitGo` instance of the wallet and asset
+    that is watched.
+    """
+
+    def __init__(self, bitgo: BitGo):
+        self.bitgo = bitgo
+
+    def watch(
+        self, prev_id: Optional[str] = None
+    ) -> Iterator[List[Tuple[Transaction, Transfer]]]:
+        """
+        Pages through the wallet's incoming transfers, newest first.
+
+        :param prev_id: The ``nextBatchPrevId`` of the page where the
+        watcher should start.
+        :return: Yields, for each page, a list of tuples with the matched
+        :class:`Transaction` and its transfer.
+        """
+        for transfers in self.iter_transfer_pages(prev_id):
+            yield self.match_withdrawals(transfers)
+
+    def iter_transfer_pages(
+        self, prev_id: Optional[str] = None
+    ) -> Iterator[List[Transfer]]:
+        """
+        Pages through the wallet's incoming transfers.
+
+        :param prev_id: The ``nextBatchPrevId`` of the page where the
+        iteration should start.
+        :return: Yields the transfers of each page.
+        """
+        return self.bitgo.iter_transfer_pages(RECEIVE_TRANSFER_TYPE, prev_id)
+
+    def match_withdrawals(
+        self, transfers: List[Transfer]
+    ) -> List[Tuple[Transaction, Transfer]]:
+        """
+        Matches the confirmed transfers sent to the wallet to the
+        transactions of the watched asset waiting for the user's payment,
+        either by the hash memo or by the pool address claimed by the
+        transaction. A transfer that doesn't cover the transaction's
+        ``amount_in`` isn't matched, and it's logged.
+
+        :param transfers: The wallet's transfers.
+        :return: Returns a list of tuples with the matched
+        :class:`Transaction` and its transfer.
+        """
+        transfers_by_transaction_id = {}
+        transfers_by_address = {}
+        for transfer in transfers:
+            address = self._get_wallet_address(transfer)
+            if transfer.state != CONFIRMED_STATUS or not address:
+                continue
+            hex_memo = self._get_hex_memo(transfer)
+            transaction_id = hex_memo and get_transaction_id_from_hex_memo(hex_memo)
+            if transaction_id:
+                transfers_by_transaction_id[transaction_id] = transfer
+            elif MEMO_ID_SEPARATOR in address:
+                transfers_by_address[address] = transfer
+
+        if not transfers_by_transaction_id and not transfers_by_address:
+            return []
+
+        transactions = Transaction.objects.filter(
+            Q(id__in=transfers_by_transaction_id.keys())
+            | Q(bitgo_address__address__in=transfers_by_address.keys()),
+            kind__in=[Transaction.KIND.withdrawal, Transaction.KIND.send],
+            status=Transaction.STATUS.pending_user_transfer_start,
+            receiving_anchor_account=self.bitgo.get_public_key(),
+            asset__code=self.bitgo.asset_code,
+            asset__issuer=self.bitgo.asset_issuer,
+        ).select_related("bitgo_address")
+        matches = []
+        for transaction in transactions:
+            transfer = transfers_by_transaction_id.get(
+                transaction.id
+            ) or transfers_by_address.get(transaction.bitgo_address.address)
+            if not self._covers_amount(transfer, transaction):
+                logger.warning(
+                    f"The BitGo's transfer {transfer.id} doesn't cover the "
+                    f"amount {transaction.amount_in} of the transaction "
+                    f"{transaction.id}."
+                )
+                continue
+            matches.append((transaction, transfer))
+        return matches
+
+    def _covers_amount(self, transfer: Transfer, transaction: Transaction) -> bool:
+        """
+        Checks if the amount the wallet received in the transfer covers
+        the transaction's ``amount_in``.
+
+        :param transfer: The wallet's transfer.
+        :param transaction: The withdrawal :class:`Transaction`.
+        :return: Returns ``True`` if the transfer covers the amount.
+        """
+        if transaction.amount_in is None:
+            return False
+        public_key = self.bitgo.get_public_key()
+        received = sum(
+            entry.value
+            for entry in transfer.entries
+            if entry.address.split(MEMO_ID_SEPARATOR)[0] == public_key
+            and entry.value > 0
+        )
+        return received >= Operation.to_xdr_amount(transaction.amount_in)
+
+    def _get_wallet_address(self, transfer: Transfer) -> Optional[str]:
+        """
+        Gets the wallet's address that received the transfer.
+
+        :param transfer: The wallet's transfer.
+        :return: Returns the address of the transfer's positive entry for
+        the wallet's public key, or ``None`` if there is none.
+        """
+        public_key = self.bitgo.get_public_key()
+        for entry in transfer.entries:
+            if (
+                entry.address.split(MEMO_ID_SEPARATOR)[0] == public_key
+                and entry.value > 0
+            ):
+                return entry.address
+        return None
+
+    @staticmethod
+    def _get_hex_memo(transfer: Transfer) -> Optional[str]:
+        """
+        Gets the hex of the transfer's hash memo.
+
+        :param transfer: The wallet's transfer.
+        :return: Returns the memo's hex, or ``None`` if the transfer
+        doesn't have a hash memo.
+        """
+        if transfer.memo_type != HASH_MEMO_TYPE or not transfer.memo_value:
+            return None
+        return memo_base64_to_hex(transfer.memo_value)
@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from polaris.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class RecordCache:
+    """
+    Caches the records that never change once they are read, like the
+    BitGo's transfers in a final state and the Stellar Network's
+    transactions, so they are fetched only once.
+
+    The records are kept in a bounded in-memory LRU, and optionally in a
+    Django cache too, so the processes sharing it, like the payout workers
+    and the web servers, fetch each record once. The Django cache errors
+    are logged and the record fetched as if it wasn't cached.
+
+    :param max_size: The number of records kept in memory.
+    :param cache_alias: The alias of the Django cache, from ``CACHES``,
+    used as the second tier. By default only the memory is used.
+    :param timeout: The seconds the records are kept in the Django cache.
+    By default its own timeout is used.
+    :param key_prefix: The prefix of the Django cache keys.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        cache_alias: Optional[str] = None,
+        timeout: Optional[float] = None,
+        key_prefix: str = "polaris_bitgo",
+    ):
+        if max_size < 1:
+            raise ValueError("The cache size must be positive.")
+
+        self.max_size = max_size
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+        self.hits = 0
+        self.misses = 0
+
+        self._records: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Gets a record from memory, or from the Django cache.
+
+        :param key: The record's key.
+        :return: Returns the record, or ``None`` if it isn't cached.
+        """
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                self._records.move_to_end(key)
+                self.hits += 1
+                return record
+
+        record = self._get_shared(key)
+        with self._lock:
+            if record is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._put(key, record)
+        return record
+
+    def set(self, key: str, record: dict):
+        """
+        Caches a record that won't change.
+
+        :param key: The record's key.
+        :param record: The record.
+        """
+        with self._lock:
+            self._put(key, record)
+        self._set_shared(key, record)
+
+    def clear(self):
+        """
+        Removes the records from memory. The Django cache isn't cleared.
+        """
+        with self._lock:
+            self._records.clear()
+
+    def _put(self, key: str, record: dict):
+        self._records[key] = record
+        self._records.move_to_end(key)
+        while len(self._records) > self.max_size:
+            self._records.popitem(last=False)
+
+    def _get_shared(self, key: str) -> Optional[dict]:
+        if not self.cache_alias:
+            return None
+        try:
+            return self._get_django_cache().get(self._make_key(key))
+        except Exception:
+            logger.exception(f"failed to get {key} from the Django cache")
+            return None
+
+    def _set_shared(self, key: str, record: dict):
+        if not self.cache_alias:
+            return
+        try:
+            self._get_django_cache().set(
+                self._make_key(key),
+                record,
+                timeout=DEFAULT_TIMEOUT if self.timeout is None else self.timeout,
+            )
+        except Exception:
+            logger.exception(f"failed to set {key} in the Django cache")
+
+    def _get_django_cache(self):
+        return caches[self.cache_alias]
+
+    def _make_key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
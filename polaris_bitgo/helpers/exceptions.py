@@ -1,3 +1,4 @@
+from polaris.exceptions import TransactionSubmissionBlocked
 from requests.exceptions import HTTPError
 
 
@@ -7,3 +8,25 @@ class BitGoAPIError(HTTPError):
 
 class BitGoKeyInfoNotFound(Exception):
     pass
+
+
+class BitGoInsufficientBalance(TransactionSubmissionBlocked):
+    """
+    The wallet's spendable balance doesn't cover the payout. Polaris saves
+    the deposit as blocked instead of failing it, so it's sent again once
+    the wallet is topped up and the deposit's ``submission_status`` is set
+    to ``unblocked``.
+    """
+
+
+class BitGoMissingTrustline(TransactionSubmissionBlocked):
+    """
+    The wallet has no trustline for the payout's asset. Polaris saves the
+    deposit as blocked, so it's sent again once the trustline is added to
+    the wallet and the deposit's ``submission_status`` is set to
+    ``unblocked``.
+    """
+
+
+class BitGoTenantNotFound(Exception):
+    pass
@@ -0,0 +1,135 @@
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+
+class RequestHedger:
+    """
+    Runs idempotent requests with hedging: if the request doesn't finish
+    within the configured latency percentile of the previous requests, a
+    second identical request is made and the first one to succeed wins,
+    either by not raising or by passing the ``is_success`` check.
+
+    The losing request can't be interrupted while it is running, so it
+    is cancelled if it hasn't started yet, otherwise its result is
+    discarded.
+
+    :param percentile: The latency percentile used as the delay before
+    sending the hedged request.
+    :param budget: The max ratio of requests that can be hedged.
+    :param initial_delay: The delay in seconds used until there are
+    enough latency samples.
+    :param min_samples: The number of samples needed to use the
+    latency percentile as the delay.
+    :param max_samples: The number of the latest latencies kept.
+    :param max_workers: The max number of threads running requests.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        budget: float = 0.1,
+        initial_delay: float = 1.0,
+        min_samples: int = 20,
+        max_samples: int = 1000,
+        max_workers: int = 10,
+    ):
+        if not 0 < percentile <= 100:
+            raise ValueError("The percentile must be between 0 and 100.")
+        if not 0 <= budget <= 1:
+            raise ValueError("The budget must be between 0 and 1.")
+
+        self.percentile = percentile
+        self.budget = budget
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+
+        self.latencies = deque(maxlen=max_samples)
+        self.requests_count = 0
+        self.hedged_requests_count = 0
+
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="polaris-bitgo-hedging"
+        )
+
+    def call(
+        self,
+        func: Callable,
+        *args,
+        is_success: Optional[Callable[[Any], bool]] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Calls the function, hedging it if it takes longer than the
+        current delay and the budget allows it.
+
+        :param func: The function that makes the request. It must be
+        safe to call it more than once.
+        :param is_success: A function that checks if the call's result
+        is successful, like a response with an error status. An
+        unsuccessful result only wins if no other call succeeds. By
+        default, every call that doesn't raise is successful.
+        :return: Returns the result of the first successful call, or an
+        unsuccessful result if no call succeeded.
+        """
+        with self._lock:
+            self.requests_count += 1
+        delay = self.get_delay()
+
+        futures = {self._submit(func, *args, **kwargs)}
+        done, pending = wait(futures, timeout=delay)
+        if not done and self._acquire_hedge():
+            futures.add(self._submit(func, *args, **kwargs))
+
+        error = None
+        failed_results = []
+        pending = futures
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                elif is_success and not is_success(future.result()):
+                    failed_results.append(future.result())
+                else:
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+        if failed_results:
+            return failed_results[0]
+        raise error
+
+    def get_delay(self) -> float:
+        """
+        Gets the delay before hedging a request.
+
+        :return: Returns the configured latency percentile of the latest
+        requests, or the initial delay if there aren't enough samples.
+        """
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return self.initial_delay
+            latencies = sorted(self.latencies)
+        index = math.ceil(self.percentile / 100 * len(latencies)) - 1
+        return latencies[max(index, 0)]
+
+    def _acquire_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged_requests_count + 1 > self.budget * self.requests_count:
+                return False
+            self.hedged_requests_count += 1
+            return True
+
+    def _submit(self, func: Callable, *args, **kwargs) -> Future:
+        return self._executor.submit(self._timed, func, *args, **kwargs)
+
+    def _timed(self, func: Callable, *args, **kwargs) -> Any:
+        start = time.monotonic()
+        result = func(*args, **kwargs)
+        with self._lock:
+            self.latencies.append(time.monotonic() - start)
+        return result
@@ -0,0 +1,147 @@
+from typing import Optional
+
+from requests import Response
+
+ERROR_STATUS = "error"
+
+
+class Metrics:
+    """
+    Records the requests made to BitGo and Horizon and the stages of the
+    payouts. This default implementation records nothing; subclass it to
+    export the metrics, like :class:`PrometheusMetrics` does.
+    """
+
+    def observe_request(
+        self,
+        endpoint: str,
+        status: str,
+        latency: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ):
+        """
+        Records a request.
+
+        :param endpoint: The endpoint's name, like ``wallet``, ``send`` or
+        ``horizon-tx``.
+        :param status: The response's status code, or ``error`` if there
+        is no response.
+        :param latency: The request's duration in seconds.
+        :param bytes_sent: The size of the request's body.
+        :param bytes_received: The size of the response's body.
+        """
+
+    def increment_retries(self, endpoint: str):
+        """
+        Records a retry of a request.
+
+        :param endpoint: The endpoint's name.
+        """
+
+    def observe_stage(self, stage: str, latency: float):
+        """
+        Records the duration of a payout's stage.
+
+        :param stage: The stage's name, like ``build`` or ``send``.
+        :param latency: The stage's duration in seconds.
+        """
+
+    def observe_response(self, endpoint: str, response: Response, latency: float):
+        """
+        Records a request from its response.
+
+        :param endpoint: The endpoint's name.
+        :param response: The request's response.
+        :param latency: The request's duration in seconds.
+        """
+        request_body = response.request.body if response.request else None
+        self.observe_request(
+            endpoint,
+            str(response.status_code),
+            latency,
+            bytes_sent=len(request_body or b""),
+            bytes_received=len(response.content or b""),
+        )
+
+
+class PrometheusMetrics(Metrics):
+    """
+    Exports the metrics with the ``prometheus_client`` package, which is
+    installed with the ``prometheus`` extra. The metrics are exposed by
+    the application's Prometheus endpoint, like any other metric of the
+    registry.
+
+    :param registry: The Prometheus' registry, the default one if not set.
+    :param namespace: The prefix of the metrics' names.
+    """
+
+    def __init__(self, registry=None, namespace: str = "polaris_bitgo"):
+        try:
+            import prometheus_client
+        except ImportError:
+            raise ImportError(
+                "PrometheusMetrics requires prometheus_client. Install it with "
+                "`pip install django-polaris-bitgo[prometheus]`."
+            )
+
+        registry = registry or prometheus_client.REGISTRY
+        self.request_latency = prometheus_client.Histogram(
+            "request_duration_seconds",
+            "Duration of the requests made to BitGo and Horizon.",
+            ["endpoint", "status"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.request_retries = prometheus_client.Counter(
+            "request_retries",
+            "Retries of the requests made to BitGo and Horizon.",
+            ["endpoint"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.request_bytes = prometheus_client.Counter(
+            "request_bytes",
+            "Bytes sent to and received from BitGo and Horizon.",
+            ["endpoint", "direction"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.stage_latency = prometheus_client.Histogram(
+            "stage_duration_seconds",
+            "Duration of the stages of the payouts.",
+            ["stage"],
+            namespace=namespace,
+            registry=registry,
+        )
+
+    def observe_request(
+        self,
+        endpoint: str,
+        status: str,
+        latency: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ):
+        self.request_latency.labels(endpoint, status).observe(latency)
+        self.request_bytes.labels(endpoint, "sent").inc(bytes_sent)
+        self.request_bytes.labels(endpoint, "received").inc(bytes_received)
+
+    def increment_retries(self, endpoint: str):
+        self.request_retries.labels(endpoint).inc()
+
+    def observe_stage(self, stage: str, latency: float):
+        self.stage_latency.labels(stage).observe(latency)
+
+
+NOOP_METRICS = Metrics()
+
+
+def get_metrics(metrics: Optional[Metrics] = None) -> Metrics:
+    """
+    Gets the given metrics or the no-op default.
+
+    :param metrics: The configured :class:`Metrics`, if any.
+    :return: Returns a :class:`Metrics` instance.
+    """
+    return metrics or NOOP_METRICS
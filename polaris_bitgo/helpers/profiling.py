@@ -0,0 +1,172 @@
+import functools
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from polaris.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class StackSampler:
+    """
+    Samples the stack of a thread from a background thread, so the
+    sampled thread runs without a profiler's overhead.
+
+    :param thread_id: The id of the sampled thread.
+    :param interval: The seconds between samples.
+    :param max_depth: The number of innermost frames kept by sample.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.01, max_depth: int = 20):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="polaris-bitgo-sampler", daemon=True
+        )
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def get_profile(self, limit: int = 10) -> List[dict]:
+        """
+        Gets the most sampled stacks.
+
+        :param limit: The number of stacks returned.
+        :return: Returns a list of dicts with the stack, outermost frame
+        first, and its number of samples.
+        """
+        return [
+            {"stack": list(stack), "samples": samples}
+            for stack, samples in self.samples.most_common(limit)
+        ]
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{frame.f_lineno}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+
+class SlowCallDetector:
+    """
+    Times the integration's public methods and reports the calls slower
+    than the threshold, with the duration of each stage of the call. A
+    sample of the calls is profiled by a :class:`StackSampler`, so the
+    report of a slow call may include where it spent its time.
+
+    :param threshold: The seconds after which a call is slow.
+    :param sample_rate: The ratio of calls that are profiled.
+    :param sample_interval: The seconds between the profiled stacks.
+    :param handler: Receives the report of each slow call. By default
+    the report is logged as JSON.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 5.0,
+        sample_rate: float = 0.01,
+        sample_interval: float = 0.01,
+        handler: Optional[Callable[[dict], None]] = None,
+    ):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("The sample rate must be between 0 and 1.")
+
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.sample_interval = sample_interval
+        self.handler = handler or self.log
+
+        self._local = threading.local()
+
+    @contextmanager
+    def watch(self, method: str):
+        """
+        Times the code run inside the context as a call of the method.
+
+        :param method: The method's name.
+        """
+        calls = self._get_calls()
+        stages = {}
+        calls.append(stages)
+
+        sampler = None
+        if self.sample_rate and random.random() < self.sample_rate:
+            sampler = StackSampler(
+                threading.get_ident(), interval=self.sample_interval
+            ).start()
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - start
+            calls.pop()
+            if sampler:
+                sampler.stop()
+            if duration >= self.threshold:
+                self.handler(
+                    {
+                        "method": method,
+                        "duration": duration,
+                        "threshold": self.threshold,
+                        "stages": stages,
+                        "profile": sampler.get_profile() if sampler else None,
+                    }
+                )
+
+    def observe_stage(self, stage: str, latency: float):
+        """
+        Adds the stage's duration to the call watched in the current
+        thread, if any.
+
+        :param stage: The stage's name.
+        :param latency: The stage's duration in seconds.
+        """
+        calls = self._get_calls()
+        if calls:
+            calls[-1][stage] = calls[-1].get(stage, 0) + latency
+
+    @staticmethod
+    def log(report: dict):
+        logger.warning(f"slow BitGo integration call: {json.dumps(report)}")
+
+    def _get_calls(self) -> List[dict]:
+        if not hasattr(self._local, "calls"):
+            self._local.calls = []
+        return self._local.calls
+
+
+def monitored(method: Callable) -> Callable:
+    """
+    Watches the decorated method with the instance's
+    ``slow_call_detector``, if any.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.slow_call_detector:
+            return method(self, *args, **kwargs)
+        with self.slow_call_detector.watch(method.__name__):
+            return method(self, *args, **kwargs)
+
+    return wrapper
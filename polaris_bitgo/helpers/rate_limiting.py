@@ -0,0 +1,60 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class RateLimiter:
+    """
+    Limits the rate of the requests with a token bucket: the bucket holds
+    up to ``burst`` tokens, refilled at ``rate`` tokens per second, and
+    each request takes one, waiting for it when the bucket is empty.
+
+    The waiting requests reserve their tokens in order, so they are sent
+    in the order they arrived. It's safe to share between threads.
+
+    :param rate: The requests per second.
+    :param burst: The requests that can be sent at once after an idle
+    period. Defaults to one second of requests.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("The rate must be positive.")
+        if burst is None:
+            burst = max(1, int(rate))
+        if burst < 1:
+            raise ValueError("The burst must be positive.")
+
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Takes a token, waiting until there is one.
+
+        :return: Returns the seconds waited.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if delay:
+            self._sleep(delay)
+        return delay
@@ -0,0 +1,97 @@
+import functools
+from contextlib import nullcontext
+from typing import Any, Callable, Optional
+
+
+class Tracer:
+    """
+    Creates the spans of the payouts. This default implementation is
+    disabled and creates nothing; :class:`OpenTelemetryTracer` creates
+    OpenTelemetry spans.
+    """
+
+    enabled = False
+
+    def start_span(self, name: str, attributes: Optional[dict] = None):
+        """
+        Starts a span, which is the current span inside the context.
+
+        :param name: The span's name.
+        :param attributes: The span's attributes.
+        :return: Returns a context manager that ends the span.
+        """
+        return nullcontext()
+
+    def set_attribute(self, key: str, value: Any):
+        """
+        Sets an attribute on the current span.
+
+        :param key: The attribute's name.
+        :param value: The attribute's value.
+        """
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Creates the spans with the ``opentelemetry-api`` package, which is
+    installed with the ``opentelemetry`` extra. The spans are exported by
+    the application's configured tracer provider.
+
+    :param tracer_provider: The tracer provider, the global one if not set.
+    """
+
+    enabled = True
+
+    def __init__(self, tracer_provider=None):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetryTracer requires opentelemetry-api. Install it with "
+                "`pip install django-polaris-bitgo[opentelemetry]`."
+            )
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(
+            "polaris_bitgo", tracer_provider=tracer_provider
+        )
+
+    def start_span(self, name: str, attributes: Optional[dict] = None):
+        return self._tracer.start_as_current_span(name, attributes=attributes)
+
+    def set_attribute(self, key: str, value: Any):
+        self._trace.get_current_span().set_attribute(key, value)
+
+
+NOOP_TRACER = Tracer()
+
+
+def get_tracer(tracer: Optional[Tracer] = None) -> Tracer:
+    """
+    Gets the given tracer or the disabled default.
+
+    :param tracer: The configured :class:`Tracer`, if any.
+    :return: Returns a :class:`Tracer` instance.
+    """
+    return tracer or NOOP_TRACER
+
+
+def traced(name: str) -> Callable:
+    """
+    Runs the decorated method inside a span of the instance's ``tracer``.
+    When the tracer is disabled the method is called directly.
+
+    :param name: The span's name.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.tracer.enabled:
+                return method(self, *args, **kwargs)
+            with self.tracer.start_span(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from polaris.integrations import registered_custody_integration as rci
+from polaris.utils import get_logger
+
+from polaris_bitgo.bitgo.integration import BitGoIntegration
+
+logger = get_logger(__name__)
+
+DEFAULT_POOL_SIZE = 100
+DEFAULT_INTERVAL = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates addresses on the BitGo's wallet, keeping the pool used by "
+        "BitGoIntegration.save_receiving_account_and_memo() filled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=DEFAULT_POOL_SIZE,
+            help="The number of unclaimed addresses the pool should have.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Continually refill the pool, sleeping between iterations.",
+        )
+        parser.add_argument(
+            "--interval",
+            "-i",
+            type=int,
+            default=DEFAULT_INTERVAL,
+            help="The number of seconds to sleep between iterations.",
+        )
+
+    def handle(self, *_args, **options):
+        if not isinstance(rci, BitGoIntegration) or not rci.address_pool:
+            raise CommandError(
+                "The registered custody integration must be a BitGoIntegration "
+                "with use_address_pool=True."
+            )
+
+        while True:
+            created = rci.address_pool.fill(options["size"])
+            logger.info(f"created {created} addresses on the BitGo's wallet")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from polaris.integrations import registered_custody_integration as rci
+
+from polaris_bitgo.bitgo.integration import BitGoIntegration
+from polaris_bitgo.bitgo.payout_queue import PayoutQueue
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_INTERVAL = 1
+DEFAULT_LEASE_DURATION = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends the deposits queued with PayoutQueue.enqueue() from a thread "
+        "pool, keeping many payouts in flight. Any number of workers can run "
+        "on different hosts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=DEFAULT_MAX_WORKERS,
+            help="The number of payouts sent at the same time. It can't be more "
+            "than the integration's pool_maxsize.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep waiting for new payouts instead of exiting once the "
+            "queue is empty.",
+        )
+        parser.add_argument(
+            "--interval",
+            "-i",
+            type=float,
+            default=DEFAULT_INTERVAL,
+            help="The number of seconds to sleep while the queue is empty.",
+        )
+        parser.add_argument(
+            "--lease-duration",
+            type=float,
+            default=DEFAULT_LEASE_DURATION,
+            help="The number of seconds after which the payouts of a worker that "
+            "stopped renewing their leases are claimed by another worker.",
+        )
+
+    def handle(self, *_args, **options):
+        if not isinstance(rci, BitGoIntegration):
+            raise CommandError(
+                "The registered custody integration must be a BitGoIntegration."
+            )
+
+        try:
+            queue = PayoutQueue(
+                rci,
+                max_workers=options["max_workers"],
+                lease_duration=options["lease_duration"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        try:
+            queue.run(loop=options["loop"], interval=options["interval"])
+        except KeyboardInterrupt:
+            queue.stop()
@@ -0,0 +1,101 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from polaris.integrations import registered_custody_integration as rci
+from polaris.models import Asset
+from polaris.utils import get_logger
+
+from polaris_bitgo.bitgo.integration import BitGoIntegration
+from polaris_bitgo.bitgo.reconciliation import Reconciler
+
+logger = get_logger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconciles the Polaris transactions against the transfers of the "
+        "BitGo's wallets, writing each mismatch as a JSON line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--asset",
+            action="append",
+            default=[],
+            help=(
+                "The asset to reconcile, as CODE or CODE:ISSUER. Can be repeated. "
+                "Defaults to every Polaris asset."
+            ),
+        )
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="The file where the mismatches are written. Defaults to stdout.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="The number of transactions fetched from the database at a time.",
+        )
+        parser.add_argument(
+            "--since",
+            help=(
+                "Only reconcile the transfers and transactions created or "
+                "completed after this ISO 8601 datetime, in UTC unless it "
+                "has an offset."
+            ),
+        )
+
+    def handle(self, *_args, **options):
+        if not isinstance(rci, BitGoIntegration):
+            raise CommandError(
+                "The registered custody integration must be a BitGoIntegration."
+            )
+
+        since = None
+        if options["since"]:
+            since = parse_datetime(options["since"])
+            if not since:
+                raise CommandError(f"invalid --since datetime: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since, timezone.utc)
+
+        clients = [
+            shard.get_client(asset)
+            for shard in rci.shards
+            for asset in self._get_assets(options["asset"])
+        ]
+        reconciler = Reconciler(clients, chunk_size=options["chunk_size"], since=since)
+
+        output = open(options["output"], "w") if options["output"] else sys.stdout
+        mismatches = 0
+        try:
+            for mismatch in reconciler.reconcile():
+                output.write(json.dumps(mismatch) + "\n")
+                mismatches += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        logger.info(f"found {mismatches} mismatches")
+
+    @staticmethod
+    def _get_assets(asset_args):
+        if not asset_args:
+            return list(Asset.objects.all())
+
+        assets = []
+        for asset_arg in asset_args:
+            code, _, issuer = asset_arg.partition(":")
+            matches = Asset.objects.filter(code=code)
+            if issuer:
+                matches = matches.filter(issuer=issuer)
+            if not matches.exists():
+                raise CommandError(f"unknown asset: {asset_arg}")
+            assets.extend(matches)
+        return assets
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from polaris.integrations import registered_custody_integration as rci
+from polaris.utils import get_logger
+
+from polaris_bitgo.bitgo.integration import BitGoIntegration
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the BitGo clients of every wallet and asset, opens their "
+        "connections and derives their signers, failing if any of them fails."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=DEFAULT_MAX_WORKERS,
+            help="The number of threads warming up the clients.",
+        )
+
+    def handle(self, *_args, **options):
+        if not isinstance(rci, BitGoIntegration):
+            raise CommandError(
+                "The registered custody integration must be a BitGoIntegration."
+            )
+
+        start = time.monotonic()
+        results = rci.warm_up(max_workers=options["max_workers"])
+        failed = [name for name, error in results.items() if error]
+        logger.info(
+            f"warmed up {len(results) - len(failed)} of {len(results)} clients "
+            f"in {time.monotonic() - start:.2f}s"
+        )
+        if failed:
+            raise CommandError(f"failed to warm up: {', '.join(failed)}")
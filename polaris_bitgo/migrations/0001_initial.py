@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("polaris", "__first__"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BitGoAddress",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("wallet_id", models.CharField(max_length=64)),
+                ("address", models.CharField(max_length=128, unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="bitgo_address",
+                        to="polaris.transaction",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="bitgoaddress",
+            index=models.Index(
+                fields=["wallet_id", "claimed_at"],
+                name="polaris_bit_wallet__75f3b8_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polaris_bitgo", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BitGoTransfer",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence_id", models.CharField(max_length=128, unique=True)),
+                ("wallet_id", models.CharField(max_length=64)),
+                ("transfer_id", models.CharField(blank=True, max_length=64, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bitgo_transfers",
+                        to="polaris.transaction",
+                    ),
+                ),
+            ],
+        ),
+    ]
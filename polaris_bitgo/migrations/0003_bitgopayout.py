@@ -0,0 +1,61 @@
+# Generated by Django 3.2.25 on 2026-10-19 18:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polaris_bitgo", "0002_bitgotransfer"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BitGoPayout",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("has_trustline", models.BooleanField(default=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("error", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bitgo_payout",
+                        to="polaris.transaction",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="bitgopayout",
+            index=models.Index(
+                fields=["status", "created_at"], name="polaris_bit_status_88ca1f_idx"
+            ),
+        ),
+    ]
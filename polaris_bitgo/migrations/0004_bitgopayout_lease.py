@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polaris_bitgo", "0003_bitgopayout"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bitgopayout",
+            name="lease_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="bitgopayout",
+            name="lease_owner",
+            field=models.CharField(blank=True, max_length=128, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="bitgopayout",
+            index=models.Index(
+                fields=["status", "lease_expires_at"],
+                name="polaris_bit_status_92b6d7_idx",
+            ),
+        ),
+    ]
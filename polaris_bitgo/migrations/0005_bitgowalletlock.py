@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polaris_bitgo", "0004_bitgopayout_lease"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BitGoWalletLock",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("wallet_id", models.CharField(max_length=64, unique=True)),
+                ("lock_owner", models.CharField(blank=True, max_length=128, null=True)),
+                ("lock_expires_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,148 @@
+from django.db import models
+
+
+class BitGoAddress(models.Model):
+    """
+    An address created on the BitGo's wallet, kept in a pool until it's
+    claimed as the receiving account of a Polaris transaction.
+
+    BitGo's Stellar addresses are the wallet's root address with a memo id,
+    in the ``<root address>?memoId=<id>`` format.
+    """
+
+    wallet_id = models.CharField(max_length=64)
+    """The BitGo's wallet id"""
+
+    address = models.CharField(max_length=128, unique=True)
+    """The address returned by BitGo"""
+
+    transaction = models.OneToOneField(
+        "polaris.Transaction",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="bitgo_address",
+    )
+    """The transaction that claimed the address"""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    """When the address was claimed, ``None`` while it is in the pool"""
+
+    class Meta:
+        indexes = [models.Index(fields=["wallet_id", "claimed_at"])]
+
+    def __str__(self):
+        return self.address
+
+
+class BitGoTransfer(models.Model):
+    """
+    A transfer sent for a Polaris transaction, recording the BitGo's
+    wallet it was routed to. BitGo's sequence ids are unique per wallet,
+    so a retry must be sent from the same wallet to be deduplicated.
+    """
+
+    sequence_id = models.CharField(max_length=128, unique=True)
+    """The sequence id sent to BitGo"""
+
+    wallet_id = models.CharField(max_length=64)
+    """The BitGo's wallet id that sends the transfer"""
+
+    transaction = models.ForeignKey(
+        "polaris.Transaction",
+        on_delete=models.CASCADE,
+        related_name="bitgo_transfers",
+    )
+    """The transaction the transfer was sent for"""
+
+    transfer_id = models.CharField(max_length=64, null=True, blank=True)
+    """The BitGo's transfer id, ``None`` until the transfer is sent"""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sequence_id
+
+
+class BitGoPayout(models.Model):
+    """
+    A deposit queued to be sent by the ``bitgo_process_payouts`` workers,
+    which run many payouts at the same time instead of one by one.
+
+    A worker leases the payouts it claims and renews the lease while they
+    are in flight, so the payouts of a worker that crashed are claimed
+    again once their lease expires.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        PROCESSING = "processing"
+        COMPLETED = "completed"
+        FAILED = "failed"
+
+    transaction = models.OneToOneField(
+        "polaris.Transaction",
+        on_delete=models.CASCADE,
+        related_name="bitgo_payout",
+    )
+    """The deposit sent by the payout"""
+
+    has_trustline = models.BooleanField(default=True)
+    """Whether the destination account trusts the asset, otherwise the amount
+    is sent as a claimable balance"""
+
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+
+    attempts = models.PositiveIntegerField(default=0)
+    """The number of times the payout was claimed by a worker"""
+
+    error = models.TextField(null=True, blank=True)
+    """The error of the last failed attempt"""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    """When the last attempt was claimed"""
+
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    lease_owner = models.CharField(max_length=128, null=True, blank=True)
+    """The worker processing the payout"""
+
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    """When the payout can be claimed by another worker, unless renewed"""
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["status", "lease_expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_id} ({self.status})"
+
+
+class BitGoWalletLock(models.Model):
+    """
+    The lease of a BitGo's wallet held by the payout queue's worker that is
+    sending a payout from it, from building the transaction until BitGo
+    confirms it. The transactions built from a wallet's account take its
+    next sequence number, so workers on different hosts send from a wallet
+    one at a time.
+    """
+
+    wallet_id = models.CharField(max_length=64, unique=True)
+    """The BitGo's wallet id"""
+
+    lock_owner = models.CharField(max_length=128, null=True, blank=True)
+    """The worker's payout holding the wallet, ``None`` when it's free"""
+
+    lock_expires_at = models.DateTimeField(null=True, blank=True)
+    """When the wallet can be taken by another worker, unless renewed"""
+
+    def __str__(self):
+        return f"{self.wallet_id} ({self.lock_owner})"
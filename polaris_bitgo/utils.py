@@ -1,8 +1,16 @@
+from typing import Optional
+from urllib.parse import urlsplit
+from uuid import UUID
+
 from polaris import settings as polaris_settings
 from requests import Session
 from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from rest_framework import status
+from stellar_sdk.fee_bump_transaction_envelope import FeeBumpTransactionEnvelope
+from stellar_sdk.helpers import parse_transaction_envelope_from_xdr
+from stellar_sdk.operation import CreateClaimableBalance
 from stellar_sdk.server import Server
+from stellar_sdk.transaction_envelope import TransactionEnvelope
 from stellar_sdk.client.requests_client import (
     DEFAULT_BACKOFF_FACTOR,
     IDENTIFICATION_HEADERS,
@@ -11,23 +19,132 @@ from stellar_sdk.client.requests_client import (
 )
 from urllib3.util import Retry
 
+from polaris_bitgo.helpers.caching import RecordCache
+from polaris_bitgo.helpers.hedging import RequestHedger
+from polaris_bitgo.helpers.metrics import Metrics, get_metrics
+
+HORIZON_ROOT_ENDPOINT = "horizon-root"
+HORIZON_TRANSACTION_ENDPOINT = "horizon-tx"
+HORIZON_SUBMIT_ENDPOINT = "horizon-submit"
+HORIZON_FEE_STATS_ENDPOINT = "horizon-fee-stats"
+HORIZON_OTHER_ENDPOINT = "horizon"
+
 
 def get_stellar_network_transaction_info(
-    transaction_id: str, num_retries: int = 5
+    transaction_id: str,
+    num_retries: int = 5,
+    hedger: Optional[RequestHedger] = None,
+    metrics: Optional[Metrics] = None,
+    client: Optional[RequestsClient] = None,
+    record_cache: Optional[RecordCache] = None,
 ) -> dict:
     """
     Gets the transaction's information from the Stellar Network.
 
     :param transaction_id: Stellar Network transaction id.
+    :param hedger: The :class:`RequestHedger` used to hedge the request,
+    if any.
+    :param metrics: The :class:`Metrics` that records the requests.
+    :param client: A shared :class:`RequestsClient`, which keeps its
+    connections open between calls. By default a client is created and
+    closed for the request.
+    :param record_cache: The :class:`RecordCache` of the transactions, if
+    any. A transaction doesn't change once it's in the Stellar Network.
     :return: Returns a dict with all the information about the
     transaction that is registered on Stellar Network.
     """
-    client = create_stellar_sdk_request_client(num_retries)
+    cache_key = f"horizon-transaction:{transaction_id}"
+    if record_cache:
+        transaction_info = record_cache.get(cache_key)
+        if transaction_info is not None:
+            return transaction_info
+
+    if hedger:
+        transaction_info = hedger.call(
+            _get_stellar_network_transaction_info,
+            transaction_id,
+            num_retries,
+            metrics,
+            client,
+        )
+    else:
+        transaction_info = _get_stellar_network_transaction_info(
+            transaction_id, num_retries, metrics, client
+        )
+    if record_cache:
+        record_cache.set(cache_key, transaction_info)
+    return transaction_info
+
+
+def _get_stellar_network_transaction_info(
+    transaction_id: str,
+    num_retries: int = 5,
+    metrics: Optional[Metrics] = None,
+    client: Optional[RequestsClient] = None,
+) -> dict:
+    """
+    Gets the transaction's information from Horizon.
+
+    :param transaction_id: Stellar Network transaction id.
+    :return: Returns the transaction's information.
+    """
+    if client:
+        server = Server(horizon_url=polaris_settings.HORIZON_URI, client=client)
+        return server.transactions().transaction(transaction_id).call()
+
+    client = create_stellar_sdk_request_client(num_retries, metrics)
     with Server(horizon_url=polaris_settings.HORIZON_URI, client=client) as server:
         return server.transactions().transaction(transaction_id).call()
 
 
-def create_stellar_sdk_request_client(num_retries: int = 5) -> RequestsClient:
+class MeteredRetry(Retry):
+    """
+    A :class:`Retry` that records each retry in the :class:`Metrics`.
+    """
+
+    def __init__(self, *args, metrics: Optional[Metrics] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = get_metrics(metrics)
+
+    def new(self, **kwargs) -> "MeteredRetry":
+        retry = super().new(**kwargs)
+        retry.metrics = self.metrics
+        return retry
+
+    def increment(
+        self, method: Optional[str] = None, url: Optional[str] = None, *args, **kwargs
+    ) -> "MeteredRetry":
+        self.metrics.increment_retries(get_horizon_endpoint(method, url))
+        return super().increment(method, url, *args, **kwargs)
+
+
+def get_horizon_endpoint(method: Optional[str], url: Optional[str]) -> str:
+    """
+    Gets the name of a Horizon's endpoint the metrics are recorded with,
+    from the request's path, since the same client fetches transactions,
+    fee stats and the root and submits transactions.
+
+    :param method: The request's HTTP method.
+    :param url: The request's URL or path.
+    :returns: Returns the endpoint's name, like ``horizon-tx``.
+    """
+    segments = [segment for segment in urlsplit(url or "").path.split("/") if segment]
+    if not segments:
+        return HORIZON_ROOT_ENDPOINT
+    if segments[-1] == "fee_stats":
+        return HORIZON_FEE_STATS_ENDPOINT
+    if segments[-1] == "transactions" and method == "POST":
+        return HORIZON_SUBMIT_ENDPOINT
+    if len(segments) > 1 and segments[-2] == "transactions":
+        return HORIZON_TRANSACTION_ENDPOINT
+    return HORIZON_OTHER_ENDPOINT
+
+
+def create_stellar_sdk_request_client(
+    num_retries: int = 5,
+    metrics: Optional[Metrics] = None,
+    pool_maxsize: int = DEFAULT_POOLSIZE,
+) -> RequestsClient:
     """
     Create a request client that should be used as the client
     for the Stellar SDK :class:`Server` instance.
@@ -35,14 +152,19 @@ def create_stellar_sdk_request_client(num_retries: int = 5) -> RequestsClient:
     :param num_retries: The number of retries that the client
     should do when the response return the configured status
     codes
+    :param metrics: The :class:`Metrics` that records the requests
+    and retries.
+    :param pool_maxsize: The number of connections to Horizon kept open.
     :returns: Returns :class:`RequestsClient` instance.
     """
+    metrics = get_metrics(metrics)
     # Adding 404 and 504 status code to force list.
     status_forcelist = tuple(Retry.RETRY_AFTER_STATUS_CODES) + (
         status.HTTP_404_NOT_FOUND,
         status.HTTP_504_GATEWAY_TIMEOUT,
     )
-    retry = Retry(
+    retry = MeteredRetry(
+        metrics=metrics,
         total=num_retries,
         backoff_factor=DEFAULT_BACKOFF_FACTOR,
         redirect=0,
@@ -52,11 +174,18 @@ def create_stellar_sdk_request_client(num_retries: int = 5) -> RequestsClient:
     )
     adapter = HTTPAdapter(
         pool_connections=DEFAULT_POOLSIZE,
-        pool_maxsize=DEFAULT_POOLSIZE,
+        pool_maxsize=pool_maxsize,
         max_retries=retry,
     )
 
     session = _create_request_session(adapter)
+    session.hooks["response"].append(
+        lambda response, **kwargs: metrics.observe_response(
+            get_horizon_endpoint(response.request.method, response.request.url),
+            response,
+            response.elapsed.total_seconds(),
+        )
+    )
 
     return RequestsClient(session=session)
 
@@ -76,3 +205,87 @@ def _create_request_session(adapter: HTTPAdapter) -> Session:
     session.mount("https://", adapter)
 
     return session
+
+
+def get_transaction_envelope(envelope_xdr: str) -> TransactionEnvelope:
+    """
+    Decodes the envelope of a Stellar Network's transaction. A fee-bump
+    envelope is unwrapped, since its inner transaction has the operations.
+
+    :param envelope_xdr: The base64 XDR of the envelope.
+    :returns: Returns the :class:`TransactionEnvelope`.
+    """
+    envelope = parse_transaction_envelope_from_xdr(
+        envelope_xdr, polaris_settings.STELLAR_NETWORK_PASSPHRASE
+    )
+    if isinstance(envelope, FeeBumpTransactionEnvelope):
+        return envelope.transaction.inner_transaction_envelope
+    return envelope
+
+
+def unwrap_fee_bump_transaction(transaction_info: dict) -> dict:
+    """
+    Replaces the fee-bump envelope of a Horizon's transaction with its inner
+    envelope, since Polaris decodes the ``envelope_xdr`` of the payouts as a
+    :class:`TransactionEnvelope`. The fee-bump envelope is kept as
+    ``fee_bump_envelope_xdr``.
+
+    :param transaction_info: The transaction's information from Horizon.
+    :returns: Returns the transaction's information, copied if it changed.
+    """
+    envelope_xdr = transaction_info.get("envelope_xdr")
+    if (
+        not envelope_xdr
+        or not FeeBumpTransactionEnvelope.is_fee_bump_transaction_envelope(envelope_xdr)
+    ):
+        return transaction_info
+    return {
+        **transaction_info,
+        "envelope_xdr": get_transaction_envelope(envelope_xdr).to_xdr(),
+        "fee_bump_envelope_xdr": envelope_xdr,
+    }
+
+
+def get_claimable_balance_id(transaction_info: dict) -> Optional[str]:
+    """
+    Gets the id of the claimable balance created by a Horizon's transaction,
+    which may be fee-bumped.
+
+    :param transaction_info: The transaction's information from Horizon.
+    :returns: Returns the hex of the balance id, or ``None`` if the
+    transaction doesn't create a claimable balance.
+    """
+    envelope = get_transaction_envelope(transaction_info["envelope_xdr"])
+    for index, operation in enumerate(envelope.transaction.operations):
+        if isinstance(operation, CreateClaimableBalance):
+            return envelope.transaction.get_claimable_balance_id(index)
+    return None
+
+
+def get_padded_hex_memo(transaction_id: UUID) -> str:
+    """
+    Creates the hex of the hash memo that identifies the transaction. The
+    transaction id is left-padded with zeros up to the 32 bytes of a hash memo.
+
+    :param transaction_id: The Polaris transaction id.
+    :returns: Returns the 64 characters hex string of the memo.
+    """
+    return "0" * (64 - len(transaction_id.hex)) + transaction_id.hex
+
+
+def get_transaction_id_from_hex_memo(hex_memo: str) -> Optional[UUID]:
+    """
+    Gets the transaction id from the hex of a hash memo created by
+    :func:`get_padded_hex_memo`.
+
+    :param hex_memo: The 64 characters hex string of the memo.
+    :returns: Returns the Polaris transaction id, or ``None`` if the memo
+    wasn't created from a transaction id.
+    """
+    padding, transaction_id_hex = hex_memo[:-32], hex_memo[-32:]
+    if len(hex_memo) != 64 or padding.strip("0"):
+        return None
+    try:
+        return UUID(hex=transaction_id_hex)
+    except ValueError:
+        return None
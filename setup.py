@@ -53,5 +53,9 @@ setup(
         "django-polaris>=1.4.1",
         "pycryptodome==3.10.1",
     ],
+    extras_require={
+        "prometheus": ["prometheus-client>=0.11"],
+        "opentelemetry": ["opentelemetry-api>=1.0"],
+    },
     python_requires=">=3.7",
 )
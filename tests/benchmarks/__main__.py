@@ -0,0 +1,91 @@
+"""
+Runs the benchmarks and compares them to the JSON baseline.
+
+    python -m tests.benchmarks              # run and compare
+    python -m tests.benchmarks --save       # run and save the baseline
+    python -m tests.benchmarks -k sjcl      # run the matching benchmarks
+
+The exit code is 1 when a benchmark is slower than the baseline by more
+than the tolerance.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import timeit
+from pathlib import Path
+from unittest import mock
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+
+def run(name: str, setup, number: int, rounds: int) -> dict:
+    try:
+        func = setup()
+        timings = [timeit.timeit(func, number=number) / number for _ in range(rounds)]
+    finally:
+        mock.patch.stopall()
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--save", action="store_true", help="Save the baseline.")
+    parser.add_argument("-k", default="", help="Run the benchmarks matching it.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="The max ratio a benchmark can be slower than the baseline.",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    from tests.conftest import pytest_configure
+
+    pytest_configure(None)
+
+    from tests.benchmarks.suite import BENCHMARKS
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    results = {}
+    regressions = []
+    for name, (setup, number) in BENCHMARKS.items():
+        if args.k not in name:
+            continue
+        result = results[name] = run(name, setup, number, args.rounds)
+
+        line = f"{name:<48} {result['median'] * 1e6:>12.2f} us"
+        if name in baseline:
+            ratio = result["median"] / baseline[name]["median"]
+            line += f" {ratio:>7.2f}x"
+            if ratio > 1 + args.tolerance:
+                regressions.append(name)
+                line += " REGRESSION"
+        print(line)
+
+    if args.save:
+        args.baseline.write_text(
+            json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n"
+        )
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"Slower than the baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+The benchmarks of the package's hot functions. Each benchmark is a
+function that returns the callable that is timed, so the setup is not
+measured.
+"""
+
+import json
+from decimal import Decimal
+from typing import Callable, Dict, Tuple
+from unittest import mock
+from uuid import uuid4
+
+from stellar_sdk import Keypair
+
+from tests.mocks import bitgo as bitgo_mocks
+
+PASSPHRASE = "mypassphrase"
+ASSET_ISSUER = "GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+
+BENCHMARKS: Dict[str, Tuple[Callable[[], Callable], int]] = {}
+
+
+def benchmark(number: int = 1000):
+    """
+    Registers a benchmark.
+
+    :param number: The number of calls timed in each round.
+    """
+
+    def decorator(setup: Callable[[], Callable]) -> Callable[[], Callable]:
+        BENCHMARKS[setup.__name__] = (setup, number)
+        return setup
+
+    return decorator
+
+
+def make_bitgo(**kwargs):
+    from django.conf import settings
+
+    from polaris_bitgo.bitgo import BitGo
+
+    return BitGo(
+        asset_code="BST",
+        asset_issuer=ASSET_ISSUER,
+        api_url=settings.BITGO_API_URL,
+        api_key=settings.BITGO_API_KEY,
+        api_passphrase=PASSPHRASE,
+        wallet_id=settings.BITGO_WALLET_ID,
+        stellar_coin_code=settings.BITGO_STELLAR_COIN_CODE,
+        **kwargs,
+    )
+
+
+def patch_bitgo_api():
+    wallet_key_info = bitgo_mocks.get_wallet_key_info_data()["keys"][0]
+    wallet_key_info["encryptedPrv"] = bitgo_mocks.sjcl_encrypt(
+        Keypair.random().secret.encode(), PASSPHRASE
+    )
+    patches = [
+        mock.patch(
+            "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+            return_value=bitgo_mocks.get_wallet_data(),
+        ),
+        mock.patch(
+            "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info",
+            return_value=wallet_key_info,
+        ),
+        mock.patch(
+            "polaris_bitgo.bitgo.api.BitGoAPI.build_transaction",
+            return_value=bitgo_mocks.build_transaction_data(),
+        ),
+    ]
+    for patch in patches:
+        patch.start()
+
+
+@benchmark(number=3)
+def sjcl_decrypt():
+    from polaris_bitgo.bitgo.utils import SJCL
+
+    encrypted = bitgo_mocks.sjcl_encrypt(b"S" * 56, PASSPHRASE)
+    return lambda: SJCL().decrypt(json.loads(encrypted), PASSPHRASE)
+
+
+@benchmark(number=3)
+def bitgo_decrypt_private_key():
+    patch_bitgo_api()
+    bitgo = make_bitgo()
+    return bitgo._decrypt_private_key
+
+
+@benchmark(number=10000)
+def create_recipient():
+    from polaris_bitgo.bitgo.integration import BitGoIntegration
+
+    address = "GB4S2NHN7DIQVDTZY3QIUNDFV5LZNOO6FS5PO2NOCQ3MBJCVUIBFTJH3"
+    amount = Decimal("1234.5678901")
+    return lambda: BitGoIntegration._create_recipient(address, amount)
+
+
+@benchmark(number=10000)
+def to_xdr_amount():
+    from stellar_sdk.operation import Operation
+
+    amount = Decimal("1234.5678901")
+    return lambda: Operation.to_xdr_amount(amount)
+
+
+@benchmark(number=1000)
+def build_transaction():
+    from polaris_bitgo.bitgo.dtos import Recipient
+
+    patch_bitgo_api()
+    bitgo = make_bitgo()
+    recipient = Recipient(amount="10000", address=ASSET_ISSUER)
+    return lambda: bitgo.build_transaction(recipient)
+
+
+@benchmark(number=1000)
+def envelope_xdr_round_trip():
+    from polaris import settings as polaris_settings
+    from stellar_sdk.transaction_envelope import TransactionEnvelope
+
+    xdr = bitgo_mocks.build_transaction_data()["txBase64"]
+    return lambda: TransactionEnvelope.from_xdr(
+        xdr, polaris_settings.STELLAR_NETWORK_PASSPHRASE
+    ).to_xdr()
+
+
+@benchmark(number=1000)
+def sign_envelope_xdr():
+    from polaris import settings as polaris_settings
+
+    from polaris_bitgo.bitgo.signing import sign_envelope_xdr
+
+    xdr = bitgo_mocks.build_transaction_data()["txBase64"]
+    keypair = Keypair.random()
+    return lambda: sign_envelope_xdr(
+        xdr, keypair, polaris_settings.STELLAR_NETWORK_PASSPHRASE
+    )
+
+
+@benchmark(number=10000)
+def padded_hex_memo():
+    from polaris.utils import memo_hex_to_base64
+
+    from polaris_bitgo.utils import get_padded_hex_memo
+
+    transaction_id = uuid4()
+    return lambda: memo_hex_to_base64(get_padded_hex_memo(transaction_id))
+
+
+@benchmark(number=1000)
+def bitgo_client_construction():
+    patch_bitgo_api()
+    return make_bitgo
+
+
+@benchmark(number=1000)
+def bitgo_client_construction_from_cached_wallet():
+    from polaris_bitgo.bitgo.dtos import Wallet
+
+    wallet = Wallet(public_key=ASSET_ISSUER, keys=[], encrypted_private_key="{}")
+    return lambda: make_bitgo(wallet=wallet)
@@ -9,6 +9,7 @@ def pytest_configure(config):
     settings.configure(
         DEBUG_PROPAGATE_EXCEPTIONS=True,
         SECRET_KEY="not very secret in tests",
+        USE_TZ=True,
         MIDDLEWARE=(
             "django.middleware.common.CommonMiddleware",
             "corsheaders.middleware.CorsMiddleware",
@@ -24,6 +25,7 @@ def pytest_configure(config):
             "django.contrib.sites",
             "django.contrib.staticfiles",
             "polaris",
+            "polaris_bitgo",
         ),
         DATABASES={
             "default": {
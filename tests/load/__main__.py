@@ -0,0 +1,66 @@
+"""
+Runs the load harness against the local BitGo and Horizon servers.
+
+    python -m tests.load -n 200 -c 20 --latency 0.05 --throttle-rate 0.01
+"""
+
+import argparse
+import json
+import sys
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--transactions", type=int, default=100)
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Seconds each request takes."
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="Ratio of 500 responses."
+    )
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0, help="Ratio of 429 responses."
+    )
+    parser.add_argument(
+        "--key-iterations",
+        type=int,
+        default=10000,
+        help="PBKDF2 iterations of the wallet's key.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the JSON report.")
+    args = parser.parse_args()
+
+    from tests.conftest import pytest_configure
+
+    pytest_configure(None)
+
+    from tests.load.driver import run_load
+
+    report = run_load(
+        transactions=args.transactions,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        key_iterations=args.key_iterations,
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(
+        f"{report['succeeded']}/{report['transactions']} deposits in "
+        f"{report['elapsed']:.2f}s ({report['throughput']:.1f}/s) "
+        f"with concurrency {report['concurrency']}"
+    )
+    for name, value in report["latency"].items():
+        if value is not None:
+            print(f"  {name:<4} {value * 1000:10.1f} ms")
+    for name, count in report["errors"].items():
+        print(f"  {name}: {count} ({report['error_samples'][name]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Pushes concurrent ``submit_deposit_transaction`` calls through
+``BitGoIntegration`` against the local BitGo and Horizon servers, and
+reports the throughput and the latency percentiles.
+"""
+
+import math
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List, Optional
+from uuid import uuid4
+
+from stellar_sdk import Keypair
+
+from .servers import FakeBitGoServer, FakeHorizonServer
+
+ASSET_CODE = "BST"
+ASSET_ISSUER = "GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+PASSPHRASE = "mypassphrase"
+
+
+def percentile(latencies: List[float], value: float) -> Optional[float]:
+    if not latencies:
+        return None
+    latencies = sorted(latencies)
+    return latencies[max(math.ceil(value / 100 * len(latencies)) - 1, 0)]
+
+
+def make_transaction() -> SimpleNamespace:
+    """
+    Creates an in-memory deposit with the attributes read by
+    ``submit_deposit_transaction``, so the database is not measured.
+    """
+    asset = SimpleNamespace(
+        code=ASSET_CODE, issuer=ASSET_ISSUER, significant_decimals=7
+    )
+    return SimpleNamespace(
+        id=uuid4(),
+        asset=asset,
+        to_address=Keypair.random().public_key,
+        amount_in=Decimal("100"),
+        amount_fee=Decimal("1"),
+        stellar_transaction_id=None,
+    )
+
+
+def run_load(
+    transactions: int = 100,
+    concurrency: int = 10,
+    latency: float = 0,
+    error_rate: float = 0,
+    throttle_rate: float = 0,
+    key_iterations: int = 10000,
+    **integration_kwargs,
+) -> dict:
+    """
+    Runs the load and reports it.
+
+    :param transactions: The number of deposits submitted.
+    :param concurrency: The number of deposits submitted at the same time.
+    :param latency: The seconds each request to the servers takes.
+    :param error_rate: The ratio of requests that fail with a 500.
+    :param throttle_rate: The ratio of requests that fail with a 429.
+    :param key_iterations: The PBKDF2 iterations of the wallet's key.
+    :param integration_kwargs: Other ``BitGoIntegration`` parameters.
+    :return: Returns a dict with the throughput, the latency percentiles
+    in seconds, the errors by type and a message of each type.
+    """
+    from polaris import settings as polaris_settings
+
+    from polaris_bitgo.bitgo.integration import BitGoIntegration
+
+    server_kwargs = dict(
+        latency=latency, error_rate=error_rate, throttle_rate=throttle_rate
+    )
+    with FakeHorizonServer(**server_kwargs) as horizon, FakeBitGoServer(
+        horizon, passphrase=PASSPHRASE, key_iterations=key_iterations, **server_kwargs
+    ) as bitgo:
+        horizon_uri = polaris_settings.HORIZON_URI
+        polaris_settings.HORIZON_URI = horizon.url
+        try:
+            integration = BitGoIntegration(
+                api_key="apikey",
+                api_passphrase=PASSPHRASE,
+                wallet_id="walletid",
+                api_url=bitgo.url,
+                stellar_coin_code="txlm",
+                num_retries=integration_kwargs.pop("num_retries", 2),
+                **integration_kwargs,
+            )
+
+            latencies = []
+            errors = Counter()
+            error_samples = {}
+
+            def submit(transaction):
+                start = time.monotonic()
+                try:
+                    integration.submit_deposit_transaction(transaction)
+                except Exception as e:
+                    errors[type(e).__name__] += 1
+                    error_samples.setdefault(type(e).__name__, str(e)[:200])
+                    return
+                latencies.append(time.monotonic() - start)
+
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(
+                    executor.map(
+                        submit, [make_transaction() for _ in range(transactions)]
+                    )
+                )
+            elapsed = time.monotonic() - start
+        finally:
+            polaris_settings.HORIZON_URI = horizon_uri
+
+        return {
+            "transactions": transactions,
+            "concurrency": concurrency,
+            "succeeded": len(latencies),
+            "errors": dict(errors),
+            "error_samples": error_samples,
+            "elapsed": elapsed,
+            "throughput": len(latencies) / elapsed if elapsed else 0,
+            "latency": {
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "max": max(latencies, default=None),
+            },
+            "requests": {
+                "bitgo": bitgo.requests_count,
+                "horizon": horizon.requests_count,
+            },
+        }
@@ -0,0 +1,251 @@
+"""
+Local stand-ins of the BitGo's API and Horizon, used to measure the
+integration without the network. Both are seeded from ``tests/mocks``
+and run on a random port in a background thread.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from uuid import uuid4
+
+from stellar_sdk import Account, Asset, Keypair, TransactionBuilder
+from stellar_sdk.operation import Operation
+from stellar_sdk.transaction_envelope import TransactionEnvelope
+
+from tests.mocks import bitgo as bitgo_mocks
+from tests.mocks import constants
+
+NETWORK_PASSPHRASE = "Test SDF Network ; September 2015"
+
+
+class FakeServer:
+    """
+    An HTTP server that routes the requests to the ``handle_<method>``
+    methods, after the configured latency and with the configured errors.
+
+    :param latency: The seconds each request takes.
+    :param error_rate: The ratio of requests that fail with a 500.
+    :param throttle_rate: The ratio of requests that fail with a 429.
+    """
+
+    def __init__(
+        self, latency: float = 0, error_rate: float = 0, throttle_rate: float = 0
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.requests_count = 0
+
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def dispatch(self, method: str, path: str, body: dict) -> Tuple[int, dict]:
+        with self._lock:
+            self.requests_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        draw = random.random()
+        if draw < self.throttle_rate:
+            return 429, {"error": "Too Many Requests"}
+        if draw < self.throttle_rate + self.error_rate:
+            return 500, {"error": "Internal Server Error"}
+        return getattr(self, f"handle_{method}")(path, body)
+
+    def handle_get(self, path: str, body: dict) -> Tuple[int, dict]:
+        return 404, {"error": "Not Found"}
+
+    def handle_post(self, path: str, body: dict) -> Tuple[int, dict]:
+        return 404, {"error": "Not Found"}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._respond("get")
+
+            def do_POST(self):
+                self._respond("post")
+
+            def _respond(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                body = json.loads(raw_body) if raw_body else {}
+                status, data = server.dispatch(method, self.path.split("?")[0], body)
+
+                content = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class FakeHorizonServer(FakeServer):
+    """
+    Serves the transactions sent through :class:`FakeBitGoServer`.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.transactions: Dict[str, dict] = {}
+
+    def add_transaction(self, transaction_hash: str, envelope_xdr: str):
+        transaction = dict(constants.STELLAR_TRANSACTION_INFO_PAYMENT_RESPONSE)
+        transaction.update(
+            id=transaction_hash, hash=transaction_hash, envelope_xdr=envelope_xdr
+        )
+        with self._lock:
+            self.transactions[transaction_hash] = transaction
+
+    def handle_get(self, path: str, body: dict) -> Tuple[int, dict]:
+        match = re.fullmatch(r"/transactions/(\w+)", path)
+        transaction = match and self.transactions.get(match.group(1))
+        if not transaction:
+            return 404, {"status": 404, "title": "Resource Missing"}
+        return 200, transaction
+
+
+class FakeBitGoServer(FakeServer):
+    """
+    Implements the BitGo's API endpoints used by ``BitGoAPI``. The sent
+    transactions are confirmed at once and added to the Horizon server.
+
+    :param horizon: The :class:`FakeHorizonServer` of the transactions.
+    :param passphrase: The wallet's passphrase that encrypts the user key.
+    :param key_iterations: The PBKDF2 iterations of the user key.
+    """
+
+    def __init__(
+        self,
+        horizon: FakeHorizonServer,
+        passphrase: str = "mypassphrase",
+        key_iterations: int = bitgo_mocks.SJCL_ITERATIONS,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.horizon = horizon
+        self.transfers: Dict[str, dict] = {}
+        self.transfers_by_sequence_id: Dict[str, dict] = {}
+
+        self.keypair = Keypair.random()
+        self.wallet = bitgo_mocks.get_wallet_data()
+        self.wallet["coinSpecific"]["rootAddress"] = self.keypair.public_key
+        self.sequence = 1
+        self.keys = bitgo_mocks.get_wallet_key_info_data()
+        self.keys["keys"][0]["encryptedPrv"] = bitgo_mocks.sjcl_encrypt(
+            self.keypair.secret.encode(), passphrase, key_iterations
+        )
+
+    def handle_get(self, path: str, body: dict) -> Tuple[int, dict]:
+        if re.fullmatch(r"/api/v2/[^/]+/key", path):
+            return 200, self.keys
+        if re.fullmatch(r"/api/v2/[^/]+/wallet/[^/]+", path):
+            return 200, self.wallet
+
+        match = re.fullmatch(
+            r"/api/v2/[^/]+/wallet/[^/]+/transfer/sequenceId/(.+)", path
+        )
+        if match:
+            return self._get_transfer(self.transfers_by_sequence_id, match.group(1))
+        match = re.fullmatch(r"/api/v2/[^/]+/wallet/[^/]+/transfer/([^/]+)", path)
+        if match:
+            return self._get_transfer(self.transfers, match.group(1))
+        if re.fullmatch(r"/api/v2/[^/]+/wallet/[^/]+/transfer", path):
+            with self._lock:
+                return 200, {"transfers": list(self.transfers.values())}
+        return super().handle_get(path, body)
+
+    def handle_post(self, path: str, body: dict) -> Tuple[int, dict]:
+        match = re.fullmatch(r"/api/v2/([^/]+)/wallet/[^/]+/tx/build", path)
+        if match:
+            return self._build(match.group(1), body)
+        if path.endswith("/tx/send"):
+            return self._send(body)
+        if path.endswith("/address"):
+            root_address = self.wallet["coinSpecific"]["rootAddress"]
+            return 200, {"address": f"{root_address}?memoId={random.getrandbits(32)}"}
+        return super().handle_post(path, body)
+
+    def _build(self, coin: str, body: dict) -> Tuple[int, dict]:
+        root_address = self.wallet["coinSpecific"]["rootAddress"]
+        asset = Asset.native()
+        if ":" in coin:
+            asset = Asset(*coin.split(":")[1].split("-"))
+        with self._lock:
+            self.sequence += 1
+            account = Account(root_address, self.sequence)
+
+        builder = TransactionBuilder(account, NETWORK_PASSPHRASE, base_fee=100)
+        for recipient in body["recipients"]:
+            builder.append_payment_op(
+                destination=recipient["address"],
+                asset=asset,
+                amount=Operation.from_xdr_amount(int(recipient["amount"])),
+            )
+        envelope = builder.set_timeout(300).build()
+        return 200, {"txBase64": envelope.to_xdr()}
+
+    def _send(self, body: dict) -> Tuple[int, dict]:
+        envelope_xdr = body["halfSigned"]["txBase64"]
+        sequence_id: Optional[str] = body.get("sequenceId")
+        with self._lock:
+            if sequence_id in self.transfers_by_sequence_id:
+                return 400, {"error": "duplicate sequenceId", "name": "Invalid"}
+
+        transaction_hash = TransactionEnvelope.from_xdr(
+            envelope_xdr, NETWORK_PASSPHRASE
+        ).hash_hex()
+        transfer = {
+            "id": uuid4().hex,
+            "state": "confirmed",
+            "txid": transaction_hash,
+            "sequenceId": sequence_id,
+        }
+        self.horizon.add_transaction(transaction_hash, envelope_xdr)
+        with self._lock:
+            self.transfers[transfer["id"]] = transfer
+            if sequence_id:
+                self.transfers_by_sequence_id[sequence_id] = transfer
+        return 200, {"transfer": transfer, "txid": transaction_hash}
+
+    def _get_transfer(self, transfers: Dict[str, dict], key: str) -> Tuple[int, dict]:
+        with self._lock:
+            transfer = transfers.get(key)
+        if not transfer:
+            return 404, {"error": "transfer not found", "name": "NotFound"}
+        return 200, transfer
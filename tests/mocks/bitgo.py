@@ -1,10 +1,19 @@
+import base64
+import json
+import os
 from typing import List
 
 import requests
+from Crypto.Cipher import AES
+from Crypto.Hash import HMAC, SHA256
+from Crypto.Protocol.KDF import PBKDF2
 from rest_framework import status
 
 from . import constants
 
+# BitGo encrypts the wallets' user keys with 10000 PBKDF2 iterations.
+SJCL_ITERATIONS = 10000
+
 
 def get_wallet_data(*, wallet_id: str = "", keys: List[str] = None):
     if not keys:
@@ -277,3 +286,39 @@ def get_transaction_by_id_response(
     )
 
     return response
+
+
+def sjcl_encrypt(
+    plaintext: bytes, passphrase: str, iterations: int = SJCL_ITERATIONS
+) -> str:
+    """
+    Encrypts the plaintext in the SJCL format used by BitGo for the
+    wallets' keys: AES-256 in CCM mode with a 64 bits tag.
+    """
+    salt = os.urandom(8)
+    iv = os.urandom(16)
+    key = PBKDF2(
+        passphrase,
+        salt,
+        count=iterations,
+        dkLen=32,
+        prf=lambda password, salt: HMAC.new(password, salt, SHA256).digest(),
+    )
+    # For plaintexts shorter than 64KB, SJCL uses the first 13 bytes of
+    # the iv as the CCM nonce.
+    cipher = AES.new(key, AES.MODE_CCM, iv[:13], mac_len=8)
+    ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+    return json.dumps(
+        {
+            "iv": base64.b64encode(iv).decode(),
+            "v": 1,
+            "iter": iterations,
+            "ks": 256,
+            "ts": 64,
+            "mode": "ccm",
+            "adata": "",
+            "cipher": "aes",
+            "salt": base64.b64encode(salt).decode(),
+            "ct": base64.b64encode(ciphertext + tag).decode(),
+        }
+    )
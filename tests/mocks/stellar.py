@@ -0,0 +1,31 @@
+from polaris import settings as polaris_settings
+from stellar_sdk import Asset, Claimant, Keypair, TransactionBuilder
+from stellar_sdk.account import Account
+
+
+def fee_bumped_claimable_balance_envelope():
+    network_passphrase = polaris_settings.STELLAR_NETWORK_PASSPHRASE
+    source = Keypair.random()
+    fee_account = Keypair.random()
+    envelope = (
+        TransactionBuilder(
+            source_account=Account(source.public_key, 1),
+            network_passphrase=network_passphrase,
+            base_fee=100,
+        )
+        .append_create_claimable_balance_op(
+            asset=Asset.native(),
+            amount="10",
+            claimants=[Claimant(destination=Keypair.random().public_key)],
+        )
+        .build()
+    )
+    envelope.sign(source)
+    fee_bump_envelope = TransactionBuilder.build_fee_bump_transaction(
+        fee_source=fee_account,
+        base_fee=1000,
+        inner_transaction_envelope=envelope,
+        network_passphrase=network_passphrase,
+    )
+    fee_bump_envelope.sign(fee_account)
+    return envelope, fee_bump_envelope
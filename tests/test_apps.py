@@ -0,0 +1,25 @@
+from polaris_bitgo.apps import skips_warm_up, warm_up_registered_integration
+from polaris_bitgo.bitgo.integration import BitGoIntegration
+
+
+def test_skips_warm_up_of_management_commands(settings):
+    assert skips_warm_up(["manage.py", "migrate"])
+    assert skips_warm_up(["manage.py"])
+    assert not skips_warm_up(["manage.py", "process_pending_deposits"])
+    assert not skips_warm_up(["/usr/bin/gunicorn", "app.wsgi"])
+
+    settings.BITGO_WARM_UP_COMMANDS = ["migrate"]
+
+    assert not skips_warm_up(["manage.py", "migrate"])
+
+
+def test_warm_up_closes_connections(mocker):
+    integration = mocker.Mock(spec=BitGoIntegration)
+    integration.warm_up.side_effect = RuntimeError()
+    mocker.patch("polaris.integrations.registered_custody_integration", integration)
+    close_all_mock = mocker.patch("polaris_bitgo.apps.connections.close_all")
+
+    warm_up_registered_integration()
+
+    integration.warm_up.assert_called_once()
+    close_all_mock.assert_called_once()
@@ -1,9 +1,20 @@
+import time
+
 import pytest
-from stellar_sdk import Keypair
-from stellar_sdk.operation import Operation
+from polaris import settings as polaris_settings
+from requests.exceptions import ConnectionError
+from rest_framework import status
+from stellar_sdk import Asset, Keypair, TransactionBuilder
+from stellar_sdk.account import Account
+from stellar_sdk.operation import CreateClaimableBalance, Operation
+from stellar_sdk.transaction_envelope import TransactionEnvelope
 
+from polaris_bitgo.bitgo.signing import sign_envelope_xdr
+from polaris_bitgo.helpers.exceptions import BitGoAPIError
 from .mocks import bitgo as bitgo_mocks
 
+NETWORK_PASSPHRASE = polaris_settings.STELLAR_NETWORK_PASSPHRASE
+
 
 def test_bitgo_build_transaction(mocker, make_bitgo, make_recipient):
     mocker.patch(
@@ -45,6 +56,68 @@ def test_bitgo_build_transaction(mocker, make_bitgo, make_recipient):
     assert not transaction_envelope.transaction.v1
 
 
+def test_bitgo_build_claimable_balance_transaction(mocker, make_bitgo, make_recipient):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    horizon_server_mock = mocker.patch("polaris.settings.HORIZON_SERVER")
+    horizon_server_mock.fetch_base_fee.return_value = 100
+
+    bitgo = make_bitgo()
+    recipient = make_recipient()
+
+    mocker.patch(
+        "polaris_bitgo.bitgo.BitGo.get_source_account",
+        return_value=Account(bitgo.wallet.public_key, 1),
+    )
+
+    transaction_envelope = bitgo.build_claimable_balance_transaction(recipient)
+    operation = transaction_envelope.transaction.operations[0]
+
+    assert transaction_envelope.transaction.source.account_id == bitgo.wallet.public_key
+    assert isinstance(operation, CreateClaimableBalance)
+    assert str(Operation.to_xdr_amount(operation.amount)) == recipient.amount
+    assert operation.asset.code == "BST"
+    assert operation.claimants[0].destination == recipient.address
+    assert transaction_envelope.transaction.preconditions.time_bounds.max_time > 0
+
+
+def test_bitgo_build_claimable_balance_transaction_with_horizon_client(
+    mocker, make_bitgo, make_recipient
+):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    horizon_server_mock = mocker.patch("polaris.settings.HORIZON_SERVER")
+    server_mock = mocker.patch("polaris_bitgo.bitgo.bitgo.Server")
+    server_mock.return_value.fetch_base_fee.return_value = 200
+    horizon_client = mocker.Mock()
+
+    bitgo = make_bitgo()
+    server_mock.return_value.load_account.return_value = Account(
+        bitgo.wallet.public_key, 1
+    )
+
+    transaction_envelope = bitgo.build_claimable_balance_transaction(
+        make_recipient(), horizon_client=horizon_client, timeout=60
+    )
+    transaction = transaction_envelope.transaction
+    time_bounds = transaction.preconditions.time_bounds
+
+    assert server_mock.call_args.kwargs["client"] is horizon_client
+    server_mock.return_value.load_account.assert_called_once_with(
+        bitgo.wallet.public_key
+    )
+    horizon_server_mock.fetch_base_fee.assert_not_called()
+    assert transaction.fee == 200
+    assert transaction.sequence == 2
+    assert 0 < time_bounds.max_time - time.time() <= 60
+
+
 def test_bitgo_sign_transaction(mocker, make_bitgo, make_recipient):
     mocker.patch(
         "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
@@ -133,3 +206,283 @@ def test_get_stellar_transaction_id_runtime_error(mocker, make_bitgo):
         bitgo.get_stellar_transaction_id("615da283c6d7cb000686dacbdfdca0ec")
 
     bitgo_api_mock.assert_called()
+
+
+def test_send_transaction_connection_error_transfer_found(mocker, make_bitgo):
+    transfer_id = "615da283c6d7cb000686dacbdfdca0ec"
+
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    send_transaction_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        side_effect=ConnectionError(),
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_sequence_id",
+        return_value=bitgo_mocks.get_transaction_by_id_data(transaction_id=transfer_id),
+    )
+
+    bitgo = make_bitgo()
+
+    assert bitgo.send_transaction("txbase64", "polaris-sequence-id") == transfer_id
+    send_transaction_mock.assert_called_once()
+
+
+def test_send_transaction_connection_error_transfer_not_found(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    send_transaction_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        side_effect=[
+            ConnectionError(),
+            bitgo_mocks.send_transaction_response().json(),
+        ],
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_sequence_id",
+        side_effect=BitGoAPIError(
+            response=bitgo_mocks.get_transaction_by_id_response(
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        ),
+    )
+
+    bitgo = make_bitgo()
+    transfer_id = bitgo.send_transaction("txbase64", "polaris-sequence-id")
+
+    assert transfer_id == bitgo_mocks.send_transaction_data()["transfer"]["id"]
+    assert send_transaction_mock.call_count == 2
+
+
+def test_send_transaction_retry_error_transfer_found(mocker, make_bitgo):
+    transfer_id = "615da283c6d7cb000686dacbdfdca0ec"
+
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    send_transaction_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        side_effect=[
+            ConnectionError(),
+            BitGoAPIError(
+                response=bitgo_mocks.send_transaction_response(
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            ),
+        ],
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_sequence_id",
+        side_effect=[
+            BitGoAPIError(
+                response=bitgo_mocks.get_transaction_by_id_response(
+                    status_code=status.HTTP_404_NOT_FOUND
+                )
+            ),
+            bitgo_mocks.get_transaction_by_id_data(transaction_id=transfer_id),
+        ],
+    )
+
+    bitgo = make_bitgo()
+
+    assert bitgo.send_transaction("txbase64", "polaris-sequence-id") == transfer_id
+    assert send_transaction_mock.call_count == 2
+
+
+def test_send_transaction_retry_error_transfer_not_found(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        side_effect=[ConnectionError(), ConnectionError()],
+    )
+    get_transfer_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_sequence_id",
+        side_effect=BitGoAPIError(
+            response=bitgo_mocks.get_transaction_by_id_response(
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        ),
+    )
+
+    bitgo = make_bitgo()
+
+    with pytest.raises(ConnectionError):
+        bitgo.send_transaction("txbase64", "polaris-sequence-id")
+    assert get_transfer_mock.call_count == 2
+
+
+def test_send_transaction_already_sent(mocker, make_bitgo):
+    transfer_id = "615da283c6d7cb000686dacbdfdca0ec"
+
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        side_effect=BitGoAPIError(
+            response=bitgo_mocks.send_transaction_response(
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        ),
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_sequence_id",
+        return_value=bitgo_mocks.get_transaction_by_id_data(transaction_id=transfer_id),
+    )
+
+    bitgo = make_bitgo()
+
+    assert bitgo.send_transaction("txbase64", "polaris-sequence-id") == transfer_id
+
+
+def test_send_transaction_without_sequence_id_error(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        side_effect=ConnectionError(),
+    )
+
+    bitgo = make_bitgo()
+
+    with pytest.raises(ConnectionError):
+        bitgo.send_transaction("txbase64")
+
+
+def test_bitgo_with_wallet(mocker, make_wallet):
+    from django.conf import settings
+
+    from polaris_bitgo.bitgo import BitGo
+
+    get_wallet_mock = mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet")
+    get_wallet_key_info_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info"
+    )
+    wallet = make_wallet(Keypair.random().public_key, ["key1-user"])
+
+    bitgo = BitGo(
+        api_url=settings.BITGO_API_URL,
+        api_key=settings.BITGO_API_KEY,
+        api_passphrase=settings.BITGO_API_PASSPHRASE,
+        wallet_id=settings.BITGO_WALLET_ID,
+        wallet=wallet,
+    )
+
+    assert bitgo.wallet == wallet
+    get_wallet_mock.assert_not_called()
+    get_wallet_key_info_mock.assert_not_called()
+
+
+def test_get_signer_decrypts_once(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    keypair = Keypair.random()
+    decrypt_mock = mocker.patch(
+        "polaris_bitgo.bitgo.BitGo._decrypt_private_key",
+        return_value=keypair.secret,
+    )
+
+    bitgo = make_bitgo()
+    bitgo.warm_up()
+
+    assert bitgo.get_signer().public_key == keypair.public_key
+    decrypt_mock.assert_called_once()
+
+
+def test_decrypt_private_key_returns_secret_seed(mocker, make_wallet):
+    from django.conf import settings
+
+    from polaris_bitgo.bitgo import BitGo
+
+    keypair = Keypair.random()
+    wallet = make_wallet(keypair.public_key, ["key1-user"])
+    wallet.encrypted_private_key = bitgo_mocks.sjcl_encrypt(
+        keypair.secret.encode(), settings.BITGO_API_PASSPHRASE, iterations=1000
+    )
+    bitgo = BitGo(
+        api_url=settings.BITGO_API_URL,
+        api_key=settings.BITGO_API_KEY,
+        api_passphrase=settings.BITGO_API_PASSPHRASE,
+        wallet_id=settings.BITGO_WALLET_ID,
+        wallet=wallet,
+    )
+
+    secret = bitgo._decrypt_private_key()
+
+    assert isinstance(secret, str)
+    assert Keypair.from_secret(secret).public_key == keypair.public_key
+    assert bitgo.get_signer().public_key == keypair.public_key
+
+
+@pytest.mark.parametrize("signatures", [0, 1, 2])
+def test_sign_envelope_xdr_matches_transaction_envelope(signatures):
+    envelope_xdr = bitgo_mocks.build_transaction_data()["txBase64"]
+    for _ in range(signatures):
+        envelope_xdr = sign_envelope_xdr(
+            envelope_xdr, Keypair.random(), NETWORK_PASSPHRASE
+        )
+    keypair = Keypair.random()
+
+    signed_envelope_xdr = sign_envelope_xdr(
+        envelope_xdr, keypair, NETWORK_PASSPHRASE, validate=True
+    )
+
+    envelope = TransactionEnvelope.from_xdr(envelope_xdr, NETWORK_PASSPHRASE)
+    envelope.sign(keypair)
+    assert signed_envelope_xdr == envelope.to_xdr()
+
+
+def test_sign_envelope_xdr_v1_envelope():
+    keypair = Keypair.random()
+    envelope = (
+        TransactionBuilder(Account(keypair.public_key, 1), NETWORK_PASSPHRASE, 100)
+        .append_payment_op(Keypair.random().public_key, Asset.native(), "10")
+        .set_timeout(30)
+        .build()
+    )
+
+    signed_envelope_xdr = sign_envelope_xdr(
+        envelope.to_xdr(), keypair, NETWORK_PASSPHRASE, validate=True
+    )
+
+    envelope.sign(keypair)
+    assert signed_envelope_xdr == envelope.to_xdr()
+
+
+def test_bitgo_sign_transaction_xdr(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    keypair = Keypair.random()
+    mocker.patch(
+        "polaris_bitgo.bitgo.BitGo._decrypt_private_key", return_value=keypair.secret
+    )
+    envelope_xdr = bitgo_mocks.build_transaction_data()["txBase64"]
+
+    signed_envelope_xdr = make_bitgo().sign_transaction_xdr(envelope_xdr)
+
+    envelope = TransactionEnvelope.from_xdr(signed_envelope_xdr, NETWORK_PASSPHRASE)
+    assert [s.signature_hint for s in envelope.signatures] == [keypair.signature_hint()]
+    keypair.verify(envelope.hash(), envelope.signatures[0].signature)
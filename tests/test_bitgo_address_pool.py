@@ -0,0 +1,90 @@
+from polaris.models import Asset, Transaction
+
+from polaris_bitgo.bitgo.address_pool import AddressPool
+from polaris_bitgo.models import BitGoAddress
+from .mocks import bitgo as bitgo_mocks
+
+ROOT_ADDRESS = bitgo_mocks.get_wallet_data()["coinSpecific"]["rootAddress"]
+
+
+def make_transaction(save=True):
+    asset, _ = Asset.objects.get_or_create(code="XLM")
+    transaction = Transaction(asset=asset, kind=Transaction.KIND.withdrawal)
+    if save:
+        transaction.save()
+    return transaction
+
+
+def test_fill(db, mocker, make_bitgo_api):
+    bitgo_api = make_bitgo_api()
+    create_address_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.create_address",
+        side_effect=[{"address": f"{ROOT_ADDRESS}?memoId={i}"} for i in range(1, 4)],
+    )
+    BitGoAddress.objects.create(
+        wallet_id=bitgo_api.WALLET_ID, address=f"{ROOT_ADDRESS}?memoId=0"
+    )
+
+    pool = AddressPool(bitgo_api)
+
+    assert pool.fill(3) == 2
+    assert pool.fill(3) == 0
+    assert pool.size() == 3
+    assert create_address_mock.call_count == 2
+
+
+def test_claim(db, make_bitgo_api):
+    bitgo_api = make_bitgo_api()
+    address = BitGoAddress.objects.create(
+        wallet_id=bitgo_api.WALLET_ID, address=f"{ROOT_ADDRESS}?memoId=10"
+    )
+    transaction = make_transaction(save=False)
+
+    pool = AddressPool(bitgo_api)
+
+    assert pool.claim(transaction) == address
+
+    transaction.refresh_from_db()
+    address.refresh_from_db()
+    assert transaction.receiving_anchor_account == ROOT_ADDRESS
+    assert transaction.memo == "10"
+    assert transaction.memo_type == Transaction.MEMO_TYPES.id
+    assert address.transaction == transaction
+    assert address.claimed_at
+    assert pool.size() == 0
+
+
+def test_claim_empty_pool(db, make_bitgo_api):
+    transaction = make_transaction(save=False)
+
+    pool = AddressPool(make_bitgo_api())
+
+    assert pool.claim(transaction) is None
+    assert not Transaction.objects.filter(id=transaction.id).exists()
+
+
+def test_claim_many(db, make_bitgo_api):
+    bitgo_api = make_bitgo_api()
+    for i in range(2):
+        BitGoAddress.objects.create(
+            wallet_id=bitgo_api.WALLET_ID, address=f"{ROOT_ADDRESS}?memoId={i}"
+        )
+    transactions = [make_transaction() for _ in range(3)]
+
+    pool = AddressPool(bitgo_api)
+
+    assert pool.claim_many(transactions) == transactions[2:]
+    assert set(
+        Transaction.objects.filter(memo_type=Transaction.MEMO_TYPES.id).values_list(
+            "memo", flat=True
+        )
+    ) == {"0", "1"}
+    assert pool.size() == 0
+
+
+def test_parse_address():
+    assert AddressPool.parse_address(f"{ROOT_ADDRESS}?memoId=42") == (
+        ROOT_ADDRESS,
+        "42",
+    )
+    assert AddressPool.parse_address(ROOT_ADDRESS) == (ROOT_ADDRESS, None)
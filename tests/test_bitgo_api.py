@@ -1,4 +1,5 @@
 import dataclasses
+import time
 from urllib.parse import urljoin
 
 import pytest
@@ -136,6 +137,32 @@ def test_send_transaction_success(mocker, make_bitgo_api):
     assert transaction_response == bitgo_request_mock.return_value.json()
 
 
+def test_send_transaction_with_sequence_id(mocker, make_bitgo_api):
+    bitgo_build_response = bitgo_mocks.build_transaction_data()
+    sequence_id = "polaris-d6d5e0e8-6a5e-4a0f-8b67-6d0d2f1cb6a4"
+
+    bitgo_request_mock = mocker.patch(
+        REQUEST_METHOD_POST_MOCK, return_value=bitgo_mocks.send_transaction_response()
+    )
+
+    bitgo_api = make_bitgo_api()
+
+    bitgo_api.send_transaction(bitgo_build_response["txBase64"], sequence_id)
+
+    bitgo_request_mock.assert_called_once_with(
+        urljoin(
+            bitgo_api.API_URL,
+            f"/api/v2/{bitgo_api.COIN}/wallet/{bitgo_api.WALLET_ID}/tx/send",
+        ),
+        json={
+            "halfSigned": {
+                "txBase64": bitgo_build_response["txBase64"],
+            },
+            "sequenceId": sequence_id,
+        },
+    )
+
+
 def test_get_transfer_by_id_success(mocker, make_bitgo_api):
     transaction_id = "615da283c6d7cb000686dacbdfdca0ec"
     bitgo_api = make_bitgo_api()
@@ -189,3 +216,112 @@ def test_get_transfer_by_id_bad_request(mocker, make_bitgo_api):
         bitgo_api.get_transfer_by_id(transaction_id)
 
     bitgo_request_mock.assert_called_once_with(url)
+
+
+def test_get_transfer_by_sequence_id_success(mocker, make_bitgo_api):
+    transaction_id = "615da283c6d7cb000686dacbdfdca0ec"
+    sequence_id = "polaris-d6d5e0e8-6a5e-4a0f-8b67-6d0d2f1cb6a4"
+    bitgo_api = make_bitgo_api()
+
+    bitgo_request_mock = mocker.patch(
+        REQUEST_METHOD_GET_MOCK,
+        return_value=bitgo_mocks.get_transaction_by_id_response(
+            transaction_id=transaction_id, wallet_id=bitgo_api.WALLET_ID
+        ),
+    )
+
+    response_data = bitgo_api.get_transfer_by_sequence_id(sequence_id)
+
+    bitgo_request_mock.assert_called_once_with(
+        urljoin(
+            bitgo_api.API_URL,
+            f"/api/v2/{bitgo_api.COIN}/wallet/{bitgo_api.WALLET_ID}/transfer/sequenceId/{sequence_id}",
+        ),
+    )
+
+    assert response_data["id"] == transaction_id
+
+
+def test_get_wallet_hedged(mocker, make_bitgo_api):
+    from polaris_bitgo.helpers.hedging import RequestHedger
+
+    bitgo_api = make_bitgo_api()
+    bitgo_api.hedger = RequestHedger()
+    wallet_id = bitgo_api.WALLET_ID
+
+    bitgo_request_mock = mocker.patch(
+        REQUEST_METHOD_GET_MOCK,
+        return_value=bitgo_mocks.get_wallet_response(wallet_id=wallet_id),
+    )
+    hedger_call_mock = mocker.spy(bitgo_api.hedger, "call")
+
+    wallet_data = bitgo_api.get_wallet()
+
+    hedger_call_mock.assert_called_once()
+    bitgo_request_mock.assert_called_once_with(
+        urljoin(bitgo_api.API_URL, f"/api/v2/{bitgo_api.COIN}/wallet/{wallet_id}"),
+    )
+    assert wallet_data == bitgo_mocks.get_wallet_data(wallet_id=wallet_id)
+
+
+def test_get_transfers_success(mocker, make_bitgo_api):
+    bitgo_api = make_bitgo_api()
+
+    bitgo_request_mock = mocker.patch(
+        REQUEST_METHOD_GET_MOCK,
+        return_value=bitgo_mocks.get_transaction_by_id_response(),
+    )
+
+    bitgo_api.get_transfers(transfer_type="receive", prev_id="next-page")
+
+    bitgo_request_mock.assert_called_once_with(
+        urljoin(
+            bitgo_api.API_URL,
+            f"/api/v2/{bitgo_api.COIN}/wallet/{bitgo_api.WALLET_ID}/transfer",
+        ),
+        params={"type": "receive", "prevId": "next-page"},
+    )
+
+
+def test_create_address_success(mocker, make_bitgo_api):
+    bitgo_api = make_bitgo_api()
+
+    bitgo_request_mock = mocker.patch(
+        REQUEST_METHOD_POST_MOCK,
+        return_value=bitgo_mocks.send_transaction_response(),
+    )
+
+    bitgo_api.create_address()
+
+    bitgo_request_mock.assert_called_once_with(
+        urljoin(
+            bitgo_api.API_URL,
+            f"/api/v2/{bitgo_api.COIN}/wallet/{bitgo_api.WALLET_ID}/address",
+        ),
+        json={},
+    )
+
+
+def test_get_wallet_hedged_error_response(mocker, make_bitgo_api):
+    from polaris_bitgo.helpers.hedging import RequestHedger
+
+    bitgo_api = make_bitgo_api()
+    bitgo_api.hedger = RequestHedger(initial_delay=0.01, budget=1)
+    wallet_id = bitgo_api.WALLET_ID
+    responses = [
+        bitgo_mocks.get_wallet_response(
+            wallet_id=wallet_id, status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        bitgo_mocks.get_wallet_response(wallet_id=wallet_id),
+    ]
+
+    def get(url, **kwargs):
+        response = responses.pop(0)
+        time.sleep(0.05 if response.ok else 0.02)
+        return response
+
+    mocker.patch(REQUEST_METHOD_GET_MOCK, side_effect=get)
+
+    wallet_data = bitgo_api.get_wallet()
+
+    assert wallet_data == bitgo_mocks.get_wallet_data(wallet_id=wallet_id)
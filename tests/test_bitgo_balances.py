@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from polaris_bitgo.bitgo.balances import BalanceLedger
+from polaris_bitgo.bitgo.wallet_cache import WalletCache
+from .mocks import bitgo as bitgo_mocks
+
+BST_COIN = "txlm:BST-GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+
+
+def test_refresh_balances(mocker, make_bitgo_api):
+    wallet_data = bitgo_mocks.get_wallet_data()
+    wallet_data["tokens"][BST_COIN]["spendableBalanceString"] = "1000000"
+    get_wallet_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet", return_value=wallet_data
+    )
+
+    ledger = BalanceLedger(
+        WalletCache(make_bitgo_api(asset_code="XLM", asset_issuer=None))
+    )
+
+    assert ledger.get_balance("txlm") == int(wallet_data["spendableBalanceString"])
+    assert ledger.get_balance(BST_COIN) == 1000000
+    assert ledger.get_balance("txlm:USDC-ISSUER") == 0
+    get_wallet_mock.assert_called_once()
+
+
+def test_debit_balance_until_refresh(mocker, make_bitgo_api):
+    wallet_data = bitgo_mocks.get_wallet_data()
+    wallet_data["tokens"][BST_COIN]["spendableBalanceString"] = "1000000"
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet", return_value=wallet_data
+    )
+
+    ledger = BalanceLedger(
+        WalletCache(make_bitgo_api(asset_code="XLM", asset_issuer=None))
+    )
+
+    assert ledger.reserve(BST_COIN, 600000)
+    ledger.debit(BST_COIN, 600000)
+    assert not ledger.reserve(BST_COIN, 600000)
+    assert ledger.get_balance(BST_COIN) == 400000
+
+    wallet_data["tokens"][BST_COIN]["spendableBalanceString"] = "400000"
+    ledger.refresh()
+
+    assert ledger.get_balance(BST_COIN) == 400000
+
+
+def test_refresh_keeps_reservations(mocker, make_bitgo_api):
+    wallet_data = bitgo_mocks.get_wallet_data()
+    wallet_data["tokens"][BST_COIN]["spendableBalanceString"] = "1000000"
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet", return_value=wallet_data
+    )
+
+    ledger = BalanceLedger(
+        WalletCache(make_bitgo_api(asset_code="XLM", asset_issuer=None))
+    )
+
+    assert ledger.reserve(BST_COIN, 600000)
+    ledger.refresh()
+
+    assert ledger.get_balance(BST_COIN) == 400000
+    assert not ledger.reserve(BST_COIN, 600000)
+    ledger.release(BST_COIN, 600000)
+    assert ledger.get_balance(BST_COIN) == 1000000
+
+
+def test_reserve_balance(mocker, make_bitgo_api):
+    wallet_data = bitgo_mocks.get_wallet_data()
+    wallet_data["tokens"][BST_COIN]["spendableBalanceString"] = "1000000"
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet", return_value=wallet_data
+    )
+    ledger = BalanceLedger(
+        WalletCache(make_bitgo_api(asset_code="XLM", asset_issuer=None))
+    )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        reserved = list(
+            executor.map(lambda _: ledger.reserve(BST_COIN, 300000), range(8))
+        )
+
+    assert reserved.count(True) == 3
+    assert ledger.get_balance(BST_COIN) == 100000
+    ledger.release(BST_COIN, 300000)
+    assert ledger.get_balance(BST_COIN) == 400000
+
+
+def test_refresh_stale_balances(mocker, make_bitgo_api):
+    get_wallet_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_data(),
+    )
+
+    ledger = BalanceLedger(
+        WalletCache(make_bitgo_api(asset_code="XLM", asset_issuer=None)), max_age=0
+    )
+    ledger.get_balance("txlm")
+    ledger.get_balance("txlm")
+
+    assert get_wallet_mock.call_count == 2
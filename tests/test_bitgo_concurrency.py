@@ -0,0 +1,135 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import requests
+from django.conf import settings
+from polaris import settings as polaris_settings
+from polaris.models import Asset, Transaction
+from rest_framework import status
+from stellar_sdk import Keypair
+from stellar_sdk.transaction_envelope import TransactionEnvelope
+
+from polaris_bitgo.bitgo.integration import BitGoIntegration
+from .mocks import bitgo as bitgo_mocks
+
+WORKERS = 16
+PAYOUTS = 64
+
+
+class FakeBitGo:
+    """
+    Answers BitGo's API requests from the mocks, recording the requests and
+    the envelopes sent.
+    """
+
+    def __init__(self):
+        self.requests = Counter()
+        self.sent = {}
+        self.lock = threading.Lock()
+
+    def request(self, _session, method, url, json=None, **_kwargs):
+        # Lets the threads interleave between the requests.
+        time.sleep(0.001)
+        path = url.split("/api/v2/", 1)[1]
+        endpoint = path.rsplit("/", 1)[-1] if "/transfer/" not in path else "transfer"
+        with self.lock:
+            self.requests[endpoint] += 1
+
+        if endpoint == "key":
+            return self._response(bitgo_mocks.get_wallet_key_info_data())
+        if endpoint == "build":
+            return self._response(bitgo_mocks.build_transaction_data())
+        if endpoint == "send":
+            sequence_id = json["sequenceId"]
+            with self.lock:
+                self.sent[sequence_id] = json["halfSigned"]["txBase64"]
+            return self._response(
+                {"transfer": {"id": f"transfer-{sequence_id}"}, "txid": None},
+                status.HTTP_201_CREATED,
+            )
+        if endpoint == "transfer":
+            transfer_id = path.rsplit("/", 1)[-1]
+            return self._response(
+                {"id": transfer_id, "state": "confirmed", "txid": get_txid(transfer_id)}
+            )
+        return self._response(bitgo_mocks.get_wallet_data())
+
+    @staticmethod
+    def _response(data: dict, status_code: int = status.HTTP_200_OK):
+        response = requests.Response()
+        response.status_code = status_code
+        response.json = lambda: data
+        return response
+
+
+def get_txid(transfer_id: str) -> str:
+    return hashlib.sha256(transfer_id.encode()).hexdigest()
+
+
+def test_concurrent_payouts_share_the_clients(mocker):
+    fake_bitgo = FakeBitGo()
+    mocker.patch(
+        "requests.Session.request", autospec=True, side_effect=fake_bitgo.request
+    )
+    keypair = Keypair.random()
+    decrypt_mock = mocker.patch(
+        "polaris_bitgo.bitgo.BitGo._decrypt_private_key",
+        return_value=keypair.secret,
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.integration.get_stellar_network_transaction_info",
+        side_effect=lambda txid, **_kwargs: {"id": txid},
+    )
+
+    integration = BitGoIntegration(
+        api_url=settings.BITGO_API_URL,
+        api_key=settings.BITGO_API_KEY,
+        api_passphrase=settings.BITGO_API_PASSPHRASE,
+        wallet_id=settings.BITGO_WALLET_ID,
+        stellar_coin_code=settings.BITGO_STELLAR_COIN_CODE,
+        pool_maxsize=WORKERS,
+    )
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "BST"
+    asset.issuer = "GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+    asset.significant_decimals = 2
+    transactions = []
+    for _ in range(PAYOUTS):
+        transaction = mocker.Mock(spec=Transaction)
+        transaction.id = uuid4()
+        transaction.to_address = Keypair.random().public_key
+        transaction.amount_in = 100
+        transaction.amount_fee = 3
+        transaction.asset = asset
+        transactions.append(transaction)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        results = list(
+            executor.map(integration.submit_deposit_transaction, transactions)
+        )
+
+    for transaction, result in zip(transactions, results):
+        sequence_id = f"polaris-{transaction.id}"
+        assert result == {"id": get_txid(f"transfer-{sequence_id}")}
+        envelope = TransactionEnvelope.from_xdr(
+            fake_bitgo.sent[sequence_id], polaris_settings.STELLAR_NETWORK_PASSPHRASE
+        )
+        assert len(envelope.signatures) == 1
+        keypair.verify(envelope.hash(), envelope.signatures[0].signature)
+
+    assert fake_bitgo.requests["build"] == PAYOUTS
+    assert fake_bitgo.requests["send"] == PAYOUTS
+    assert fake_bitgo.requests[settings.BITGO_WALLET_ID] == 1
+    assert fake_bitgo.requests["key"] == 1
+    decrypt_mock.assert_called_once()
+
+    shard = integration.shards[0]
+    assert shard.get_metrics()["sent"] == PAYOUTS
+    assert shard.get_metrics()["pending"] == 0
+    assert len(shard._clients) == 1
+    adapter = shard.session.get_adapter(settings.BITGO_API_URL)
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == WORKERS
@@ -0,0 +1,50 @@
+import dataclasses
+
+import pytest
+
+from polaris_bitgo.bitgo.dtos import Recipient, Transfer, TransferEntry, WalletResponse
+from .mocks import bitgo as bitgo_mocks
+
+TRANSFER = {
+    "id": "transferid",
+    "state": "confirmed",
+    "type": "send",
+    "txid": "txid",
+    "sequenceId": "polaris-bitgo-id",
+    "date": "2022-01-01T00:00:00.000Z",
+    "baseValueString": "-100000000",
+    "valueString": "-100000100",
+    "entries": [{"address": "GADDRESS", "valueString": "100000000"}],
+    "coinSpecific": {"memo": {"type": "hash", "value": "bWVtbw=="}},
+    "history": [{"action": "created"}],
+}
+
+
+def test_slotted_models_have_no_dict():
+    recipient = Recipient(amount="100", address="GADDRESS")
+
+    assert not hasattr(recipient, "__dict__")
+    with pytest.raises(AttributeError):
+        recipient.memo = "memo"
+    assert dataclasses.asdict(recipient) == {"amount": "100", "address": "GADDRESS"}
+
+
+def test_transfer_from_json():
+    transfer = Transfer.from_json(TRANSFER)
+
+    assert transfer.id == "transferid"
+    assert transfer.sequence_id == "polaris-bitgo-id"
+    assert transfer.value == -100000000
+    assert transfer.entries == (TransferEntry(address="GADDRESS", value=100000000),)
+    assert (transfer.memo_type, transfer.memo_value) == ("hash", "bWVtbw==")
+    assert transfer == Transfer.from_json(TRANSFER)
+
+
+def test_wallet_response_from_json():
+    wallet = WalletResponse.from_json(bitgo_mocks.get_wallet_data())
+
+    assert wallet.public_key == (
+        bitgo_mocks.get_wallet_data()["coinSpecific"]["rootAddress"]
+    )
+    assert wallet.keys == bitgo_mocks.get_wallet_data()["keys"]
+    assert not hasattr(wallet, "__dict__")
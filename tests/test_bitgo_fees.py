@@ -0,0 +1,161 @@
+import pytest
+from polaris import settings as polaris_settings
+from stellar_sdk import Keypair
+from stellar_sdk.client.response import Response
+from stellar_sdk.exceptions import BadRequestError
+from stellar_sdk.fee_bump_transaction_envelope import FeeBumpTransactionEnvelope
+from stellar_sdk.transaction_envelope import TransactionEnvelope
+
+from polaris_bitgo.bitgo.fees import FeeBumper, FeePolicy
+from .mocks import bitgo as bitgo_mocks
+
+NETWORK_PASSPHRASE = polaris_settings.STELLAR_NETWORK_PASSPHRASE
+FETCH_FEE_STATS = "polaris_bitgo.bitgo.fees.FeePolicy._fetch_fee_stats"
+SUBMIT_TRANSACTION = "polaris_bitgo.bitgo.fees.Server.submit_transaction"
+
+
+def make_fee_stats(ledger_capacity_usage: str = "0.5", last_ledger: str = "1"):
+    return {
+        "last_ledger": last_ledger,
+        "last_ledger_base_fee": "100",
+        "ledger_capacity_usage": ledger_capacity_usage,
+        "fee_charged": {"p10": "100", "p50": "200", "p95": "5000", "p99": "20000"},
+    }
+
+
+@pytest.fixture
+def signed_envelope_xdr():
+    envelope = TransactionEnvelope.from_xdr(
+        bitgo_mocks.build_transaction_data()["txBase64"], NETWORK_PASSPHRASE
+    )
+    envelope.sign(Keypair.random())
+    return envelope.to_xdr()
+
+
+def test_fee_policy_percentile_by_congestion(mocker):
+    now = [0.0]
+    mocker.patch(
+        FETCH_FEE_STATS,
+        side_effect=[make_fee_stats("0.5"), make_fee_stats("0.97", last_ledger="2")],
+    )
+    fee_policy = FeePolicy(max_fee=1000, clock=lambda: now[0])
+
+    assert fee_policy.get_fee() == 200
+    assert not fee_policy.is_congested()
+
+    now[0] = 5
+    assert fee_policy.get_fee() == 1000
+    assert fee_policy.is_congested()
+
+
+def test_fee_policy_caches_fee_stats_per_ledger(mocker):
+    now = [0.0]
+    fetch_mock = mocker.patch(FETCH_FEE_STATS, return_value=make_fee_stats())
+    fee_policy = FeePolicy(max_age=5, clock=lambda: now[0])
+
+    for now[0] in (0, 1, 4.9):
+        fee_policy.get_fee()
+    assert fetch_mock.call_count == 1
+
+    now[0] = 5
+    fee_policy.get_fee()
+    assert fetch_mock.call_count == 2
+
+
+def test_build_transaction_requests_policy_fee(mocker, make_bitgo, make_recipient):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    post_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI._post",
+        return_value=bitgo_mocks.build_transaction_response(),
+    )
+    mocker.patch(FETCH_FEE_STATS, return_value=make_fee_stats())
+
+    bitgo = make_bitgo()
+    bitgo.build_transaction(make_recipient(), FeePolicy())
+    bitgo.build_transaction(make_recipient())
+
+    assert post_mock.call_args_list[0].kwargs["json"]["feeRate"] == 200
+    assert "feeRate" not in post_mock.call_args_list[1].kwargs["json"]
+
+
+def test_fee_bump_wraps_signed_envelope(mocker, signed_envelope_xdr):
+    mocker.patch(FETCH_FEE_STATS, return_value=make_fee_stats())
+    submit_mock = mocker.patch(SUBMIT_TRANSACTION)
+    fee_account = Keypair.random()
+    fee_bumper = FeeBumper(fee_account.secret)
+
+    inner_envelope = TransactionEnvelope.from_xdr(
+        signed_envelope_xdr, NETWORK_PASSPHRASE
+    )
+    inner_base_fee = inner_envelope.transaction.fee // len(
+        inner_envelope.transaction.operations
+    )
+
+    assert fee_bumper.bump(signed_envelope_xdr) == inner_base_fee * 10
+
+    fee_bump_envelope = submit_mock.call_args.args[0]
+    assert isinstance(fee_bump_envelope, FeeBumpTransactionEnvelope)
+    fee_bump_transaction = fee_bump_envelope.transaction
+    assert fee_bump_transaction.fee_source.account_id == fee_account.public_key
+    assert fee_bump_transaction.base_fee == inner_base_fee * 10
+    assert (
+        fee_bump_transaction.inner_transaction_envelope.hash() == inner_envelope.hash()
+    )
+    assert len(fee_bump_transaction.inner_transaction_envelope.signatures) == 1
+    fee_account.verify(
+        fee_bump_envelope.hash(), fee_bump_envelope.signatures[0].signature
+    )
+
+
+def test_fee_bump_submission_error(mocker, signed_envelope_xdr):
+    mocker.patch(FETCH_FEE_STATS, return_value=make_fee_stats())
+    mocker.patch(
+        SUBMIT_TRANSACTION,
+        side_effect=BadRequestError(
+            Response(400, '{"title": "Transaction Failed"}', {}, "")
+        ),
+    )
+    fee_bumper = FeeBumper(Keypair.random().secret)
+
+    assert fee_bumper.bump(signed_envelope_xdr) is None
+
+
+def test_fee_bumper_watch_bumps_stuck_payouts(mocker):
+    mocker.patch(FETCH_FEE_STATS, return_value=make_fee_stats())
+    fee_bumper = FeeBumper(Keypair.random().secret, stuck_after=30, max_bumps=2)
+    bump_mock = mocker.patch.object(fee_bumper, "bump", side_effect=[1000, 10000])
+
+    on_unconfirmed = fee_bumper.watch("envelope")
+    for elapsed in (1, 29, 30, 31, 59, 60, 90, 120):
+        on_unconfirmed(elapsed)
+
+    assert bump_mock.call_args_list == [
+        mocker.call("envelope", 0),
+        mocker.call("envelope", 1000),
+    ]
+
+
+def test_get_stellar_transaction_id_reports_unconfirmed(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_id",
+        side_effect=[
+            {"state": "signed"},
+            {"state": "signed"},
+            {"state": "confirmed", "txid": "txid"},
+        ],
+    )
+    on_unconfirmed = mocker.Mock()
+
+    assert make_bitgo().get_stellar_transaction_id("transferid", on_unconfirmed) == (
+        "txid"
+    )
+    assert on_unconfirmed.call_count == 2
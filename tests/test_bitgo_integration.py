@@ -1,52 +1,54 @@
+from decimal import Decimal
 from uuid import uuid4
 
+import pytest
 from polaris.models import Asset, Transaction
 from rest_framework.request import Request
 from stellar_sdk.keypair import Keypair
+from stellar_sdk.transaction_envelope import TransactionEnvelope
 
+from polaris_bitgo.bitgo.dtos import Transfer
 from .mocks import bitgo as bitgo_mocks, constants
 
+BST_COIN = "txlm:BST-GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+
 
 def test_get_distribution_account(mocker, make_bitgo_integration):
-    mocker.patch(
+    get_wallet_mock = mocker.patch(
         "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
         return_value=bitgo_mocks.get_wallet_response().json(),
     )
-    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
-
-    stellar_account_address = Keypair.random().public_key
-    bitgo_mock = mocker.patch(
-        "polaris_bitgo.bitgo.BitGo.get_public_key",
-        return_value=stellar_account_address,
+    get_wallet_key_info_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info"
     )
 
-    asset = mocker.Mock(spec=Asset)
-    asset.code = "USDC"
-    asset.issuer = Keypair.random().public_key
+    root_address = bitgo_mocks.get_wallet_data()["coinSpecific"]["rootAddress"]
 
     bitgo_integration = make_bitgo_integration
-    bitgo_account_address = bitgo_integration.get_distribution_account(asset)
+    for code in ["USDC", "BST", "XLM"]:
+        asset = mocker.Mock(spec=Asset)
+        asset.code = code
+        asset.issuer = None if code == "XLM" else Keypair.random().public_key
 
-    bitgo_mock.assert_called_once()
+        assert bitgo_integration.get_distribution_account(asset) == root_address
 
-    assert bitgo_account_address == stellar_account_address
+    get_wallet_mock.assert_called_once()
+    get_wallet_key_info_mock.assert_not_called()
 
 
 def test_save_receiving_account_and_memo(db, mocker, make_bitgo_integration):
-    mocker.patch(
+    get_wallet_mock = mocker.patch(
         "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
         return_value=bitgo_mocks.get_wallet_response().json(),
     )
-    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    get_wallet_key_info_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info"
+    )
     mocker.patch(
         "polaris_bitgo.bitgo.integration.memo_hex_to_base64", return_value="aramdommemo"
     )
 
-    stellar_account_address = Keypair.random().public_key
-    bitgo_mock = mocker.patch(
-        "polaris_bitgo.bitgo.BitGo.get_public_key",
-        return_value=stellar_account_address,
-    )
+    root_address = bitgo_mocks.get_wallet_data()["coinSpecific"]["rootAddress"]
 
     request = mocker.Mock(spec=Request)
 
@@ -60,14 +62,48 @@ def test_save_receiving_account_and_memo(db, mocker, make_bitgo_integration):
 
     bitgo_integration = make_bitgo_integration
     bitgo_integration.save_receiving_account_and_memo(request, transaction)
+    bitgo_integration.save_receiving_account_and_memo(request, transaction)
 
-    bitgo_mock.assert_called_once()
+    get_wallet_mock.assert_called_once()
+    get_wallet_key_info_mock.assert_not_called()
+    transaction.save.assert_called()
 
-    assert transaction.receiving_anchor_account == stellar_account_address
+    assert transaction.receiving_anchor_account == root_address
     assert transaction.memo_type == Transaction.MEMO_TYPES.hash
     assert transaction.memo == "aramdommemo"
 
 
+def test_save_receiving_accounts_and_memos(mocker, make_bitgo_integration):
+    get_wallet_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    bulk_update_mock = mocker.patch(
+        "polaris_bitgo.bitgo.integration.Transaction.objects.bulk_update"
+    )
+
+    root_address = bitgo_mocks.get_wallet_data()["coinSpecific"]["rootAddress"]
+
+    transactions = []
+    for _ in range(3):
+        transaction = mocker.Mock(spec=Transaction)
+        transaction.id = uuid4()
+        transactions.append(transaction)
+
+    bitgo_integration = make_bitgo_integration
+    bitgo_integration.save_receiving_accounts_and_memos(transactions)
+
+    get_wallet_mock.assert_called_once()
+    bulk_update_mock.assert_called_once_with(
+        transactions, ["receiving_anchor_account", "memo", "memo_type"]
+    )
+    assert len({transaction.memo for transaction in transactions}) == 3
+    for transaction in transactions:
+        assert transaction.receiving_anchor_account == root_address
+        assert transaction.memo_type == Transaction.MEMO_TYPES.hash
+        transaction.save.assert_not_called()
+
+
 def test_create_destination_account(mocker, make_bitgo_integration):
     mocker.patch(
         "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
@@ -140,6 +176,8 @@ def test_submit_deposit_transaction(mocker, make_bitgo_integration):
     )
 
     asset = mocker.Mock(spec=Asset)
+    asset.code = "BST"
+    asset.issuer = "GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
     asset.significant_decimals = 2
 
     transaction = mocker.Mock(spec=Transaction)
@@ -152,3 +190,468 @@ def test_submit_deposit_transaction(mocker, make_bitgo_integration):
     transaction_info = bitgo_integration.submit_deposit_transaction(transaction)
 
     assert transaction_info == constants.STELLAR_TRANSACTION_INFO_PAYMENT_RESPONSE
+
+
+def test_create_destination_account_native_deposit(mocker, make_bitgo_integration):
+    from polaris import settings as polaris_settings
+    from stellar_sdk.operation import Operation
+
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    mocker.patch(
+        "polaris_bitgo.bitgo.BitGo._decrypt_private_key",
+        return_value=Keypair.random().secret,
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        return_value=bitgo_mocks.send_transaction_response().json(),
+    )
+    build_transaction_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.build_transaction",
+        return_value=bitgo_mocks.build_transaction_response().json(),
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_id",
+        return_value={
+            "state": "confirmed",
+            "txid": constants.STELLAR_TRANSACTION_INFO_CREATE_ACCOUNT_RESPONSE["id"],
+        },
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.integration.get_stellar_network_transaction_info",
+        return_value=constants.STELLAR_TRANSACTION_INFO_CREATE_ACCOUNT_RESPONSE,
+    )
+
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "XLM"
+    asset.issuer = None
+    asset.significant_decimals = 7
+
+    transaction = mocker.Mock(spec=Transaction)
+    transaction.to_address = Keypair.random().public_key
+    transaction.amount_in = 100
+    transaction.amount_fee = 3
+    transaction.asset = asset
+
+    bitgo_integration = make_bitgo_integration
+    transaction_info = bitgo_integration.create_destination_account(transaction)
+
+    recipient = build_transaction_mock.call_args[0][0]
+    expected_amount = Decimal(polaris_settings.ACCOUNT_STARTING_BALANCE) + 97
+
+    assert recipient.amount == str(Operation.to_xdr_amount(expected_amount))
+    assert (
+        transaction_info == constants.STELLAR_TRANSACTION_INFO_CREATE_ACCOUNT_RESPONSE
+    )
+    assert transaction.stellar_transaction_id == transaction_info["id"]
+    transaction.save.assert_called_once()
+
+
+def test_submit_deposit_transaction_native_already_settled(
+    mocker, make_bitgo_integration
+):
+    build_transaction_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.build_transaction"
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.integration.get_stellar_network_transaction_info",
+        return_value=constants.STELLAR_TRANSACTION_INFO_CREATE_ACCOUNT_RESPONSE,
+    )
+
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "XLM"
+    asset.issuer = None
+
+    transaction = mocker.Mock(spec=Transaction)
+    transaction.to_address = "GAZYXXMPCYYWDARHPEXRAGWGVAVT4GCCA5XF4SN6JOM72XJFEEDYRS3E"
+    transaction.stellar_transaction_id = (
+        constants.STELLAR_TRANSACTION_INFO_CREATE_ACCOUNT_RESPONSE["id"]
+    )
+    transaction.asset = asset
+
+    bitgo_integration = make_bitgo_integration
+    transaction_info = bitgo_integration.submit_deposit_transaction(transaction)
+
+    build_transaction_mock.assert_not_called()
+    assert (
+        transaction_info == constants.STELLAR_TRANSACTION_INFO_CREATE_ACCOUNT_RESPONSE
+    )
+
+
+def test_submit_deposit_transaction_native_already_settled_fee_bumped(
+    mocker, make_bitgo_integration
+):
+    from polaris import settings as polaris_settings
+    from stellar_sdk import TransactionBuilder
+
+    network_passphrase = polaris_settings.STELLAR_NETWORK_PASSPHRASE
+    transaction_info = constants.STELLAR_TRANSACTION_INFO_CREATE_ACCOUNT_RESPONSE
+    fee_account = Keypair.random()
+    fee_bump_envelope = TransactionBuilder.build_fee_bump_transaction(
+        fee_source=fee_account,
+        base_fee=1000,
+        inner_transaction_envelope=TransactionEnvelope.from_xdr(
+            transaction_info["envelope_xdr"], network_passphrase
+        ),
+        network_passphrase=network_passphrase,
+    )
+    fee_bump_envelope.sign(fee_account)
+    build_transaction_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.build_transaction"
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.integration.get_stellar_network_transaction_info",
+        return_value={**transaction_info, "envelope_xdr": fee_bump_envelope.to_xdr()},
+    )
+
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "XLM"
+    asset.issuer = None
+
+    transaction = mocker.Mock(spec=Transaction)
+    transaction.to_address = "GAZYXXMPCYYWDARHPEXRAGWGVAVT4GCCA5XF4SN6JOM72XJFEEDYRS3E"
+    transaction.stellar_transaction_id = transaction_info["id"]
+    transaction.asset = asset
+
+    bitgo_integration = make_bitgo_integration
+    fee_bumped_info = bitgo_integration.submit_deposit_transaction(transaction)
+
+    build_transaction_mock.assert_not_called()
+    assert fee_bumped_info["fee_bump_envelope_xdr"] == fee_bump_envelope.to_xdr()
+    inner_envelope = TransactionEnvelope.from_xdr(
+        fee_bumped_info["envelope_xdr"], network_passphrase
+    )
+    assert (
+        inner_envelope.hash()
+        == fee_bump_envelope.transaction.inner_transaction_envelope.hash()
+    )
+
+
+def test_submit_deposit_transaction_without_trustline(mocker, make_bitgo_integration):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    mocker.patch(
+        "polaris_bitgo.bitgo.BitGo._decrypt_private_key",
+        return_value=Keypair.random().secret,
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        return_value=bitgo_mocks.send_transaction_response().json(),
+    )
+    build_transaction_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.build_transaction"
+    )
+    build_claimable_balance_mock = mocker.patch(
+        "polaris_bitgo.bitgo.BitGo.build_claimable_balance_transaction",
+        return_value=TransactionEnvelope.from_xdr(
+            bitgo_mocks.build_transaction_data()["txBase64"],
+            "Test SDF Network ; September 2015",
+        ),
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_id",
+        return_value={
+            "state": "confirmed",
+            "txid": constants.STELLAR_TRANSACTION_INFO_PAYMENT_RESPONSE["id"],
+        },
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.integration.get_stellar_network_transaction_info",
+        return_value=constants.STELLAR_TRANSACTION_INFO_PAYMENT_RESPONSE,
+    )
+
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "BST"
+    asset.issuer = "GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+    asset.significant_decimals = 2
+
+    transaction = mocker.Mock(spec=Transaction)
+    transaction.to_address = Keypair.random().public_key
+    transaction.amount_in = 100
+    transaction.amount_fee = 3
+    transaction.asset = asset
+
+    bitgo_integration = make_bitgo_integration
+    transaction_info = bitgo_integration.submit_deposit_transaction(
+        transaction, has_trustline=False
+    )
+
+    build_transaction_mock.assert_not_called()
+    build_claimable_balance_mock.assert_called_once()
+    assert (
+        build_claimable_balance_mock.call_args.args[2]
+        is bitgo_integration.horizon_client
+    )
+    assert transaction_info == constants.STELLAR_TRANSACTION_INFO_PAYMENT_RESPONSE
+
+
+def test_save_receiving_account_and_memo_from_address_pool(
+    db, mocker, make_bitgo_integration
+):
+    from polaris_bitgo.bitgo.address_pool import AddressPool
+
+    get_wallet_mock = mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet")
+    claim_mock = mocker.patch(
+        "polaris_bitgo.bitgo.address_pool.AddressPool.claim", return_value=True
+    )
+
+    transaction = mocker.Mock(spec=Transaction)
+
+    bitgo_integration = make_bitgo_integration
+    bitgo_integration.address_pool = AddressPool(bitgo_integration._create_bitgo_api())
+    bitgo_integration.save_receiving_account_and_memo(
+        mocker.Mock(spec=Request), transaction
+    )
+
+    claim_mock.assert_called_once_with(transaction)
+    get_wallet_mock.assert_not_called()
+    transaction.save.assert_not_called()
+
+
+def test_submit_deposit_transaction_insufficient_balance(
+    mocker, make_bitgo_integration
+):
+    from polaris_bitgo.bitgo.balances import BalanceLedger
+    from polaris.exceptions import TransactionSubmissionBlocked
+
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    build_transaction_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.build_transaction"
+    )
+
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "BST"
+    asset.issuer = "GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+    asset.significant_decimals = 2
+
+    transaction = mocker.Mock(spec=Transaction)
+    transaction.to_address = Keypair.random().public_key
+    transaction.amount_in = 100
+    transaction.amount_fee = 3
+    transaction.asset = asset
+
+    bitgo_integration = make_bitgo_integration
+    bitgo_integration.shards[0].balance_ledger = BalanceLedger(
+        bitgo_integration.wallet_cache
+    )
+
+    with pytest.raises(TransactionSubmissionBlocked):
+        bitgo_integration.submit_deposit_transaction(transaction)
+
+    build_transaction_mock.assert_not_called()
+
+
+def test_submit_deposit_transaction_without_wallet_trustline(
+    mocker, make_bitgo_integration
+):
+    from polaris.exceptions import TransactionSubmissionBlocked
+
+    get_wallet_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    build_transaction_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.build_transaction"
+    )
+
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "USDC"
+    asset.issuer = Keypair.random().public_key
+    asset.significant_decimals = 2
+
+    transaction = mocker.Mock(spec=Transaction)
+    transaction.to_address = Keypair.random().public_key
+    transaction.amount_in = 100
+    transaction.amount_fee = 3
+    transaction.asset = asset
+
+    with pytest.raises(TransactionSubmissionBlocked):
+        make_bitgo_integration.submit_deposit_transaction(transaction)
+
+    assert get_wallet_mock.call_count == 2
+    build_transaction_mock.assert_not_called()
+
+
+def test_submit_deposit_transaction_releases_reserved_balance(
+    mocker, make_bitgo_integration
+):
+    from polaris_bitgo.bitgo.balances import BalanceLedger
+
+    wallet_data = bitgo_mocks.get_wallet_data()
+    wallet_data["tokens"][BST_COIN]["spendableBalanceString"] = "1000000000"
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet", return_value=wallet_data
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.build_transaction",
+        side_effect=RuntimeError("unavailable"),
+    )
+
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "BST"
+    asset.issuer = "GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+    asset.significant_decimals = 2
+
+    transaction = mocker.Mock(spec=Transaction)
+    transaction.to_address = Keypair.random().public_key
+    transaction.amount_in = 100
+    transaction.amount_fee = 3
+    transaction.asset = asset
+
+    bitgo_integration = make_bitgo_integration
+    ledger = BalanceLedger(bitgo_integration.wallet_cache)
+    bitgo_integration.shards[0].balance_ledger = ledger
+
+    with pytest.raises(RuntimeError):
+        bitgo_integration.submit_deposit_transaction(transaction)
+
+    assert ledger.get_balance(BST_COIN) == 1000000000
+
+
+def test_submit_deposit_transaction_holds_payout_slot_until_confirmed(
+    mocker, make_bitgo_integration
+):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    mocker.patch(
+        "polaris_bitgo.bitgo.BitGo._decrypt_private_key",
+        return_value=Keypair.random().secret,
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        return_value=bitgo_mocks.send_transaction_response().json(),
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.build_transaction",
+        return_value=bitgo_mocks.build_transaction_response().json(),
+    )
+    shard = make_bitgo_integration.shards[0]
+    slot_held = []
+
+    def get_stellar_transaction_id(*_args, **_kwargs):
+        slot_held.append(shard._payouts_in_flight == 1)
+        raise RuntimeError("unconfirmed")
+
+    mocker.patch(
+        "polaris_bitgo.bitgo.BitGo.get_stellar_transaction_id",
+        side_effect=get_stellar_transaction_id,
+    )
+
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "BST"
+    asset.issuer = "GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+    asset.significant_decimals = 2
+
+    transaction = mocker.Mock(spec=Transaction)
+    transaction.to_address = Keypair.random().public_key
+    transaction.amount_in = 100
+    transaction.amount_fee = 3
+    transaction.asset = asset
+
+    with pytest.raises(RuntimeError):
+        make_bitgo_integration.submit_deposit_transaction(transaction)
+
+    assert slot_held == [True]
+    assert shard._payouts_in_flight == 0
+    assert shard.get_metrics()["failed"] == 1
+
+
+def test_warm_up(mocker, make_bitgo_integration):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    decrypt_mock = mocker.patch(
+        "polaris_bitgo.bitgo.BitGo._decrypt_private_key",
+        return_value=Keypair.random().secret,
+    )
+    root_mock = mocker.patch(
+        "stellar_sdk.call_builder.call_builder_sync.base_call_builder.BaseCallBuilder.call"
+    )
+
+    assets = []
+    for code in ["XLM", "BST"]:
+        asset = mocker.Mock(spec=Asset)
+        asset.code = code
+        asset.issuer = None if code == "XLM" else Keypair.random().public_key
+        assets.append(asset)
+
+    bitgo_integration = make_bitgo_integration
+    results = bitgo_integration.warm_up(assets)
+
+    assert results == {
+        "horizon": None,
+        "walletid/txlm": None,
+        f"walletid/txlm:BST-{assets[1].issuer}": None,
+    }
+    root_mock.assert_called_once()
+    for asset in assets:
+        bitgo_integration.shards[0].get_client(asset).get_signer()
+    assert decrypt_mock.call_count == 2
+
+
+def test_warm_up_reports_failures(mocker, make_bitgo_integration):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        side_effect=RuntimeError("unavailable"),
+    )
+    mocker.patch(
+        "stellar_sdk.call_builder.call_builder_sync.base_call_builder.BaseCallBuilder.call"
+    )
+    asset = mocker.Mock(spec=Asset)
+    asset.code = "XLM"
+    asset.issuer = None
+
+    results = make_bitgo_integration.warm_up([asset])
+
+    assert results["horizon"] is None
+    assert isinstance(results["walletid/txlm"], RuntimeError)
+
+
+def test_get_sent_deposit_transaction(mocker, make_bitgo_integration):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    get_transfer_mock = mocker.patch(
+        "polaris_bitgo.bitgo.BitGo.get_transfer_by_sequence_id",
+        side_effect=[None, Transfer.from_json({"id": "transferid", "state": "signed"})],
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.BitGo.get_stellar_transaction_id",
+        return_value="stellartxid",
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.integration.get_stellar_network_transaction_info",
+        return_value=constants.STELLAR_TRANSACTION_INFO_PAYMENT_RESPONSE,
+    )
+
+    transaction = mocker.Mock(spec=Transaction)
+    transaction.id = uuid4()
+    transaction.asset = mocker.Mock(spec=Asset)
+    transaction.asset.code = "BST"
+    transaction.asset.issuer = Keypair.random().public_key
+
+    bitgo_integration = make_bitgo_integration
+
+    assert bitgo_integration.get_sent_deposit_transaction(transaction) is None
+    assert (
+        bitgo_integration.get_sent_deposit_transaction(transaction)
+        == constants.STELLAR_TRANSACTION_INFO_PAYMENT_RESPONSE
+    )
+    get_transfer_mock.assert_called_with(f"polaris-{transaction.id}")
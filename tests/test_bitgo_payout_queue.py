@@ -0,0 +1,309 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from polaris.management.commands.process_pending_deposits import (
+    ProcessPendingDeposits,
+)
+from polaris.models import Asset, Transaction
+from requests.adapters import DEFAULT_POOLSIZE
+from stellar_sdk import Keypair
+
+from polaris_bitgo.bitgo.integration import BitGoIntegration
+from polaris_bitgo.bitgo.payout_queue import PAYOUT_QUEUE, PayoutQueue
+from polaris_bitgo.models import BitGoPayout, BitGoWalletLock
+from .mocks import stellar as stellar_mocks
+
+
+def make_deposit():
+    asset, _ = Asset.objects.get_or_create(
+        code="BST", issuer="GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+    )
+    return Transaction.objects.create(
+        asset=asset,
+        kind=Transaction.KIND.deposit,
+        status=Transaction.STATUS.pending_anchor,
+        amount_in=Decimal("100"),
+        amount_fee=Decimal("1"),
+        to_address=Keypair.random().public_key,
+    )
+
+
+def make_integration(mocker):
+    integration = mocker.Mock(spec=BitGoIntegration)
+    integration.pool_maxsize = DEFAULT_POOLSIZE
+    return integration
+
+
+def make_transaction_json(transaction, **_kwargs):
+    return {
+        "id": transaction.id.hex * 2,
+        "paging_token": "123",
+        "successful": True,
+    }
+
+
+def test_max_workers_within_pool_maxsize(mocker):
+    integration = make_integration(mocker)
+
+    with pytest.raises(ValueError):
+        PayoutQueue(integration, max_workers=DEFAULT_POOLSIZE + 1)
+    assert PayoutQueue(integration, max_workers=DEFAULT_POOLSIZE)
+
+
+def test_enqueue_requeues_failed_payouts(db):
+    transaction = make_deposit()
+    payout = PayoutQueue.enqueue(transaction)
+
+    assert PayoutQueue.enqueue(transaction) == payout
+    BitGoPayout.objects.filter(id=payout.id).update(status=BitGoPayout.Status.FAILED)
+    payout = PayoutQueue.enqueue(transaction, has_trustline=False)
+
+    assert payout.status == BitGoPayout.Status.PENDING
+    assert not payout.has_trustline
+
+
+def test_enqueue_hides_deposit_from_polaris(db):
+    transaction = make_deposit()
+    transaction.status = Transaction.STATUS.pending_user_transfer_start
+    transaction.save()
+
+    PayoutQueue.enqueue(transaction)
+
+    transaction.refresh_from_db()
+    assert transaction.status == Transaction.STATUS.pending_anchor
+    assert transaction.submission_status == Transaction.SUBMISSION_STATUS.ready
+    assert transaction.queue == PAYOUT_QUEUE
+    assert not ProcessPendingDeposits.get_unblocked_transactions()
+
+
+def test_claim(db, mocker):
+    payouts = [PayoutQueue.enqueue(make_deposit()) for _ in range(3)]
+    queue = PayoutQueue(make_integration(mocker))
+
+    claimed = queue.claim(2)
+
+    assert [payout.id for payout in claimed] == [payouts[0].id, payouts[1].id]
+    assert all(payout.status == BitGoPayout.Status.PROCESSING for payout in claimed)
+    assert all(payout.attempts == 1 for payout in claimed)
+    assert [payout.id for payout in queue.claim(2)] == [payouts[2].id]
+    assert queue.claim(2) == []
+
+
+def test_claim_expired_leases(db, mocker):
+    payouts = [PayoutQueue.enqueue(make_deposit()) for _ in range(2)]
+    crashed_queue = PayoutQueue(make_integration(mocker), worker_id="a")
+    queue = PayoutQueue(make_integration(mocker), worker_id="b")
+    assert len(crashed_queue.claim(2)) == 2
+
+    assert queue.claim(2) == []
+
+    BitGoPayout.objects.filter(id=payouts[0].id).update(
+        lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+    )
+    claimed = queue.claim(2)
+
+    assert [payout.id for payout in claimed] == [payouts[0].id]
+    assert claimed[0].lease_owner == "b"
+    assert claimed[0].attempts == 2
+
+
+def test_renew_leases(db, mocker):
+    PayoutQueue.enqueue(make_deposit())
+    queue = PayoutQueue(make_integration(mocker), lease_duration=30)
+    payout = queue.claim(1)[0]
+    BitGoPayout.objects.filter(id=payout.id).update(
+        lease_expires_at=datetime.now(timezone.utc)
+    )
+
+    assert queue.renew_leases() == 0
+    queue._in_flight.add(payout.id)
+    assert queue.renew_leases() == 1
+
+    payout.refresh_from_db()
+    assert payout.lease_expires_at > datetime.now(timezone.utc) + timedelta(seconds=20)
+
+
+def test_process(db, mocker):
+    integration = make_integration(mocker)
+    integration.submit_deposit_transaction.side_effect = make_transaction_json
+    mocker.patch("polaris_bitgo.bitgo.payout_queue.rdi")
+    transaction = make_deposit()
+    PayoutQueue.enqueue(transaction)
+    queue = PayoutQueue(integration)
+
+    queue.process(queue.claim(1)[0])
+
+    integration.submit_deposit_transaction.assert_called_once_with(
+        transaction, has_trustline=True
+    )
+    transaction.refresh_from_db()
+    assert transaction.status == Transaction.STATUS.completed
+    assert transaction.stellar_transaction_id == transaction.id.hex * 2
+    assert transaction.amount_out == Decimal("99")
+    assert transaction.bitgo_payout.status == BitGoPayout.Status.COMPLETED
+
+
+def test_process_fee_bumped_claimable_balance(db, mocker):
+    envelope, fee_bump_envelope = stellar_mocks.fee_bumped_claimable_balance_envelope()
+    integration = make_integration(mocker)
+    integration.submit_deposit_transaction.side_effect = (
+        lambda transaction, **_kwargs: {
+            **make_transaction_json(transaction),
+            "envelope_xdr": fee_bump_envelope.to_xdr(),
+        }
+    )
+    mocker.patch("polaris_bitgo.bitgo.payout_queue.rdi")
+    transaction = make_deposit()
+    transaction.claimable_balance_supported = True
+    transaction.save()
+    PayoutQueue.enqueue(transaction, has_trustline=False)
+    queue = PayoutQueue(integration)
+
+    queue.process(queue.claim(1)[0])
+
+    transaction.refresh_from_db()
+    assert transaction.status == Transaction.STATUS.completed
+    assert transaction.claimable_balance_id == (
+        envelope.transaction.get_claimable_balance_id(0)
+    )
+
+
+def test_process_recovered_payout(db, mocker):
+    integration = make_integration(mocker)
+    integration.get_sent_deposit_transaction.side_effect = make_transaction_json
+    mocker.patch("polaris_bitgo.bitgo.payout_queue.rdi")
+    transaction = make_deposit()
+    payout = PayoutQueue.enqueue(transaction)
+    BitGoPayout.objects.filter(id=payout.id).update(attempts=1)
+    queue = PayoutQueue(integration)
+
+    queue.process(queue.claim(1)[0])
+
+    integration.get_sent_deposit_transaction.assert_called_once_with(transaction)
+    integration.submit_deposit_transaction.assert_not_called()
+    transaction.refresh_from_db()
+    assert transaction.status == Transaction.STATUS.completed
+    assert transaction.bitgo_payout.lease_owner is None
+
+
+def test_process_failure(db, mocker):
+    integration = make_integration(mocker)
+    integration.submit_deposit_transaction.side_effect = RuntimeError("unavailable")
+    transaction = make_deposit()
+    PayoutQueue.enqueue(transaction)
+    queue = PayoutQueue(integration)
+
+    queue.process(queue.claim(1)[0])
+
+    transaction.refresh_from_db()
+    assert transaction.status == Transaction.STATUS.error
+    assert transaction.bitgo_payout.status == BitGoPayout.Status.FAILED
+    assert transaction.bitgo_payout.error == "RuntimeError: unavailable"
+
+
+def test_process_with_lost_lease(db, mocker):
+    stale_integration = make_integration(mocker)
+    stale_integration.submit_deposit_transaction.side_effect = RuntimeError(
+        "duplicate sequenceId"
+    )
+    transaction = make_deposit()
+    payout = PayoutQueue.enqueue(transaction)
+    stale_queue = PayoutQueue(stale_integration, worker_id="a")
+    queue = PayoutQueue(make_integration(mocker), worker_id="b")
+    stale_payout = stale_queue.claim(1)[0]
+    BitGoPayout.objects.filter(id=payout.id).update(
+        lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+    )
+    assert queue.claim(1)
+
+    stale_queue.process(stale_payout)
+
+    transaction.refresh_from_db()
+    assert transaction.status == Transaction.STATUS.pending_anchor
+    assert transaction.bitgo_payout.status == BitGoPayout.Status.PROCESSING
+    assert transaction.bitgo_payout.lease_owner == "b"
+    assert transaction.bitgo_payout.error is None
+
+
+def test_process_completed_deposit(db, mocker):
+    integration = make_integration(mocker)
+    transaction = make_deposit()
+    PayoutQueue.enqueue(transaction)
+    Transaction.objects.filter(id=transaction.id).update(
+        status=Transaction.STATUS.completed
+    )
+    queue = PayoutQueue(integration)
+
+    queue.process(queue.claim(1)[0])
+
+    integration.submit_deposit_transaction.assert_not_called()
+    transaction.refresh_from_db()
+    assert transaction.status == Transaction.STATUS.completed
+    assert transaction.bitgo_payout.status == BitGoPayout.Status.FAILED
+    assert "completed" in transaction.bitgo_payout.error
+
+
+@pytest.mark.django_db(transaction=True)
+def test_workers_send_from_a_wallet_one_at_a_time():
+    from django.conf import settings
+    from django.db import connections
+
+    def make_worker(worker_id):
+        integration = BitGoIntegration(
+            api_url=settings.BITGO_API_URL,
+            api_key=settings.BITGO_API_KEY,
+            api_passphrase=settings.BITGO_API_PASSPHRASE,
+            wallet_id=settings.BITGO_WALLET_ID,
+            stellar_coin_code=settings.BITGO_STELLAR_COIN_CODE,
+        )
+        PayoutQueue(integration, worker_id=worker_id)
+        return integration.shards[0]
+
+    shard_a, shard_b = make_worker("a"), make_worker("b")
+    sent = threading.Event()
+
+    def send_from_b():
+        try:
+            with shard_b.track_payout("txlm", 1):
+                sent.set()
+        finally:
+            connections.close_all()
+
+    with shard_a.track_payout("txlm", 1):
+        lock = BitGoWalletLock.objects.get(wallet_id=settings.BITGO_WALLET_ID)
+        assert lock.lock_owner.startswith("a:")
+        thread = threading.Thread(target=send_from_b)
+        thread.start()
+        assert not sent.wait(0.5)
+
+    assert sent.wait(5)
+    thread.join()
+    assert BitGoWalletLock.objects.get().lock_owner is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_keeps_payouts_in_flight(mocker):
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def process(payout):
+        with lock:
+            in_flight.append(payout.id)
+            max_in_flight.append(len(in_flight))
+        time.sleep(0.05)
+        with lock:
+            in_flight.remove(payout.id)
+
+    process_mock = mocker.patch.object(PayoutQueue, "process", side_effect=process)
+    for _ in range(8):
+        PayoutQueue.enqueue(make_deposit())
+
+    PayoutQueue(make_integration(mocker), max_workers=4).run(interval=0.01)
+
+    assert process_mock.call_count == 8
+    assert max(max_in_flight) == 4
+    assert not BitGoPayout.objects.filter(status=BitGoPayout.Status.PENDING)
@@ -0,0 +1,223 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from django.core.management import call_command
+from polaris.models import Asset, Transaction
+
+from polaris_bitgo.bitgo.integration import BitGoIntegration
+from polaris_bitgo.bitgo.reconciliation import (
+    AMOUNT_MISMATCH,
+    STATUS_MISMATCH,
+    TRANSACTION_WITHOUT_TRANSFER,
+    TRANSFER_WITHOUT_TRANSACTION,
+    Reconciler,
+)
+from polaris_bitgo.models import BitGoTransfer
+from .mocks import bitgo as bitgo_mocks
+from .test_bitgo_watcher import make_incoming_transfer, make_withdrawal
+
+
+def make_txid():
+    return uuid4().hex + uuid4().hex
+
+
+def make_deposit(
+    status=Transaction.STATUS.completed,
+    stellar_transaction_id=None,
+    code="BST",
+    issuer="GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L",
+):
+    asset, _ = Asset.objects.get_or_create(code=code, issuer=issuer)
+    return Transaction.objects.create(
+        asset=asset,
+        kind=Transaction.KIND.deposit,
+        status=status,
+        amount_in=Decimal("100"),
+        amount_fee=Decimal("1"),
+        stellar_transaction_id=stellar_transaction_id,
+    )
+
+
+def make_send_transfer(txid, value="-990000000", sequence_id=None):
+    return {
+        "id": uuid4().hex,
+        "state": "confirmed",
+        "type": "send",
+        "txid": txid,
+        "sequenceId": sequence_id,
+        "baseValueString": value,
+        "entries": [],
+    }
+
+
+def make_reconciler(mocker, make_bitgo, pages, **kwargs):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    responses = [
+        {"transfers": page, "nextBatchPrevId": str(i) if i < len(pages) else None}
+        for i, page in enumerate(pages, start=1)
+    ]
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfers", side_effect=responses
+    )
+    return Reconciler([make_bitgo()], **kwargs)
+
+
+def test_reconcile_matching_transfers(db, mocker, make_bitgo):
+    txid = make_txid()
+    make_deposit(stellar_transaction_id=txid)
+    pending_deposit = make_deposit(status=Transaction.STATUS.pending_anchor)
+    withdrawal = make_withdrawal(Transaction.STATUS.completed)
+    withdrawal.stellar_transaction_id = make_txid()
+    withdrawal.amount_in = Decimal("10")
+    withdrawal.save()
+
+    incoming_transfer = make_incoming_transfer(withdrawal.id)
+    incoming_transfer.update(
+        txid=withdrawal.stellar_transaction_id, baseValueString="100000000"
+    )
+    pages = [
+        [make_send_transfer(txid)],
+        [
+            make_send_transfer(
+                make_txid(), sequence_id=f"polaris-{pending_deposit.id}"
+            ),
+            incoming_transfer,
+        ],
+    ]
+    reconciler = make_reconciler(mocker, make_bitgo, pages, chunk_size=1)
+
+    mismatches = list(reconciler.reconcile())
+
+    assert [m["type"] for m in mismatches] == [STATUS_MISMATCH]
+    assert mismatches[0]["transaction_id"] == str(pending_deposit.id)
+
+
+def test_reconcile_mismatches(db, mocker, make_bitgo):
+    txid = make_txid()
+    make_deposit(stellar_transaction_id=txid)
+    unpaid_deposit = make_deposit(stellar_transaction_id=make_txid())
+    unpaid_withdrawal = make_withdrawal()
+    unknown_transfer = make_send_transfer(make_txid())
+    unpaid_withdrawal_transfer = make_incoming_transfer(unpaid_withdrawal.id)
+    unpaid_withdrawal_transfer["baseValueString"] = "100000000"
+
+    pages = [
+        [
+            make_send_transfer(txid, value="-1000000000"),
+            unknown_transfer,
+            unpaid_withdrawal_transfer,
+        ]
+    ]
+    reconciler = make_reconciler(mocker, make_bitgo, pages)
+
+    mismatches = {m["type"]: m for m in reconciler.reconcile()}
+
+    assert mismatches.keys() == {
+        AMOUNT_MISMATCH,
+        TRANSFER_WITHOUT_TRANSACTION,
+        STATUS_MISMATCH,
+        TRANSACTION_WITHOUT_TRANSFER,
+    }
+    assert mismatches[AMOUNT_MISMATCH]["amount"] == 1000000000
+    assert mismatches[AMOUNT_MISMATCH]["expected_amount"] == 990000000
+    assert mismatches[TRANSFER_WITHOUT_TRANSACTION]["transfer_id"] == (
+        unknown_transfer["id"]
+    )
+    assert mismatches[STATUS_MISMATCH]["transaction_id"] == str(unpaid_withdrawal.id)
+    assert mismatches[TRANSACTION_WITHOUT_TRANSFER]["transaction_id"] == str(
+        unpaid_deposit.id
+    )
+
+
+def test_reconcile_stops_paging_at_since(db, mocker, make_bitgo):
+    old_transfer = make_send_transfer(make_txid())
+    old_transfer["date"] = "2020-01-01T00:00:00Z"
+    new_transfer = make_send_transfer(make_txid())
+    new_transfer["date"] = "2021-06-01T00:00:00Z"
+    pages = [[new_transfer, old_transfer], [make_send_transfer(make_txid())]]
+    reconciler = make_reconciler(
+        mocker,
+        make_bitgo,
+        pages,
+        since=datetime(2021, 1, 1, tzinfo=timezone.utc),
+    )
+
+    mismatches = list(reconciler.reconcile())
+
+    assert [m["transfer_id"] for m in mismatches] == [new_transfer["id"]]
+
+
+def test_reconcile_transactions_of_reconciled_assets_and_wallets(
+    db, mocker, make_bitgo
+):
+    make_deposit(stellar_transaction_id=make_txid(), code="USDC")
+    other_wallet_deposit = make_deposit(stellar_transaction_id=make_txid())
+    BitGoTransfer.objects.create(
+        sequence_id=f"polaris-{other_wallet_deposit.id}",
+        wallet_id="otherwalletid",
+        transaction=other_wallet_deposit,
+    )
+    unpaid_deposit = make_deposit(stellar_transaction_id=make_txid())
+    reconciler = make_reconciler(mocker, make_bitgo, [[]])
+
+    mismatches = list(reconciler.reconcile())
+
+    assert [(m["type"], m["transaction_id"]) for m in mismatches] == [
+        (TRANSACTION_WITHOUT_TRANSFER, str(unpaid_deposit.id))
+    ]
+
+
+def test_bitgo_reconcile_command(db, mocker, make_bitgo, tmp_path):
+    reconciler = make_reconciler(
+        mocker, make_bitgo, [[make_send_transfer(make_txid())]]
+    )
+    make_deposit()
+    integration = mocker.Mock(spec=BitGoIntegration)
+    integration.shards = [mocker.Mock(get_client=lambda asset: reconciler.clients[0])]
+    mocker.patch("polaris_bitgo.management.commands.bitgo_reconcile.rci", integration)
+    output = tmp_path / "mismatches.jsonl"
+
+    call_command("bitgo_reconcile", "--asset", "BST", "--output", str(output))
+
+    lines = output.read_text().splitlines()
+    assert [json.loads(line)["type"] for line in lines] == [
+        TRANSFER_WITHOUT_TRANSACTION
+    ]
+
+
+def test_bitgo_reconcile_command_naive_since(db, mocker, make_bitgo, tmp_path):
+    old_transfer = make_send_transfer(make_txid())
+    old_transfer["date"] = "2020-01-01T00:00:00Z"
+    new_transfer = make_send_transfer(make_txid())
+    new_transfer["date"] = "2021-06-01T00:00:00Z"
+    reconciler = make_reconciler(mocker, make_bitgo, [[new_transfer, old_transfer]])
+    integration = mocker.Mock(spec=BitGoIntegration)
+    integration.shards = [mocker.Mock(get_client=lambda asset: reconciler.clients[0])]
+    mocker.patch("polaris_bitgo.management.commands.bitgo_reconcile.rci", integration)
+    make_deposit()
+    output = tmp_path / "mismatches.jsonl"
+
+    call_command(
+        "bitgo_reconcile",
+        "--asset",
+        "BST",
+        "--since",
+        "2021-01-01T00:00:00",
+        "--output",
+        str(output),
+    )
+
+    lines = output.read_text().splitlines()
+    assert [json.loads(line)["transfer_id"] for line in lines] == [new_transfer["id"]]
+
+
+def test_reconcile_naive_since(db, mocker, make_bitgo):
+    reconciler = make_reconciler(mocker, make_bitgo, [[]], since=datetime(2021, 1, 1))
+
+    assert reconciler.since == datetime(2021, 1, 1, tzinfo=timezone.utc)
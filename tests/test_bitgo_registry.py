@@ -0,0 +1,86 @@
+import pytest
+from django.conf import settings
+from polaris.models import Asset
+from stellar_sdk import Keypair
+
+from polaris_bitgo.bitgo.registry import IntegrationRegistry
+from polaris_bitgo.helpers.exceptions import BitGoTenantNotFound
+from .mocks import bitgo as bitgo_mocks
+
+
+def register(registry: IntegrationRegistry, tenant: str, **kwargs):
+    return registry.register(
+        tenant,
+        api_url=settings.BITGO_API_URL,
+        api_key=f"{tenant}-api-key",
+        api_passphrase=f"{tenant}-passphrase",
+        wallet_id=f"{tenant}-wallet",
+        stellar_coin_code=settings.BITGO_STELLAR_COIN_CODE,
+        **kwargs,
+    )
+
+
+def test_tenants_share_the_connection_pools(mocker):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_data(),
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info",
+        return_value={"encryptedPrv": "{}"},
+    )
+    first_keypair, second_keypair = Keypair.random(), Keypair.random()
+    mocker.patch(
+        "polaris_bitgo.bitgo.BitGo._decrypt_private_key",
+        side_effect=[first_keypair.secret, second_keypair.secret],
+    )
+    asset = Asset(code="XLM", issuer=None)
+    registry = IntegrationRegistry(pool_maxsize=4)
+
+    first = register(registry, "first", rate_limit=5)
+    second = register(registry, "second")
+
+    first_shard, second_shard = first.shards[0], second.shards[0]
+    assert first_shard.session is not second_shard.session
+    assert first_shard.session.headers["Authorization"] == "Bearer first-api-key"
+    assert second_shard.session.headers["Authorization"] == "Bearer second-api-key"
+    for shard in (first_shard, second_shard):
+        assert shard.session.get_adapter(settings.BITGO_API_URL) is (
+            registry.http_adapter
+        )
+    assert first.horizon_client is second.horizon_client is registry.horizon_client
+
+    first_client = first_shard.get_client(asset)
+    second_client = second_shard.get_client(asset)
+    assert first_client.get_signer().public_key == first_keypair.public_key
+    assert second_client.get_signer().public_key == second_keypair.public_key
+    assert first_client.bitgo_api.API_PASSPHRASE == "first-passphrase"
+    assert first_client.bitgo_api.rate_limiter.rate == 5
+    assert second_client.bitgo_api.rate_limiter is None
+
+
+def test_register_and_unregister_tenants():
+    registry = IntegrationRegistry()
+    integration = register(registry, "tenant")
+
+    with pytest.raises(ValueError):
+        register(registry, "tenant")
+    assert registry.get("tenant") is integration
+    assert registry.get_tenants() == ["tenant"]
+    assert registry.get_wallet_metrics() == {
+        "tenant": {
+            "tenant-wallet": {
+                "pending": 0,
+                "sent": 0,
+                "failed": 0,
+                "amount_sent": {},
+            }
+        }
+    }
+
+    registry.unregister("tenant")
+
+    with pytest.raises(BitGoTenantNotFound):
+        registry.get("tenant")
+    with pytest.raises(BitGoTenantNotFound):
+        registry.unregister("tenant")
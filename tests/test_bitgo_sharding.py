@@ -0,0 +1,194 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from polaris.models import Asset, Transaction
+
+from polaris_bitgo.bitgo.sharding import (
+    BALANCE_AWARE,
+    LEAST_PENDING,
+    WalletConfig,
+    WalletRouter,
+    WalletShard,
+)
+from polaris_bitgo.models import BitGoTransfer
+from .mocks import bitgo as bitgo_mocks
+
+BST_COIN = "txlm:BST-GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+
+
+def make_shard(wallet_id: str, **kwargs) -> WalletShard:
+    from django.conf import settings
+
+    return WalletShard(
+        api_key=settings.BITGO_API_KEY,
+        api_passphrase=settings.BITGO_API_PASSPHRASE,
+        wallet_id=wallet_id,
+        api_url=settings.BITGO_API_URL,
+        stellar_coin_code=settings.BITGO_STELLAR_COIN_CODE,
+        **kwargs,
+    )
+
+
+def test_round_robin():
+    shards = [make_shard("wallet1"), make_shard("wallet2")]
+    router = WalletRouter(shards)
+
+    selected = [router.select("txlm", 100).wallet_id for _ in range(4)]
+
+    assert selected == ["wallet1", "wallet2", "wallet1", "wallet2"]
+
+
+def test_least_pending():
+    shards = [make_shard("wallet1"), make_shard("wallet2")]
+    router = WalletRouter(shards, LEAST_PENDING)
+
+    with shards[0].track_payout("txlm", 100):
+        assert router.select("txlm", 100).wallet_id == "wallet2"
+    assert shards[0].get_metrics() == {
+        "pending": 0,
+        "sent": 1,
+        "failed": 0,
+        "amount_sent": {"txlm": 100},
+    }
+
+
+def test_balance_aware(mocker):
+    def get_wallet(bitgo_api):
+        wallet_data = bitgo_mocks.get_wallet_data()
+        balance = "1000" if bitgo_api.WALLET_ID == "wallet1" else "5000"
+        wallet_data["tokens"][BST_COIN]["spendableBalanceString"] = balance
+        return wallet_data
+
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        autospec=True,
+        side_effect=get_wallet,
+    )
+    shards = [
+        make_shard("wallet1", check_balance=True),
+        make_shard("wallet2", check_balance=True),
+    ]
+    router = WalletRouter(shards, BALANCE_AWARE)
+
+    assert router.select(BST_COIN, 100).wallet_id == "wallet2"
+    assert shards[1].balance_ledger.reserve(BST_COIN, 4500)
+    assert router.select(BST_COIN, 100).wallet_id == "wallet1"
+
+
+def test_balance_aware_requires_check_balance():
+    with pytest.raises(ValueError):
+        WalletRouter([make_shard("wallet1"), make_shard("wallet2")], BALANCE_AWARE)
+
+
+def test_failed_payout_metrics():
+    shard = make_shard("wallet1")
+
+    with pytest.raises(RuntimeError):
+        with shard.track_payout("txlm", 100):
+            raise RuntimeError()
+
+    assert shard.get_metrics()["failed"] == 1
+    assert shard.get_metrics()["sent"] == 0
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        WalletRouter([make_shard("wallet1")], "random")
+
+
+def test_retry_is_routed_to_the_same_wallet(db):
+    from django.conf import settings
+
+    from polaris_bitgo.bitgo.dtos import Recipient
+    from polaris_bitgo.bitgo.integration import BitGoIntegration
+
+    bitgo_integration = BitGoIntegration(
+        api_url=settings.BITGO_API_URL,
+        api_key=settings.BITGO_API_KEY,
+        api_passphrase=settings.BITGO_API_PASSPHRASE,
+        wallet_id="wallet1",
+        stellar_coin_code=settings.BITGO_STELLAR_COIN_CODE,
+        wallets=[WalletConfig(wallet_id="wallet2", api_passphrase="passphrase2")],
+    )
+    asset = Asset.objects.create(code="XLM")
+    transaction = Transaction.objects.create(asset=asset, kind=Transaction.KIND.deposit)
+    recipient = Recipient(amount="100", address="address")
+
+    first = bitgo_integration._get_shard(transaction, asset, recipient, "seq-1")
+    retry = bitgo_integration._get_shard(transaction, asset, recipient, "seq-1")
+    other = bitgo_integration._get_shard(transaction, asset, recipient, "seq-2")
+
+    assert first is retry
+    assert other is not first
+    assert BitGoTransfer.objects.get(sequence_id="seq-1").wallet_id == first.wallet_id
+    assert set(bitgo_integration.get_wallet_metrics()) == {"wallet1", "wallet2"}
+
+
+def test_max_concurrent_payouts():
+    shard = make_shard("wallet1", max_concurrent_payouts=2)
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def payout(i):
+        with shard.track_payout("txlm", 1):
+            with lock:
+                in_flight.append(i)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.remove(i)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(payout, range(6)))
+
+    assert max(max_in_flight) == 2
+    assert shard.get_metrics()["sent"] == 6
+
+
+def test_payouts_holding_the_sequence_are_sent_one_at_a_time():
+    shard = make_shard("wallet1")
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def payout(i):
+        with shard.track_payout("txlm", 1, holds_sequence=True):
+            with lock:
+                in_flight.append(i)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.remove(i)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(payout, range(4)))
+
+    assert max(max_in_flight) == 1
+    assert shard.get_metrics()["sent"] == 4
+
+
+def test_payout_holding_the_sequence_holds_the_wallet():
+    shard = make_shard("wallet1", max_concurrent_payouts=None)
+    lock = threading.Lock()
+    in_flight = []
+    overlaps = []
+
+    def payout(i):
+        holds_sequence = i % 3 == 0
+        with shard.track_payout("txlm", 1, holds_sequence=holds_sequence):
+            with lock:
+                in_flight.append(holds_sequence)
+                if len(in_flight) > 1 and any(in_flight):
+                    overlaps.append(i)
+            time.sleep(0.01)
+            with lock:
+                in_flight.remove(holds_sequence)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(payout, range(12)))
+
+    assert overlaps == []
+    assert shard.get_metrics()["sent"] == 12
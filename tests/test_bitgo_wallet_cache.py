@@ -0,0 +1,59 @@
+from polaris_bitgo.bitgo.wallet_cache import WalletCache
+from .mocks import bitgo as bitgo_mocks
+
+BST_COIN = "txlm:BST-GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L"
+ROOT_ADDRESS = bitgo_mocks.get_wallet_data()["coinSpecific"]["rootAddress"]
+
+
+def make_wallet_cache(make_bitgo_api):
+    return WalletCache(make_bitgo_api(asset_code="XLM", asset_issuer=None))
+
+
+def test_get_asset_wallets(mocker, make_bitgo_api):
+    wallet_data = bitgo_mocks.get_wallet_data()
+    wallet_data["tokens"][BST_COIN]["spendableBalanceString"] = "1000000"
+    wallet_data["coinSpecific"]["trustedTokens"] = [
+        {"token": "txlm:USDC-ISSUER", "limit": "9223372036854775807"}
+    ]
+    get_wallet_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet", return_value=wallet_data
+    )
+
+    wallet_cache = make_wallet_cache(make_bitgo_api)
+
+    native_wallet = wallet_cache.get_asset_wallet("txlm")
+    bst_wallet = wallet_cache.get_asset_wallet(BST_COIN)
+    usdc_wallet = wallet_cache.get_asset_wallet("txlm:USDC-ISSUER")
+    unknown_wallet = wallet_cache.get_asset_wallet("txlm:ABCD-ISSUER")
+
+    get_wallet_mock.assert_called_once()
+    assert native_wallet.public_key == ROOT_ADDRESS
+    assert native_wallet.spendable_balance == int(wallet_data["spendableBalanceString"])
+    assert bst_wallet.public_key == ROOT_ADDRESS
+    assert bst_wallet.spendable_balance == 1000000
+    assert bst_wallet.has_trustline
+    assert usdc_wallet.spendable_balance == 0
+    assert usdc_wallet.has_trustline
+    assert unknown_wallet.public_key == ROOT_ADDRESS
+    assert not unknown_wallet.has_trustline
+
+
+def test_get_wallet(mocker, make_bitgo_api):
+    get_wallet_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_data(),
+    )
+    get_wallet_key_info_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info",
+        return_value={"encryptedPrv": "encrypted"},
+    )
+
+    wallet_cache = make_wallet_cache(make_bitgo_api)
+    wallet_cache.get_wallet()
+    wallet = wallet_cache.get_wallet()
+
+    get_wallet_mock.assert_called_once()
+    get_wallet_key_info_mock.assert_called_once()
+    assert wallet.public_key == ROOT_ADDRESS
+    assert wallet.keys == bitgo_mocks.get_wallet_data()["keys"]
+    assert wallet.encrypted_private_key == "encrypted"
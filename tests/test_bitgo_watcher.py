@@ -0,0 +1,157 @@
+from decimal import Decimal
+from uuid import uuid4
+
+from polaris.models import Asset, Transaction
+from polaris.utils import memo_hex_to_base64
+
+from polaris_bitgo.bitgo.dtos import Transfer
+from polaris_bitgo.bitgo.watcher import IncomingTransferWatcher
+from polaris_bitgo.models import BitGoAddress
+from polaris_bitgo.utils import get_padded_hex_memo
+from .mocks import bitgo as bitgo_mocks
+
+ROOT_ADDRESS = bitgo_mocks.get_wallet_data()["coinSpecific"]["rootAddress"]
+
+
+def make_incoming_transfer(
+    transaction_id=None, state="confirmed", address=ROOT_ADDRESS
+):
+    transfer = {
+        "id": uuid4().hex,
+        "state": state,
+        "type": "receive",
+        "entries": [{"address": address, "valueString": "100000000"}],
+        "coinSpecific": {},
+    }
+    if transaction_id:
+        transfer["coinSpecific"]["memo"] = {
+            "type": "hash",
+            "value": memo_hex_to_base64(get_padded_hex_memo(transaction_id)),
+        }
+    return transfer
+
+
+def make_withdrawal(
+    status=Transaction.STATUS.pending_user_transfer_start,
+    amount_in=Decimal(10),
+    asset_code="BST",
+):
+    asset, _ = Asset.objects.get_or_create(
+        code=asset_code,
+        issuer="GBQTIOS3XGHB7LVYGBKQVJGCZ3R4JL5E4CBSWJ5ALIJUHBKS6263644L",
+    )
+    return Transaction.objects.create(
+        asset=asset,
+        kind=Transaction.KIND.withdrawal,
+        status=status,
+        amount_in=amount_in,
+        receiving_anchor_account=ROOT_ADDRESS,
+    )
+
+
+def make_watcher(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch("polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info")
+    return IncomingTransferWatcher(make_bitgo())
+
+
+def test_match_withdrawals(db, mocker, make_bitgo):
+    withdrawal = make_withdrawal()
+    completed_withdrawal = make_withdrawal(Transaction.STATUS.completed)
+    unconfirmed_withdrawal = make_withdrawal()
+
+    transfers = [
+        make_incoming_transfer(withdrawal.id),
+        make_incoming_transfer(completed_withdrawal.id),
+        make_incoming_transfer(unconfirmed_withdrawal.id, state="unconfirmed"),
+        make_incoming_transfer(
+            unconfirmed_withdrawal.id,
+            address="GBJZ2BSJ2JDWL766DN5ERPNFULOS3VL6T74Z6QGDHGOHVFHXJCNY53MC",
+        ),
+        make_incoming_transfer(uuid4()),
+        make_incoming_transfer(),
+    ]
+    transfers = [Transfer.from_json(transfer) for transfer in transfers]
+
+    watcher = make_watcher(mocker, make_bitgo)
+
+    assert watcher.match_withdrawals(transfers) == [(withdrawal, transfers[0])]
+
+
+def test_match_withdrawals_of_the_watched_asset(db, mocker, make_bitgo):
+    withdrawal = make_withdrawal()
+    other_asset_withdrawal = make_withdrawal(asset_code="USDC")
+
+    transfers = [
+        Transfer.from_json(make_incoming_transfer(withdrawal.id)),
+        Transfer.from_json(make_incoming_transfer(other_asset_withdrawal.id)),
+    ]
+
+    watcher = make_watcher(mocker, make_bitgo)
+
+    assert watcher.match_withdrawals(transfers) == [(withdrawal, transfers[0])]
+
+
+def test_match_withdrawals_underpaid(db, mocker, make_bitgo):
+    withdrawal = make_withdrawal()
+    underpaid_withdrawal = make_withdrawal(amount_in=Decimal("10.0000001"))
+
+    transfers = [
+        Transfer.from_json(make_incoming_transfer(withdrawal.id)),
+        Transfer.from_json(make_incoming_transfer(underpaid_withdrawal.id)),
+    ]
+
+    watcher = make_watcher(mocker, make_bitgo)
+
+    assert watcher.match_withdrawals(transfers) == [(withdrawal, transfers[0])]
+
+
+def test_match_withdrawals_by_pool_address(db, mocker, make_bitgo):
+    withdrawal = make_withdrawal()
+    address = f"{ROOT_ADDRESS}?memoId=7"
+    BitGoAddress.objects.create(
+        wallet_id="walletid", address=address, transaction=withdrawal
+    )
+    transfer = Transfer.from_json(make_incoming_transfer(address=address))
+
+    watcher = make_watcher(mocker, make_bitgo)
+
+    assert watcher.match_withdrawals([transfer]) == [(withdrawal, transfer)]
+
+
+def test_match_withdrawals_without_memos(mocker, make_bitgo):
+    filter_mock = mocker.patch("polaris_bitgo.bitgo.watcher.Transaction.objects.filter")
+
+    watcher = make_watcher(mocker, make_bitgo)
+
+    assert (
+        watcher.match_withdrawals([Transfer.from_json(make_incoming_transfer())]) == []
+    )
+    filter_mock.assert_not_called()
+
+
+def test_watch_pages(db, mocker, make_bitgo):
+    first_withdrawal = make_withdrawal()
+    second_withdrawal = make_withdrawal()
+    first_transfer = make_incoming_transfer(first_withdrawal.id)
+    second_transfer = make_incoming_transfer(second_withdrawal.id)
+
+    get_transfers_mock = mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfers",
+        side_effect=[
+            {"transfers": [first_transfer], "nextBatchPrevId": "next-page"},
+            {"transfers": [second_transfer]},
+        ],
+    )
+
+    watcher = make_watcher(mocker, make_bitgo)
+
+    assert list(watcher.watch()) == [
+        [(first_withdrawal, Transfer.from_json(first_transfer))],
+        [(second_withdrawal, Transfer.from_json(second_transfer))],
+    ]
+    assert get_transfers_mock.call_count == 2
+    get_transfers_mock.assert_called_with(transfer_type="receive", prev_id="next-page")
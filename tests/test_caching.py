@@ -0,0 +1,82 @@
+import pytest
+from django.core.cache import caches
+
+from polaris_bitgo.helpers.caching import RecordCache
+from polaris_bitgo.utils import get_stellar_network_transaction_info
+
+BITGO_API_GET = "polaris_bitgo.bitgo.api.BitGoAPI._get"
+
+
+@pytest.fixture
+def django_cache():
+    cache = caches["default"]
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+def test_record_cache_evicts_least_recently_used():
+    cache = RecordCache(max_size=2)
+    cache.set("a", {"id": "a"})
+    cache.set("b", {"id": "b"})
+    assert cache.get("a") == {"id": "a"}
+
+    cache.set("c", {"id": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": "a"}
+    assert cache.get("c") == {"id": "c"}
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_record_cache_django_tier(django_cache):
+    RecordCache(cache_alias="default").set("a", {"id": "a"})
+
+    cache = RecordCache(cache_alias="default")
+
+    assert django_cache.get("polaris_bitgo:a") == {"id": "a"}
+    assert cache.get("a") == {"id": "a"}
+    assert cache.hits == 1
+
+
+def test_record_cache_ignores_django_cache_errors(mocker):
+    cache = RecordCache(cache_alias="default")
+    mocker.patch.object(cache, "_get_django_cache", side_effect=RuntimeError)
+
+    cache.set("a", {"id": "a"})
+    cache.clear()
+
+    assert cache.get("a") is None
+
+
+def test_get_transfer_by_id_caches_final_transfers(mocker, make_bitgo_api):
+    cache = RecordCache()
+    bitgo_api = make_bitgo_api()
+    bitgo_api.record_cache = cache
+    get_mock = mocker.patch(BITGO_API_GET)
+    get_mock.return_value.ok = True
+    get_mock.return_value.json.side_effect = [
+        {"id": "transferid", "state": "signed"},
+        {"id": "transferid", "state": "confirmed", "txid": "txid"},
+    ]
+
+    assert bitgo_api.get_transfer_by_id("transferid")["state"] == "signed"
+    assert bitgo_api.get_transfer_by_id("transferid")["state"] == "confirmed"
+    assert bitgo_api.get_transfer_by_id("transferid")["state"] == "confirmed"
+    assert get_mock.call_count == 2
+
+
+def test_get_stellar_network_transaction_info_cached(mocker):
+    cache = RecordCache()
+    get_mock = mocker.patch(
+        "polaris_bitgo.utils._get_stellar_network_transaction_info",
+        return_value={"id": "txid"},
+    )
+
+    for _ in range(2):
+        transaction_info = get_stellar_network_transaction_info(
+            "txid", record_cache=cache
+        )
+
+    assert transaction_info == {"id": "txid"}
+    get_mock.assert_called_once()
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from polaris_bitgo.helpers.hedging import RequestHedger
+
+
+def test_call_without_hedging():
+    hedger = RequestHedger(initial_delay=1)
+    calls = []
+
+    def request():
+        calls.append(1)
+        return "response"
+
+    assert hedger.call(request) == "response"
+    assert len(calls) == 1
+    assert hedger.hedged_requests_count == 0
+
+
+def test_call_hedged_request_wins():
+    hedger = RequestHedger(initial_delay=0.01, budget=1)
+    first_request_released = threading.Event()
+    calls = []
+
+    def request():
+        calls.append(1)
+        if len(calls) == 1:
+            first_request_released.wait(1)
+            return "slow response"
+        return "fast response"
+
+    assert hedger.call(request) == "fast response"
+    first_request_released.set()
+
+    assert len(calls) == 2
+    assert hedger.hedged_requests_count == 1
+
+
+def test_call_hedge_budget_exhausted():
+    hedger = RequestHedger(initial_delay=0.01, budget=0)
+    calls = []
+
+    def request():
+        calls.append(1)
+        time.sleep(0.05)
+        return "response"
+
+    assert hedger.call(request) == "response"
+    assert len(calls) == 1
+    assert hedger.hedged_requests_count == 0
+
+
+def test_call_first_request_fails():
+    hedger = RequestHedger(initial_delay=0.01, budget=1)
+    calls = []
+
+    def request():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.05)
+            raise ConnectionError()
+        time.sleep(0.1)
+        return "response"
+
+    assert hedger.call(request) == "response"
+
+
+def test_call_first_result_unsuccessful():
+    hedger = RequestHedger(initial_delay=0.01, budget=1)
+    calls = []
+
+    def request():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.05)
+            return "error response"
+        time.sleep(0.1)
+        return "response"
+
+    assert (
+        hedger.call(request, is_success=lambda result: result != "error response")
+        == "response"
+    )
+    assert len(calls) == 2
+
+
+def test_call_all_results_unsuccessful():
+    hedger = RequestHedger(initial_delay=0.01, budget=1)
+
+    def request():
+        time.sleep(0.05)
+        return "error response"
+
+    assert hedger.call(request, is_success=lambda result: False) == "error response"
+
+
+def test_call_all_requests_fail():
+    hedger = RequestHedger(initial_delay=0.01, budget=1)
+
+    def request():
+        time.sleep(0.05)
+        raise ConnectionError()
+
+    with pytest.raises(ConnectionError):
+        hedger.call(request)
+
+
+def test_get_delay_from_latency_percentile():
+    hedger = RequestHedger(percentile=90, initial_delay=5, min_samples=10)
+
+    assert hedger.get_delay() == 5
+
+    hedger.latencies.extend([0.1 * i for i in range(1, 11)])
+
+    assert hedger.get_delay() == pytest.approx(0.9)
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError, match="The budget must be between 0 and 1."):
+        RequestHedger(budget=2)
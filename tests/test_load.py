@@ -0,0 +1,16 @@
+from tests.load.driver import run_load
+
+
+def test_load_harness():
+    report = run_load(transactions=5, concurrency=2, key_iterations=10)
+
+    assert report["succeeded"] == 5
+    assert report["errors"] == {}
+    assert report["latency"]["p99"] >= report["latency"]["p50"]
+
+
+def test_load_harness_with_errors():
+    report = run_load(transactions=5, concurrency=2, key_iterations=10, error_rate=1)
+
+    assert report["succeeded"] == 0
+    assert sum(report["errors"].values()) == 5
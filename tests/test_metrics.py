@@ -0,0 +1,108 @@
+import pytest
+import requests
+
+from polaris_bitgo.helpers.metrics import ERROR_STATUS, Metrics
+from polaris_bitgo.utils import (
+    HORIZON_FEE_STATS_ENDPOINT,
+    HORIZON_OTHER_ENDPOINT,
+    HORIZON_ROOT_ENDPOINT,
+    HORIZON_SUBMIT_ENDPOINT,
+    HORIZON_TRANSACTION_ENDPOINT,
+    MeteredRetry,
+    get_horizon_endpoint,
+)
+from .mocks import bitgo as bitgo_mocks
+
+REQUEST_METHOD_GET_MOCK = "requests.Session.get"
+
+
+class RecordingMetrics(Metrics):
+    def __init__(self):
+        self.requests = []
+        self.retries = []
+        self.stages = []
+
+    def observe_request(
+        self, endpoint, status, latency, bytes_sent=0, bytes_received=0
+    ):
+        self.requests.append((endpoint, status, bytes_sent, bytes_received))
+
+    def increment_retries(self, endpoint):
+        self.retries.append(endpoint)
+
+    def observe_stage(self, stage, latency):
+        self.stages.append(stage)
+
+
+def test_bitgo_api_records_requests(mocker, make_bitgo_api):
+    response = bitgo_mocks.get_wallet_response()
+    response._content = b'{"id": "walletid"}'
+    mocker.patch(REQUEST_METHOD_GET_MOCK, return_value=response)
+
+    metrics = RecordingMetrics()
+    bitgo_api = make_bitgo_api()
+    bitgo_api.metrics = metrics
+    bitgo_api.get_wallet()
+
+    assert metrics.requests == [("wallet", "200", 0, len(response._content))]
+
+
+def test_bitgo_api_records_request_errors(mocker, make_bitgo_api):
+    mocker.patch(REQUEST_METHOD_GET_MOCK, side_effect=requests.ConnectionError())
+
+    metrics = RecordingMetrics()
+    bitgo_api = make_bitgo_api()
+    bitgo_api.metrics = metrics
+    with pytest.raises(requests.ConnectionError):
+        bitgo_api.get_transfer_by_id("transferid")
+
+    assert metrics.requests == [("transfer", ERROR_STATUS, 0, 0)]
+
+
+def test_metered_retry_records_retries():
+    metrics = RecordingMetrics()
+    retry = MeteredRetry(metrics=metrics, total=2, raise_on_status=False)
+
+    retry = retry.increment(method="GET", url="/transactions/id")
+    retry.increment(method="GET", url="/transactions/id")
+
+    assert metrics.retries == [HORIZON_TRANSACTION_ENDPOINT] * 2
+
+
+@pytest.mark.parametrize(
+    "method,url,endpoint",
+    [
+        ("GET", "https://horizon-testnet.stellar.org/", HORIZON_ROOT_ENDPOINT),
+        ("GET", "https://horizon/transactions/id", HORIZON_TRANSACTION_ENDPOINT),
+        ("POST", "https://horizon/transactions", HORIZON_SUBMIT_ENDPOINT),
+        ("GET", "https://horizon/fee_stats", HORIZON_FEE_STATS_ENDPOINT),
+        ("GET", "https://horizon/prefix/fee_stats", HORIZON_FEE_STATS_ENDPOINT),
+        ("GET", "/accounts/GADDRESS", HORIZON_OTHER_ENDPOINT),
+    ],
+)
+def test_get_horizon_endpoint(method, url, endpoint):
+    assert get_horizon_endpoint(method, url) == endpoint
+
+
+def test_prometheus_metrics():
+    prometheus_client = pytest.importorskip("prometheus_client")
+    from polaris_bitgo.helpers.metrics import PrometheusMetrics
+
+    registry = prometheus_client.CollectorRegistry()
+    metrics = PrometheusMetrics(registry=registry)
+    metrics.observe_request("send", "200", 0.5, bytes_sent=10, bytes_received=20)
+    metrics.increment_retries("send")
+
+    labels = {"endpoint": "send", "status": "200"}
+    assert (
+        registry.get_sample_value(
+            "polaris_bitgo_request_duration_seconds_count", labels
+        )
+        == 1
+    )
+    assert (
+        registry.get_sample_value(
+            "polaris_bitgo_request_retries_total", {"endpoint": "send"}
+        )
+        == 1
+    )
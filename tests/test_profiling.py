@@ -0,0 +1,65 @@
+import time
+
+from polaris.models import Asset
+
+from polaris_bitgo.helpers.profiling import SlowCallDetector
+from .mocks import bitgo as bitgo_mocks
+
+
+def test_slow_call_report():
+    reports = []
+    detector = SlowCallDetector(threshold=0, sample_rate=0, handler=reports.append)
+
+    with detector.watch("submit_deposit_transaction"):
+        detector.observe_stage("send", 0.5)
+        detector.observe_stage("send", 0.25)
+
+    (report,) = reports
+    assert report["method"] == "submit_deposit_transaction"
+    assert report["stages"] == {"send": 0.75}
+    assert report["profile"] is None
+
+
+def test_fast_call_is_not_reported():
+    reports = []
+    detector = SlowCallDetector(threshold=60, sample_rate=1, handler=reports.append)
+
+    with detector.watch("submit_deposit_transaction"):
+        detector.observe_stage("send", 0.1)
+    detector.observe_stage("send", 0.1)
+
+    assert reports == []
+
+
+def test_sampled_call_profile():
+    reports = []
+    detector = SlowCallDetector(
+        threshold=0, sample_rate=1, sample_interval=0.001, handler=reports.append
+    )
+
+    with detector.watch("submit_deposit_transaction"):
+        time.sleep(0.05)
+
+    profile = reports[0]["profile"]
+    assert profile
+    assert any(
+        "test_sampled_call_profile" in frame
+        for sample in profile
+        for frame in sample["stack"]
+    )
+
+
+def test_integration_public_methods_are_watched(mocker, make_bitgo_integration):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    reports = []
+
+    bitgo_integration = make_bitgo_integration
+    bitgo_integration.slow_call_detector = SlowCallDetector(
+        threshold=0, sample_rate=0, handler=reports.append
+    )
+    bitgo_integration.get_distribution_account(Asset(code="XLM"))
+
+    assert [report["method"] for report in reports] == ["get_distribution_account"]
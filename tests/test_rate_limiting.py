@@ -0,0 +1,56 @@
+import pytest
+
+from polaris_bitgo.helpers.rate_limiting import RateLimiter
+from .mocks import bitgo as bitgo_mocks
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def test_rate_limiter_waits_for_tokens():
+    clock = FakeClock()
+    rate_limiter = RateLimiter(rate=2, burst=2, clock=clock, sleep=clock.sleep)
+
+    assert [rate_limiter.acquire() for _ in range(4)] == [0, 0, 0.5, 0.5]
+    assert clock.now == 1
+
+    clock.now += 10
+    assert [rate_limiter.acquire() for _ in range(3)] == [0, 0, 0.5]
+
+
+def test_rate_limiter_reserves_tokens_in_order():
+    clock = FakeClock()
+    sleeps = []
+    rate_limiter = RateLimiter(rate=1, burst=1, clock=clock, sleep=sleeps.append)
+
+    # The requests arrive before any of them finishes waiting.
+    delays = [rate_limiter.acquire() for _ in range(3)]
+
+    assert delays == [0, 1, 2]
+    assert sleeps == [1, 2]
+
+
+@pytest.mark.parametrize("rate, burst", [(0, None), (1, 0)])
+def test_rate_limiter_validation(rate, burst):
+    with pytest.raises(ValueError):
+        RateLimiter(rate=rate, burst=burst)
+
+
+def test_bitgo_api_requests_are_rate_limited(mocker, make_bitgo_api):
+    bitgo_api = make_bitgo_api()
+    bitgo_api.rate_limiter = mocker.Mock(spec=RateLimiter)
+    mocker.patch.object(
+        bitgo_api.session, "get", return_value=bitgo_mocks.get_wallet_response()
+    )
+
+    bitgo_api.get_wallet()
+
+    bitgo_api.rate_limiter.acquire.assert_called_once()
@@ -0,0 +1,113 @@
+from contextlib import contextmanager
+
+import pytest
+
+from polaris_bitgo.helpers.tracing import NOOP_TRACER, Tracer
+from .mocks import bitgo as bitgo_mocks
+
+
+class RecordingTracer(Tracer):
+    enabled = True
+
+    def __init__(self):
+        self.spans = []
+        self._stack = []
+
+    @contextmanager
+    def start_span(self, name, attributes=None):
+        span = {"name": name, "attributes": dict(attributes or {})}
+        self.spans.append(span)
+        self._stack.append(span)
+        try:
+            yield span
+        finally:
+            self._stack.pop()
+
+    def set_attribute(self, key, value):
+        self._stack[-1]["attributes"][key] = value
+
+
+def make_traced_bitgo(mocker, make_bitgo, tracer):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet",
+        return_value=bitgo_mocks.get_wallet_response().json(),
+    )
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_wallet_key_info",
+        return_value=bitgo_mocks.get_wallet_key_info_response().json(),
+    )
+    bitgo = make_bitgo()
+    bitgo.tracer = tracer
+    return bitgo
+
+
+def test_send_transaction_span(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.send_transaction",
+        return_value=bitgo_mocks.send_transaction_response().json(),
+    )
+    tracer = RecordingTracer()
+    bitgo = make_traced_bitgo(mocker, make_bitgo, tracer)
+
+    transfer_id = bitgo.send_transaction("xdr", "polaris-transactionid")
+
+    assert tracer.spans == [
+        {
+            "name": "bitgo.send_transaction",
+            "attributes": {
+                "bitgo.sequence_id": "polaris-transactionid",
+                "bitgo.transfer_id": transfer_id,
+            },
+        }
+    ]
+
+
+def test_get_stellar_transaction_id_span(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_id",
+        return_value={"state": "confirmed", "txid": "stellartxid"},
+    )
+    tracer = RecordingTracer()
+    bitgo = make_traced_bitgo(mocker, make_bitgo, tracer)
+
+    bitgo.get_stellar_transaction_id("transferid")
+
+    assert tracer.spans[0]["attributes"] == {
+        "bitgo.transfer_id": "transferid",
+        "stellar.transaction_id": "stellartxid",
+    }
+
+
+def test_disabled_tracer_starts_no_spans(mocker, make_bitgo):
+    mocker.patch(
+        "polaris_bitgo.bitgo.api.BitGoAPI.get_transfer_by_id",
+        return_value={"state": "confirmed", "txid": "stellartxid"},
+    )
+    start_span_mock = mocker.patch.object(NOOP_TRACER, "start_span")
+    bitgo = make_traced_bitgo(mocker, make_bitgo, NOOP_TRACER)
+
+    assert bitgo.get_stellar_transaction_id("transferid") == "stellartxid"
+    start_span_mock.assert_not_called()
+
+
+def test_open_telemetry_tracer():
+    pytest.importorskip("opentelemetry")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    from polaris_bitgo.helpers.tracing import OpenTelemetryTracer
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+    tracer = OpenTelemetryTracer(tracer_provider=provider)
+    with tracer.start_span("bitgo.send_transaction"):
+        tracer.set_attribute("bitgo.transfer_id", "transferid")
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "bitgo.send_transaction"
+    assert span.attributes["bitgo.transfer_id"] == "transferid"
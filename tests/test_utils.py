@@ -0,0 +1,46 @@
+from uuid import uuid4
+
+from polaris_bitgo.utils import (
+    get_claimable_balance_id,
+    get_padded_hex_memo,
+    get_transaction_id_from_hex_memo,
+    unwrap_fee_bump_transaction,
+)
+from .mocks import stellar as stellar_mocks
+
+
+def test_transaction_id_from_padded_hex_memo():
+    transaction_id = uuid4()
+
+    hex_memo = get_padded_hex_memo(transaction_id)
+
+    assert len(hex_memo) == 64
+    assert get_transaction_id_from_hex_memo(hex_memo) == transaction_id
+
+
+def test_transaction_id_from_unknown_hex_memo():
+    assert get_transaction_id_from_hex_memo("f" * 64) is None
+    assert get_transaction_id_from_hex_memo("0" * 32) is None
+    assert get_transaction_id_from_hex_memo("0" * 32 + "z" * 32) is None
+
+
+def test_unwrap_fee_bump_transaction():
+    envelope, fee_bump_envelope = stellar_mocks.fee_bumped_claimable_balance_envelope()
+    transaction_info = {"id": "txid", "envelope_xdr": fee_bump_envelope.to_xdr()}
+
+    unwrapped_info = unwrap_fee_bump_transaction(transaction_info)
+
+    assert unwrapped_info["envelope_xdr"] == envelope.to_xdr()
+    assert unwrapped_info["fee_bump_envelope_xdr"] == fee_bump_envelope.to_xdr()
+    assert unwrap_fee_bump_transaction(unwrapped_info) is unwrapped_info
+
+
+def test_get_claimable_balance_id_fee_bumped():
+    envelope, fee_bump_envelope = stellar_mocks.fee_bumped_claimable_balance_envelope()
+
+    assert get_claimable_balance_id(
+        {"envelope_xdr": fee_bump_envelope.to_xdr()}
+    ) == envelope.transaction.get_claimable_balance_id(0)
+    assert get_claimable_balance_id({"envelope_xdr": envelope.to_xdr()}) == (
+        envelope.transaction.get_claimable_balance_id(0)
+    )